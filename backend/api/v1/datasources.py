@@ -4,12 +4,12 @@ import uuid
 from datetime import datetime
 from typing import Any
 
-import psycopg2
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from auth import CurrentUser, get_current_user
+from connectors.factory import create_connector
 from crypto import decrypt_sensitive_config, encrypt_sensitive_config
 from database import get_session
 from models import AuditLog, DataSource, DataSourceType
@@ -314,10 +314,13 @@ def test_data_source(
         )
 
         # Try to establish connection based on type
-        if test_request.source_type == DataSourceType.MYSQL:
-            _test_mysql_connection(test_request.connection_config)
-        elif test_request.source_type == DataSourceType.POSTGRESQL:
-            _test_postgresql_connection(test_request.connection_config)
+        if test_request.source_type in (
+            DataSourceType.MYSQL,
+            DataSourceType.POSTGRESQL,
+        ):
+            _test_database_connection(
+                test_request.source_type.value, test_request.connection_config
+            )
         elif test_request.source_type == DataSourceType.MONGODB:
             _test_mongodb_connection(test_request.connection_config)
         elif test_request.source_type in (DataSourceType.S3, DataSourceType.MINIO):
@@ -368,38 +371,13 @@ def _validate_connection_config(
         )
 
 
-def _test_mysql_connection(config: dict[str, Any]) -> None:
-    """Test MySQL connection."""
-    try:
-        import pymysql
-    except ImportError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="pymysql not installed",
-        )
-
-    connection = pymysql.connect(
-        host=config.get("host"),
-        port=config.get("port", 3306),
-        user=config.get("username", "root"),
-        password=config.get("password", ""),
-        database=config.get("database"),
-        connect_timeout=5,
-    )
-    connection.close()
-
-
-def _test_postgresql_connection(config: dict[str, Any]) -> None:
-    """Test PostgreSQL connection."""
-    connection = psycopg2.connect(
-        host=config.get("host"),
-        port=config.get("port", 5432),
-        user=config.get("username", "postgres"),
-        password=config.get("password", ""),
-        database=config.get("database"),
-        connect_timeout=5,
-    )
-    connection.close()
+def _test_database_connection(connector_type: str, config: dict[str, Any]) -> None:
+    """Test a MySQL/PostgreSQL connection through the data source's pool."""
+    connector = create_connector(connector_type, config)
+    with connector:
+        success, message = connector.test_connection()
+    if not success:
+        raise ConnectionError(message)
 
 
 def _test_mongodb_connection(config: dict[str, Any]) -> None:
@@ -6,27 +6,39 @@ Endpoints for scanning data sources and discovering sensitive fields.
 
 from __future__ import annotations
 
+import hashlib
+import json
 import uuid
+from datetime import datetime
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from celery.result import AsyncResult
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from auth import CurrentUser, get_current_user
-from connectors.factory import create_connector
-from crypto import decrypt_sensitive_config
+from celery_app import celery_app
+from crypto import decrypt_sensitive_config, encrypt_sensitive_config
 from database import get_session
+from discovery.catalog import record_scan
+from discovery.jobs import (
+    get_scan_job_tenant,
+    get_scan_results,
+    get_scan_summary,
+    register_scan_job,
+)
+from discovery.runner import scan_source
 from discovery.scanner import (
     DataType,
     DiscoveredField,
     SensitivityLevel,
     ScanResult,
     discover_sensitive_field,
-    get_sensitivity_distribution,
-    scan_table_schema,
 )
-from models import AuditLog, DataSource
+from models import AuditLog, DataSource, SensitiveField
+from worker import process_discovery_scan
 
 router = APIRouter(prefix="/discovery", tags=["Discovery"])
 
@@ -40,6 +52,7 @@ class ScanRequest(BaseModel):
     tables: list[str] | None = None  # Specific tables to scan, None = all
     include_samples: bool = True
     sample_size: int = Field(default=10, ge=1, le=100)
+    force_rescan: bool = False  # Ignore cached results of unchanged tables
 
 
 class ScanColumn(BaseModel):
@@ -60,6 +73,7 @@ class DiscoveredFieldResponse(BaseModel):
     sample_value: str | None
     match_reason: str
     confidence: float
+    match_ratio: float | None = None
 
 
 class TableScanResult(BaseModel):
@@ -81,6 +95,63 @@ class ScanResponse(BaseModel):
     total_sensitive: int
     tables: list[TableScanResult]
     overall_distribution: dict[str, float]
+    cached_tables: int = 0  # Tables served from the scan cache
+
+
+class ScanJobResponse(BaseModel):
+    """State of a background scan job."""
+
+    job_id: str
+    state: str  # PENDING, PROGRESS, SUCCESS, FAILURE
+    current: int | None = None  # Tables done
+    total: int | None = None
+    message: str | None = None
+    summary: dict[str, Any] | None = None  # Totals, once the job is done
+
+
+class ScanJobResultsResponse(BaseModel):
+    """One page of a finished scan job's table results."""
+
+    job_id: str
+    offset: int
+    limit: int
+    summary: dict[str, Any]
+    tables: list[TableScanResult]
+
+
+class CatalogFieldResponse(BaseModel):
+    """Sensitive column recorded in the catalog."""
+
+    source_id: uuid.UUID
+    table_name: str
+    column_name: str
+    data_type: str
+    sensitivity: str
+    confidence: float
+    match_reason: str | None
+    match_ratio: float | None
+    first_seen_at: datetime
+    last_scanned_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class CatalogListResponse(BaseModel):
+    total: int
+    items: list[CatalogFieldResponse]
+
+
+class CatalogTableResponse(BaseModel):
+    """Table with catalogued sensitive columns."""
+
+    source_id: uuid.UUID
+    table_name: str
+    sensitive_columns: int
+
+
+class CatalogTableListResponse(BaseModel):
+    total: int
+    items: list[CatalogTableResponse]
 
 
 class QuickDiscoverRequest(BaseModel):
@@ -96,17 +167,10 @@ class QuickDiscoverResponse(BaseModel):
     summary: dict[str, int]
 
 
-@router.post("/scan", response_model=ScanResponse)
-def scan_data_source(
-    request: ScanRequest,
-    current_user: CurrentUser = Depends(get_current_user),
-    db: Session = Depends(get_session),
-):
-    """
-    Scan a data source for sensitive fields.
-
-    Can use either an existing data source ID or provide connection config directly.
-    """
+def _resolve_source(
+    request: ScanRequest, current_user: CurrentUser, db: Session
+) -> tuple[str, dict[str, Any]]:
+    """Return the connector type and decrypted config a scan request targets."""
     config = request.connection_config
     connector_type = request.connector_type
 
@@ -134,129 +198,54 @@ def scan_data_source(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Either source_id or connector_type+connection_config required",
         )
+    return connector_type, config
 
-    try:
-        # Connect to data source
-        connector = create_connector(connector_type, config)
-
-        with connector:
-            # Test connection first
-            success, message = connector.test_connection()
-            if not success:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Connection test failed: {message}",
-                )
 
-            # Get tables to scan
-            tables_to_scan = request.tables or connector.get_tables()
+def _cache_scope(
+    current_user: CurrentUser, connector_type: str, config: dict[str, Any]
+) -> str:
+    """Scan-cache identity of a data source, without its credentials."""
+    scope = f"{current_user.tenant_id}:{connector_type}:" + json.dumps(
+        config, sort_keys=True, default=str
+    )
+    return hashlib.sha256(scope.encode()).hexdigest()
 
-            if not tables_to_scan:
-                return ScanResponse(
-                    total_tables=0,
-                    total_columns=0,
-                    total_sensitive=0,
-                    tables=[],
-                    overall_distribution={},
-                )
 
-            # Scan each table
-            table_results: list[TableScanResult] = []
-            total_columns = 0
-            total_sensitive = 0
-            all_distribution: dict[str, int] = {}
-
-            for table_name in tables_to_scan:
-                # Get schema
-                columns = connector.get_columns(table_name)
-
-                # Get samples if requested
-                samples: dict[str, str | None] = {}
-                if request.include_samples:
-                    sample_data = connector.get_sample_data(
-                        table_name, request.sample_size
-                    )
-                    # Get first row values for each column
-                    if sample_data:
-                        first_row = sample_data[0]
-                        for col in columns:
-                            val = first_row.get(col["name"])
-                            samples[col["name"]] = str(val) if val else None
-
-                # Run scanner
-                scan_result = scan_table_schema(table_name, columns, samples)
-
-                # Build result
-                discovered_fields = [
-                    DiscoveredFieldResponse(
-                        table_name=f.table_name,
-                        column_name=f.column_name,
-                        data_type=f.data_type.value,
-                        sensitivity=f.sensitivity.value,
-                        sample_value=f.sample_value,
-                        match_reason=f.match_reason,
-                        confidence=f.confidence,
-                    )
-                    for f in scan_result.fields
-                ]
-
-                distribution = get_sensitivity_distribution(scan_result)
-
-                table_results.append(
-                    TableScanResult(
-                        table_name=table_name,
-                        total_columns=scan_result.total_columns,
-                        sensitive_columns=scan_result.sensitive_columns,
-                        columns=[
-                            ScanColumn(
-                                name=c["name"],
-                                type=c["type"],
-                                nullable=c["nullable"],
-                            )
-                            for c in columns
-                        ],
-                        discovered_fields=discovered_fields,
-                        distribution=distribution,
-                    )
-                )
+def _get_job_for_tenant(job_id: str, current_user: CurrentUser) -> None:
+    if get_scan_job_tenant(job_id) != str(current_user.tenant_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scan job not found",
+        )
 
-                total_columns += scan_result.total_columns
-                total_sensitive += scan_result.sensitive_columns
-                for level, count in scan_result.summary.items():
-                    all_distribution[level.value] = (
-                        all_distribution.get(level.value, 0) + count
-                    )
-
-            # Calculate overall distribution
-            overall_distribution = {}
-            if total_sensitive > 0:
-                overall_distribution = {
-                    level: (count / total_sensitive) * 100
-                    for level, count in all_distribution.items()
-                }
-
-            # Audit log
-            audit = AuditLog(
-                tenant_id=current_user.tenant_id,
-                user_id=current_user.id,
-                action="scan",
-                resource_type="discovery",
-                details={
-                    "tables_scanned": len(tables_to_scan),
-                    "sensitive_found": total_sensitive,
-                },
-            )
-            db.add(audit)
-            db.commit()
-
-            return ScanResponse(
-                total_tables=len(tables_to_scan),
-                total_columns=total_columns,
-                total_sensitive=total_sensitive,
-                tables=table_results,
-                overall_distribution=overall_distribution,
-            )
 
+@router.post("/scan", response_model=ScanResponse)
+def scan_data_source(
+    request: ScanRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_session),
+):
+    """
+    Scan a data source for sensitive fields.
+
+    Can use either an existing data source ID or provide connection config directly.
+    """
+    connector_type, config = _resolve_source(request, current_user, db)
+
+    try:
+        result = scan_source(
+            connector_type,
+            config,
+            tables=request.tables,
+            sample_size=request.sample_size if request.include_samples else 0,
+            cache_scope=_cache_scope(current_user, connector_type, config),
+            force_rescan=request.force_rescan,
+        )
+    except ConnectionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Connection test failed: {e}",
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -268,6 +257,219 @@ def scan_data_source(
             detail=f"Scan failed: {str(e)}",
         )
 
+    if result.tables:
+        if request.source_id:
+            record_scan(db, current_user.tenant_id, request.source_id, result.tables)
+        # Audit log
+        audit = AuditLog(
+            tenant_id=current_user.tenant_id,
+            user_id=current_user.id,
+            action="scan",
+            resource_type="discovery",
+            details={
+                "tables_scanned": len(result.tables),
+                "tables_cached": result.cached_tables,
+                "sensitive_found": result.total_sensitive,
+            },
+        )
+        db.add(audit)
+        db.commit()
+
+    return ScanResponse(
+        **result.summary(),
+        tables=[TableScanResult(**table) for table in result.tables],
+    )
+
+
+@router.post(
+    "/scan/jobs",
+    response_model=ScanJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def start_scan_job(
+    request: ScanRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_session),
+):
+    """
+    Start a scan in the background.
+
+    Progress is published per table on ``/ws/status/{job_id}``; results are
+    read page by page from ``/discovery/scan/jobs/{job_id}/results``.
+    """
+    connector_type, config = _resolve_source(request, current_user, db)
+
+    # Credentials travel through the broker encrypted, as they are stored.
+    celery_result = process_discovery_scan.delay(
+        connector_type,
+        encrypt_sensitive_config(config),
+        {
+            "tables": request.tables,
+            "sample_size": request.sample_size if request.include_samples else 0,
+            "cache_scope": _cache_scope(current_user, connector_type, config),
+            "force_rescan": request.force_rescan,
+            # Results of registered sources go into the sensitive-field catalog
+            "tenant_id": str(current_user.tenant_id),
+            "source_id": str(request.source_id) if request.source_id else None,
+        },
+    )
+    register_scan_job(celery_result.id, str(current_user.tenant_id))
+
+    audit = AuditLog(
+        tenant_id=current_user.tenant_id,
+        user_id=current_user.id,
+        action="scan",
+        resource_type="discovery",
+        resource_id=celery_result.id,
+        details={"mode": "job", "tables": len(request.tables or [])},
+    )
+    db.add(audit)
+    db.commit()
+
+    return ScanJobResponse(job_id=celery_result.id, state="PENDING")
+
+
+@router.get("/scan/jobs/{job_id}", response_model=ScanJobResponse)
+def get_scan_job(
+    job_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Get a scan job's state, progress and, once done, its summary."""
+    _get_job_for_tenant(job_id, current_user)
+
+    result = AsyncResult(job_id, app=celery_app)
+    response = ScanJobResponse(job_id=job_id, state=result.state)
+    if result.state == "PROGRESS":
+        meta = result.info or {}
+        response.current = meta.get("current")
+        response.total = meta.get("total")
+        response.message = meta.get("message")
+    elif result.state == "FAILURE":
+        response.message = str(result.result)
+    response.summary = get_scan_summary(job_id)
+    if response.summary is not None:
+        response.state = "SUCCESS"
+        response.current = response.total = response.summary["total_tables"]
+        response.message = "completed"
+    return response
+
+
+@router.get("/scan/jobs/{job_id}/results", response_model=ScanJobResultsResponse)
+def get_scan_job_results(
+    job_id: str,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=1000),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Page through a finished scan job's per-table results."""
+    _get_job_for_tenant(job_id, current_user)
+
+    summary = get_scan_summary(job_id)
+    if summary is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Scan job has not finished",
+        )
+    return ScanJobResultsResponse(
+        job_id=job_id,
+        offset=offset,
+        limit=limit,
+        summary=summary,
+        tables=[
+            TableScanResult(**table)
+            for table in get_scan_results(job_id, offset, limit)
+        ],
+    )
+
+
+def _catalog_query(
+    db: Session,
+    current_user: CurrentUser,
+    sensitivity: str | None,
+    data_type: str | None,
+    source_id: uuid.UUID | None,
+):
+    query = db.query(SensitiveField).filter(
+        SensitiveField.tenant_id == current_user.tenant_id
+    )
+    if sensitivity:
+        query = query.filter(SensitiveField.sensitivity == sensitivity)
+    if data_type:
+        query = query.filter(SensitiveField.data_type == data_type)
+    if source_id:
+        query = query.filter(SensitiveField.source_id == source_id)
+    return query
+
+
+@router.get("/catalog", response_model=CatalogListResponse)
+def list_catalog_fields(
+    skip: int = 0,
+    limit: int = Query(default=100, ge=1, le=1000),
+    sensitivity: str | None = None,
+    data_type: str | None = None,
+    source_id: uuid.UUID | None = None,
+    table_name: str | None = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_session),
+):
+    """List catalogued sensitive columns, e.g. every L4 column of the tenant."""
+    query = _catalog_query(db, current_user, sensitivity, data_type, source_id)
+    if table_name:
+        query = query.filter(SensitiveField.table_name == table_name)
+
+    total = query.count()
+    items = (
+        query.order_by(
+            SensitiveField.source_id,
+            SensitiveField.table_name,
+            SensitiveField.column_name,
+        )
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return CatalogListResponse(total=total, items=items)
+
+
+@router.get("/catalog/tables", response_model=CatalogTableListResponse)
+def list_catalog_tables(
+    skip: int = 0,
+    limit: int = Query(default=100, ge=1, le=1000),
+    sensitivity: str | None = None,
+    data_type: str | None = None,
+    source_id: uuid.UUID | None = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_session),
+):
+    """List tables with catalogued sensitive columns, e.g. all tables with phones."""
+    grouped = (
+        _catalog_query(db, current_user, sensitivity, data_type, source_id)
+        .with_entities(
+            SensitiveField.source_id,
+            SensitiveField.table_name,
+            func.count().label("sensitive_columns"),
+        )
+        .group_by(SensitiveField.source_id, SensitiveField.table_name)
+    )
+    total = grouped.count()
+    rows = (
+        grouped.order_by(SensitiveField.source_id, SensitiveField.table_name)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return CatalogTableListResponse(
+        total=total,
+        items=[
+            CatalogTableResponse(
+                source_id=row.source_id,
+                table_name=row.table_name,
+                sensitive_columns=row.sensitive_columns,
+            )
+            for row in rows
+        ],
+    )
+
 
 @router.post("/quick-discover", response_model=QuickDiscoverResponse)
 def quick_discover(request: QuickDiscoverRequest):
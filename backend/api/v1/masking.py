@@ -114,6 +114,16 @@ def get_masking_strategies():
             "description": "One-way hash with optional salt",
             "params": {"salt": "optional_salt_string"},
         },
+        "keyed_hash": {
+            "name": "Keyed Hash (BLAKE2b / HMAC-SHA256)",
+            "description": "Deterministic keyed hash; the key never appears in output",
+            "params": {"key": "secret_key", "algorithm": "blake2b | hmac_sha256"},
+        },
+        "tokenize": {
+            "name": "Tokenization",
+            "description": "Random token kept in a vault; same value, same token across tables and runs",
+            "params": {"namespace": "default"},
+        },
         "replace": {
             "name": "Fixed Replace",
             "description": "Replace with fixed value",
@@ -10,6 +10,32 @@ class Settings(BaseSettings):
     output_dir: str = "/data/outputs"
     frontend_dist_dir: str = "/app/frontend_dist"
 
+    # Parallel CSV/JSONL desensitization; 0 or 1 keeps the single-process path
+    desensitize_processes: int = 0
+    desensitize_chunk_mb: int = 32
+
+    # Rows fetched per round trip when streaming database sources
+    db_fetch_size: int = 5000
+    # Rows per transaction when writing to a database target
+    db_write_batch_size: int = 5000
+
+    # Per-process connection pool for each data source
+    db_pool_max_size: int = 5
+    db_pool_idle_seconds: int = 300
+    db_pool_health_check_seconds: int = 30
+    db_pool_checkout_timeout_seconds: int = 30
+
+    # Tables of one data source scanned at once by /discovery/scan
+    discovery_scan_concurrency: int = 4
+    # How long per-table scan results are kept for incremental rescans
+    discovery_cache_ttl_seconds: int = 7 * 24 * 3600
+    # How long background scan job results stay readable
+    discovery_job_ttl_seconds: int = 24 * 3600
+
+    # Redis holding the tokenization vault; empty uses redis_url.  It must
+    # be persistent and never evict keys, or pseudonyms change between runs.
+    token_vault_url: str = ""
+
     # Encryption key for sensitive config values (Fernet key)
     # Generate with: python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
     encryption_key: str = ""
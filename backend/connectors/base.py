@@ -6,32 +6,88 @@ Abstract base class for database connectors.
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any
+from collections.abc import Iterable, Iterator, Sequence
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .pool import ConnectionPool
+
+DEFAULT_FETCH_SIZE = 5000
+# Table in the source database holding in-place masking checkpoints
+CHECKPOINT_TABLE = "desensitize_checkpoints"
 
 
 class BaseConnector(ABC):
     """Abstract base class for database connectors."""
 
-    def __init__(self, config: dict[str, Any]):
+    # Ways ``process_db_desensitize`` may read a source with this connector;
+    # ``copy`` needs a ``copy_rows`` implementation.
+    extract_modes: tuple[str, ...] = ("cursor",)
+
+    def __init__(self, config: dict[str, Any], pool: ConnectionPool | None = None):
         """
         Initialize connector with configuration.
 
         Args:
             config: Connection configuration
+            pool: Pool to check connections out of; without one every
+                ``connect`` opens a fresh connection
         """
         self.config = config
         self._connection = None
+        self._pool = pool
+        # Cleared once the session has been changed in ways a rollback
+        # doesn't undo, so it is closed instead of going back to the pool.
+        self._reusable = True
 
-    @abstractmethod
     def connect(self) -> Any:
-        """Establish connection to database."""
+        """Establish connection to database, reusing a pooled one if possible."""
+        if self._connection is not None and not self._is_open(self._connection):
+            # Let the pool account for the dead connection before replacing it.
+            self.disconnect()
+        if self._connection is None:
+            if self._pool is not None:
+                self._connection = self._pool.acquire()
+            else:
+                self._connection = self._open_connection()
+            self._reusable = True
+        return self._connection
+
+    def disconnect(self) -> None:
+        """Hand the connection back to the pool, or close it."""
+        conn, self._connection = self._connection, None
+        if conn is None:
+            return
+        if self._pool is not None:
+            self._pool.release(conn, reusable=self._reusable)
+        elif self._is_open(conn):
+            conn.close()
+
+    @abstractmethod
+    def _open_connection(self) -> Any:
+        """Open a new driver connection from ``self.config``."""
         pass
 
     @abstractmethod
-    def disconnect(self) -> None:
-        """Close connection."""
+    def _is_open(self, conn: Any) -> bool:
+        """Whether the driver still considers the connection open."""
         pass
 
+    def _ping_connection(self, conn: Any) -> bool:
+        """Check with a round trip that an idle connection still works."""
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            conn.rollback()
+        except Exception:
+            return False
+        return True
+
+    def _reset_connection(self, conn: Any) -> None:
+        """End any open transaction before the connection is reused."""
+        conn.rollback()
+
     @abstractmethod
     def test_connection(self) -> tuple[bool, str]:
         """
@@ -57,6 +113,29 @@ class BaseConnector(ABC):
         """
         pass
 
+    def get_all_columns(
+        self, schema: str | None = None
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Get column information for every table in a schema.
+
+        Connectors override this to read the catalog in one query; the
+        default asks ``get_columns`` table by table.
+
+        Returns:
+            Table name -> columns in table order, as from ``get_columns``
+        """
+        return {table: self.get_columns(table) for table in self.get_tables(schema)}
+
+    def get_row_estimates(self, schema: str | None = None) -> dict[str, int]:
+        """
+        Get the planner's row count estimate of every table in a schema.
+
+        Estimates come from catalog statistics, not ``COUNT(*)``; tables
+        without statistics may be missing.  The default knows none.
+        """
+        return {}
+
     @abstractmethod
     def get_sample_data(
         self, table_name: str, limit: int = 10
@@ -64,11 +143,205 @@ class BaseConnector(ABC):
         """Get sample data from a table."""
         pass
 
+    def get_random_sample(
+        self, table_name: str, limit: int = 10
+    ) -> list[dict[str, Any]]:
+        """
+        Get up to ``limit`` rows spread across a table without reading it all.
+
+        Connectors override this with a database-side sampling method; the
+        default returns the first rows, as ``get_sample_data``.
+        """
+        return self.get_sample_data(table_name, limit)
+
     @abstractmethod
     def execute_query(self, query: str, params: tuple | None = None) -> list[dict[str, Any]]:
         """Execute a SQL query and return results."""
         pass
 
+    def get_primary_key(self, table_name: str) -> list[str]:
+        """Get the primary key column names of a table, in key order."""
+        return []
+
+    def quote_identifier(self, name: str) -> str:
+        """Quote a table or column name for use in SQL."""
+        return '"' + name.replace('"', '""') + '"'
+
+    def update_rows(
+        self,
+        table_name: str,
+        columns: list[str],
+        key_columns: list[str],
+        update_columns: list[str],
+        rows: Iterable[Sequence[Any]],
+        checkpoint: tuple[str, str] | None = None,
+    ) -> int:
+        """
+        Write ``update_columns`` of existing rows back, matched on their key.
+
+        ``rows`` are full positional rows for ``columns``.  All rows are
+        committed as one transaction, together with ``checkpoint`` (a
+        ``(name, last_key)`` pair, see ``read_checkpoint``) when given.
+
+        Returns:
+            Number of rows written
+        """
+        rows = list(rows)
+        position = {name: index for index, name in enumerate(columns)}
+        quote = self.quote_identifier
+        assignments = ", ".join(f"{quote(c)} = %s" for c in update_columns)
+        match = " AND ".join(f"{quote(k)} = %s" for k in key_columns)
+        order = [position[name] for name in update_columns + key_columns]
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.executemany(
+                    f"UPDATE {quote(table_name)} SET {assignments} WHERE {match}",
+                    [[row[index] for index in order] for row in rows],
+                )
+                if checkpoint is not None:
+                    self._write_checkpoint(cursor, checkpoint)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return len(rows)
+
+    def _write_checkpoint(self, cursor: Any, checkpoint: tuple[str, str]) -> None:
+        """Replace a checkpoint inside the caller's transaction."""
+        name, last_key = checkpoint
+        table = self.quote_identifier(CHECKPOINT_TABLE)
+        cursor.execute(f"DELETE FROM {table} WHERE checkpoint_name = %s", (name,))
+        cursor.execute(
+            f"INSERT INTO {table} (checkpoint_name, last_key) VALUES (%s, %s)",
+            (name, last_key),
+        )
+
+    def read_checkpoint(self, name: str) -> str | None:
+        """
+        Last key committed by ``update_rows`` under ``name``, if any.
+
+        Checkpoints live in the database being updated so that they commit
+        atomically with the rows; the table is created on first use.
+        """
+        table = self.quote_identifier(CHECKPOINT_TABLE)
+        self.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "checkpoint_name VARCHAR(255) PRIMARY KEY, last_key TEXT NOT NULL)"
+        )
+        rows = self.execute_query(
+            f"SELECT last_key FROM {table} WHERE checkpoint_name = %s", (name,)
+        )
+        return rows[0]["last_key"] if rows else None
+
+    def clear_checkpoint(self, name: str) -> None:
+        """Remove a checkpoint once its table is done."""
+        self.execute(
+            f"DELETE FROM {self.quote_identifier(CHECKPOINT_TABLE)} "
+            "WHERE checkpoint_name = %s",
+            (name,),
+        )
+
+    def execute(self, statement: str, params: tuple | list | None = None) -> int:
+        """
+        Execute a statement that returns no rows and commit it.
+
+        Returns:
+            Number of rows affected
+        """
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(statement, params or ())
+                affected = cursor.rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return affected
+
+    def stream_query(
+        self,
+        query: str,
+        params: tuple | None = None,
+        fetch_size: int = DEFAULT_FETCH_SIZE,
+    ) -> Iterator[list[dict[str, Any]]]:
+        """
+        Execute a SQL query and yield its rows in batches of ``fetch_size``.
+
+        Connectors that support server-side cursors override this so that
+        only one batch is held in memory; the default buffers the full
+        result via ``execute_query``.
+        """
+        rows = self.execute_query(query, params)
+        for start in range(0, len(rows), fetch_size):
+            yield rows[start : start + fetch_size]
+
+    def write_rows(
+        self, table_name: str, columns: list[str], rows: Iterable[Sequence[Any]]
+    ) -> int:
+        """
+        Insert rows into a table and commit them as one transaction.
+
+        Returns:
+            Number of rows written
+        """
+        rows = list(rows)
+        table = self.quote_identifier(table_name)
+        column_list = ", ".join(self.quote_identifier(name) for name in columns)
+        placeholders = ", ".join(["%s"] * len(columns))
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.executemany(
+                    f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})",
+                    rows,
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return len(rows)
+
+    def copy_rows(
+        self, query: str, params: tuple | None = None
+    ) -> Iterator[list[str | None]]:
+        """
+        Execute a SQL query through the database's bulk export path.
+
+        Yields the column names, then each row as a list of strings, with
+        None for NULL.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support copy extraction"
+        )
+
+    def export_snapshot(self) -> str | None:
+        """
+        Pin a point-in-time view that other connections can attach to.
+
+        The view stays pinned until ``release_snapshot``.
+
+        Returns:
+            Snapshot identifier to pass to ``import_snapshot``, or None when
+            the database shares snapshots implicitly
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support consistent snapshots"
+        )
+
+    def import_snapshot(self, snapshot: str | None) -> None:
+        """Start a read transaction on this connection at an exported snapshot."""
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support consistent snapshots"
+        )
+
+    def release_snapshot(self) -> None:
+        """Release an exported snapshot once every reader has attached."""
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support consistent snapshots"
+        )
+
     def __enter__(self):
         self.connect()
         return self
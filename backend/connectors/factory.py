@@ -8,10 +8,11 @@ from __future__ import annotations
 from typing import Any
 
 from .base import BaseConnector
+from .pool import get_pool
 
 
 def create_connector(
-    connector_type: str, config: dict[str, Any]
+    connector_type: str, config: dict[str, Any], pooled: bool = True
 ) -> BaseConnector:
     """
     Create a database connector based on type.
@@ -19,6 +20,8 @@ def create_connector(
     Args:
         connector_type: Type of connector (mysql, postgresql, etc.)
         config: Connection configuration
+        pooled: Check connections out of this process's shared pool for the
+            data source instead of opening a dedicated one
 
     Returns:
         Database connector instance
@@ -43,7 +46,10 @@ def create_connector(
     module = __import__(module_name, fromlist=[connectors[connector_type]], level=1)
     connector_class = getattr(module, connectors[connector_type])
 
-    return connector_class(config)
+    connector = connector_class(config)
+    if pooled:
+        connector._pool = get_pool(connector_type, config, connector)
+    return connector
 
 
 def get_available_connectors() -> list[str]:
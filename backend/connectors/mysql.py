@@ -3,34 +3,39 @@ MySQL Database Connector
 """
 from __future__ import annotations
 
+import random
+from collections.abc import Iterable, Iterator, Sequence
 from typing import Any
 
 import pymysql
 
-from .base import BaseConnector
+from .base import DEFAULT_FETCH_SIZE, BaseConnector
 
 
 class MySQLConnector(BaseConnector):
     """MySQL database connector."""
 
-    def connect(self) -> pymysql.Connection:
-        if self._connection is None or not self._connection.open:
-            self._connection = pymysql.connect(
-                host=self.config.get("host", "localhost"),
-                port=int(self.config.get("port", 3306)),
-                user=self.config.get("username", "root"),
-                password=self.config.get("password", ""),
-                database=self.config.get("database"),
-                charset="utf8mb4",
-                cursorclass=pymysql.cursors.DictCursor,
-                connect_timeout=10,
-            )
-        return self._connection
+    def _open_connection(self) -> pymysql.Connection:
+        return pymysql.connect(
+            host=self.config.get("host", "localhost"),
+            port=int(self.config.get("port", 3306)),
+            user=self.config.get("username", "root"),
+            password=self.config.get("password", ""),
+            database=self.config.get("database"),
+            charset="utf8mb4",
+            cursorclass=pymysql.cursors.DictCursor,
+            connect_timeout=10,
+        )
 
-    def disconnect(self) -> None:
-        if self._connection and self._connection.open:
-            self._connection.close()
-            self._connection = None
+    def _is_open(self, conn: pymysql.Connection) -> bool:
+        return conn.open
+
+    def _ping_connection(self, conn: pymysql.Connection) -> bool:
+        try:
+            conn.ping(reconnect=False)
+        except pymysql.Error:
+            return False
+        return True
 
     def test_connection(self) -> tuple[bool, str]:
         try:
@@ -67,6 +72,61 @@ class MySQLConnector(BaseConnector):
                 for row in results
             ]
 
+    def get_all_columns(
+        self, schema: str | None = None
+    ) -> dict[str, list[dict[str, Any]]]:
+        conn = self.connect()
+        with conn.cursor() as cursor:
+            # COLUMN_TYPE matches the Type column DESCRIBE reports.
+            cursor.execute(
+                """
+                SELECT TABLE_NAME AS table_name, COLUMN_NAME AS column_name,
+                       COLUMN_TYPE AS column_type, IS_NULLABLE AS is_nullable
+                FROM information_schema.COLUMNS
+                WHERE TABLE_SCHEMA = COALESCE(%s, DATABASE())
+                ORDER BY TABLE_NAME, ORDINAL_POSITION
+                """,
+                (schema,),
+            )
+            tables: dict[str, list[dict[str, Any]]] = {}
+            for row in cursor.fetchall():
+                tables.setdefault(row["table_name"], []).append(
+                    {
+                        "name": row["column_name"],
+                        "type": row["column_type"],
+                        "nullable": row["is_nullable"] == "YES",
+                    }
+                )
+            return tables
+
+    def get_row_estimates(self, schema: str | None = None) -> dict[str, int]:
+        conn = self.connect()
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT TABLE_NAME AS table_name, TABLE_ROWS AS estimate
+                FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = COALESCE(%s, DATABASE())
+                  AND TABLE_TYPE = 'BASE TABLE'
+                """,
+                (schema,),
+            )
+            return {
+                row["table_name"]: row["estimate"]
+                for row in cursor.fetchall()
+                if row["estimate"] is not None
+            }
+
+    def get_primary_key(self, table_name: str) -> list[str]:
+        conn = self.connect()
+        with conn.cursor() as cursor:
+            cursor.execute(f"SHOW KEYS FROM `{table_name}` WHERE Key_name = 'PRIMARY'")
+            results = sorted(cursor.fetchall(), key=lambda row: row["Seq_in_index"])
+            return [row["Column_name"] for row in results]
+
+    def quote_identifier(self, name: str) -> str:
+        return "`" + name.replace("`", "``") + "`"
+
     def get_sample_data(
         self, table_name: str, limit: int = 10
     ) -> list[dict[str, Any]]:
@@ -75,6 +135,35 @@ class MySQLConnector(BaseConnector):
             cursor.execute(f"SELECT * FROM `{table_name}` LIMIT %s", (limit,))
             return cursor.fetchall()
 
+    def get_random_sample(
+        self, table_name: str, limit: int = 10
+    ) -> list[dict[str, Any]]:
+        # MySQL has no TABLESAMPLE. With an integer primary key, seek to
+        # ``limit`` random key values instead: one index probe per row.
+        table = self.quote_identifier(table_name)
+        key = self.get_primary_key(table_name)
+        conn = self.connect()
+        with conn.cursor() as cursor:
+            if len(key) == 1:
+                column = self.quote_identifier(key[0])
+                cursor.execute(
+                    f"SELECT MIN({column}) AS lo, MAX({column}) AS hi FROM {table}"
+                )
+                bounds = cursor.fetchone() or {}
+                lo, hi = bounds.get("lo"), bounds.get("hi")
+                if isinstance(lo, int) and isinstance(hi, int) and hi - lo >= limit:
+                    probe = (
+                        f"(SELECT * FROM {table} WHERE {column} >= %s "
+                        f"ORDER BY {column} LIMIT 1)"
+                    )
+                    starts = sorted(random.sample(range(lo, hi + 1), limit))
+                    cursor.execute(" UNION ".join([probe] * limit), starts)
+                    rows = cursor.fetchall()
+                    if rows:
+                        return rows
+            cursor.execute(f"SELECT * FROM {table} LIMIT %s", (limit,))
+            return cursor.fetchall()
+
     def execute_query(
         self, query: str, params: tuple | None = None
     ) -> list[dict[str, Any]]:
@@ -82,3 +171,71 @@ class MySQLConnector(BaseConnector):
         with conn.cursor() as cursor:
             cursor.execute(query, params or ())
             return cursor.fetchall()
+
+    def stream_query(
+        self,
+        query: str,
+        params: tuple | None = None,
+        fetch_size: int = DEFAULT_FETCH_SIZE,
+    ) -> Iterator[list[dict[str, Any]]]:
+        conn = self.connect()
+        # SSDictCursor reads rows off the wire as they are fetched instead
+        # of buffering the whole result client-side.
+        with conn.cursor(pymysql.cursors.SSDictCursor) as cursor:
+            cursor.execute(query, params or ())
+            while batch := cursor.fetchmany(fetch_size):
+                yield batch
+
+    def update_rows(
+        self,
+        table_name: str,
+        columns: list[str],
+        key_columns: list[str],
+        update_columns: list[str],
+        rows: Iterable[Sequence[Any]],
+        checkpoint: tuple[str, str] | None = None,
+    ) -> int:
+        rows = list(rows)
+        quote = self.quote_identifier
+        # Full rows are sent so the INSERT half never trips NOT NULL checks;
+        # only the masked columns are overwritten on the key collision.
+        assignments = ", ".join(
+            f"{quote(c)} = VALUES({quote(c)})" for c in update_columns
+        )
+        statement = (
+            f"INSERT INTO {quote(table_name)} ({', '.join(quote(c) for c in columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))}) "
+            f"ON DUPLICATE KEY UPDATE {assignments}"
+        )
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.executemany(statement, [list(row) for row in rows])
+                if checkpoint is not None:
+                    self._write_checkpoint(cursor, checkpoint)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return len(rows)
+
+    def export_snapshot(self) -> str | None:
+        # MySQL cannot hand a snapshot to another session. Writes are held
+        # off until every reader has opened its own consistent snapshot.
+        conn = self.connect()
+        self._reusable = False
+        with conn.cursor() as cursor:
+            cursor.execute("FLUSH TABLES WITH READ LOCK")
+        return None
+
+    def import_snapshot(self, snapshot: str | None) -> None:
+        conn = self.connect()
+        self._reusable = False
+        with conn.cursor() as cursor:
+            cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY")
+
+    def release_snapshot(self) -> None:
+        if self._connection and self._connection.open:
+            with self._connection.cursor() as cursor:
+                cursor.execute("UNLOCK TABLES")
@@ -0,0 +1,214 @@
+"""
+Connection Pool
+
+Bounded, health-checked pools of database connections, one per data source
+and process.  Connectors check connections out of their pool on ``connect``
+and hand them back on ``disconnect`` instead of opening a new session (and
+TCP/TLS handshake) for every scan and task.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .base import BaseConnector
+
+
+class PoolTimeoutError(TimeoutError):
+    """Raised when no connection frees up within the checkout timeout."""
+
+
+class ConnectionPool:
+    """Bounded pool of connections to one data source.
+
+    At most ``max_size`` connections are open at once, counting both idle
+    and checked-out ones.  Idle connections are reused most-recent first,
+    pinged when they have been idle longer than ``health_check_seconds``,
+    and closed once idle longer than ``idle_timeout``.
+
+    The driver is a connector instance providing ``_open_connection``,
+    ``_is_open``, ``_ping_connection`` and ``_reset_connection``.
+    """
+
+    def __init__(
+        self,
+        driver: BaseConnector,
+        *,
+        max_size: int,
+        idle_timeout: float,
+        health_check_seconds: float,
+        checkout_timeout: float,
+    ):
+        self._driver = driver
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self.health_check_seconds = health_check_seconds
+        self.checkout_timeout = checkout_timeout
+        self._idle: deque[tuple[Any, float]] = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+        self.last_used = time.monotonic()
+
+    @property
+    def size(self) -> int:
+        """Number of open connections, idle or checked out."""
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        """Number of idle connections."""
+        return len(self._idle)
+
+    def acquire(self) -> Any:
+        """
+        Check out a healthy connection, opening one if under ``max_size``.
+
+        Raises:
+            PoolTimeoutError: If the pool stays exhausted for
+                ``checkout_timeout`` seconds
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self.last_used = now
+                self._evict_idle(now)
+                while self._idle:
+                    conn, idle_since = self._idle.pop()
+                    if self._healthy(conn, now - idle_since):
+                        return conn
+                    self._discard(conn)
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"no connection available after {self.checkout_timeout}s "
+                        f"(pool size {self.max_size})"
+                    )
+                self._cond.wait(remaining)
+
+        # Connect outside the lock so a slow handshake doesn't block
+        # checkouts of idle connections.
+        try:
+            return self._driver._open_connection()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn: Any, *, reusable: bool = True) -> None:
+        """Return a connection; it is closed instead if it can't be reused."""
+        if reusable and self._driver._is_open(conn):
+            try:
+                self._driver._reset_connection(conn)
+            except Exception:
+                reusable = False
+        else:
+            reusable = False
+        with self._cond:
+            now = time.monotonic()
+            self.last_used = now
+            if reusable:
+                self._idle.append((conn, now))
+            else:
+                self._discard(conn)
+            self._evict_idle(now)
+            self._cond.notify()
+
+    def close(self) -> None:
+        """Close every idle connection; checked-out ones close on release."""
+        with self._cond:
+            while self._idle:
+                self._discard(self._idle.popleft()[0])
+            self._cond.notify_all()
+
+    def _healthy(self, conn: Any, idle_for: float) -> bool:
+        if not self._driver._is_open(conn):
+            return False
+        if idle_for < self.health_check_seconds:
+            return True
+        return self._driver._ping_connection(conn)
+
+    def _evict_idle(self, now: float) -> None:
+        # Oldest connections sit at the left end.
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            self._discard(self._idle.popleft()[0])
+
+    def _discard(self, conn: Any) -> None:
+        self._size -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+_pools: dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+# Pools inherited across fork hold the parent's sockets; closing (or
+# garbage-collecting) them in the child would end the parent's sessions.
+_inherited_pools: list[ConnectionPool] = []
+
+
+def _forget_pools_after_fork() -> None:
+    global _pools_lock
+    _inherited_pools.extend(_pools.values())
+    _pools.clear()
+    _pools_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_pools_after_fork)
+
+
+def _pool_key(connector_type: str, config: dict[str, Any]) -> str:
+    return connector_type + ":" + json.dumps(config, sort_keys=True, default=str)
+
+
+def get_pool(
+    connector_type: str, config: dict[str, Any], driver: BaseConnector
+) -> ConnectionPool:
+    """
+    Get this process's pool for a data source, creating it on first use.
+
+    Data sources are identified by connector type and connection config.
+    Pools left unused for ``db_pool_idle_seconds`` are dropped.
+    """
+    from config import settings
+
+    key = _pool_key(connector_type, config)
+    with _pools_lock:
+        now = time.monotonic()
+        for stale_key, stale in list(_pools.items()):
+            if (
+                stale_key != key
+                and stale.size == stale.idle
+                and now - stale.last_used > settings.db_pool_idle_seconds
+            ):
+                stale.close()
+                del _pools[stale_key]
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(
+                driver,
+                max_size=settings.db_pool_max_size,
+                idle_timeout=settings.db_pool_idle_seconds,
+                health_check_seconds=settings.db_pool_health_check_seconds,
+                checkout_timeout=settings.db_pool_checkout_timeout_seconds,
+            )
+            _pools[key] = pool
+        return pool
+
+
+def close_pools() -> None:
+    """Close the idle connections of every pool in this process."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
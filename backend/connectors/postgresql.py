@@ -3,33 +3,145 @@ PostgreSQL Database Connector
 """
 from __future__ import annotations
 
+import io
+import json
+import queue
+import re
+import threading
+import uuid
+from collections.abc import Iterable, Iterator, Sequence
 from typing import Any
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 
-from .base import BaseConnector
+from .base import DEFAULT_FETCH_SIZE, BaseConnector
+
+# COPY output chunks buffered between the copy thread and the consumer.
+COPY_QUEUE_CHUNKS = 64
+
+
+def _literal(value: Any, array: bool = False) -> str:
+    """Input text of a value: JSON for dicts and lists, hex for bytes.
+
+    With ``array`` a list is written as an array literal instead.
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\x" + bytes(value).hex()
+    if isinstance(value, list) and array:
+        return "{" + ",".join(_array_element(item) for item in value) + "}"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+def _array_element(value: Any) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, list):
+        return _literal(value, array=True)
+    text = _literal(value)
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _copy_text(value: Any, array: bool = False) -> str:
+    """Format a value as a COPY text-format field."""
+    if value is None:
+        return "\\N"
+    return (
+        _literal(value, array)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+_COPY_ESCAPE = re.compile(r"\\(.)", re.DOTALL)
+_COPY_UNESCAPES = {"b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v"}
+
+
+def _parse_copy_field(field: str) -> str | None:
+    """Read a COPY text-format field; ``\\N`` is NULL."""
+    if field == "\\N":
+        return None
+    if "\\" not in field:
+        return field
+    return _COPY_ESCAPE.sub(
+        lambda match: _COPY_UNESCAPES.get(match.group(1), match.group(1)), field
+    )
+
+
+class _CopyAborted(Exception):
+    pass
+
+
+class _QueueWriter:
+    """File-like sink for ``copy_expert`` that hands chunks to a queue."""
+
+    def __init__(self, chunks: queue.Queue, stop: threading.Event) -> None:
+        self._chunks = chunks
+        self._stop = stop
+
+    def put(self, item) -> None:
+        while not self._stop.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise _CopyAborted()
+
+    def write(self, data: bytes) -> int:
+        self.put(data)
+        return len(data)
+
+
+class _ChunkReader(io.RawIOBase):
+    """Readable byte stream over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = bytes(chunk)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
 
 
 class PostgreSQLConnector(BaseConnector):
     """PostgreSQL database connector."""
 
-    def connect(self) -> psycopg2.extensions.connection:
-        if self._connection is None or self._connection.closed:
-            self._connection = psycopg2.connect(
-                host=self.config.get("host", "localhost"),
-                port=int(self.config.get("port", 5432)),
-                user=self.config.get("username", "postgres"),
-                password=self.config.get("password", ""),
-                database=self.config.get("database"),
-                connect_timeout=10,
-            )
-        return self._connection
+    extract_modes = ("cursor", "copy")
 
-    def disconnect(self) -> None:
-        if self._connection and not self._connection.closed:
-            self._connection.close()
-            self._connection = None
+    # Set while the connection sits in an imported snapshot transaction,
+    # which streaming reads must not end.
+    _in_snapshot = False
+    # Column types per table, filled by ``_column_types``
+    _types_by_table: dict[str, dict[str, str]] | None = None
+
+    def _open_connection(self) -> psycopg2.extensions.connection:
+        return psycopg2.connect(
+            host=self.config.get("host", "localhost"),
+            port=int(self.config.get("port", 5432)),
+            user=self.config.get("username", "postgres"),
+            password=self.config.get("password", ""),
+            database=self.config.get("database"),
+            connect_timeout=10,
+        )
+
+    def _is_open(self, conn: psycopg2.extensions.connection) -> bool:
+        return not conn.closed
 
     def test_connection(self) -> tuple[bool, str]:
         try:
@@ -75,6 +187,62 @@ class PostgreSQLConnector(BaseConnector):
                 for row in results
             ]
 
+    def get_all_columns(
+        self, schema: str | None = None
+    ) -> dict[str, list[dict[str, Any]]]:
+        conn = self.connect()
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            query = """
+                SELECT table_name, column_name, data_type, is_nullable
+                FROM information_schema.columns
+                WHERE table_schema = %s
+                ORDER BY table_name, ordinal_position
+            """
+            cursor.execute(query, (schema or "public",))
+            tables: dict[str, list[dict[str, Any]]] = {}
+            for row in cursor.fetchall():
+                tables.setdefault(row["table_name"], []).append(
+                    {
+                        "name": row["column_name"],
+                        "type": row["data_type"],
+                        "nullable": row["is_nullable"] == "YES",
+                    }
+                )
+            return tables
+
+    def get_row_estimates(self, schema: str | None = None) -> dict[str, int]:
+        conn = self.connect()
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            query = """
+                SELECT c.relname AS table_name, c.reltuples::bigint AS estimate
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = %s AND c.relkind IN ('r', 'p')
+            """
+            cursor.execute(query, (schema or "public",))
+            # reltuples is -1 until the table is first analyzed.
+            return {
+                row["table_name"]: row["estimate"]
+                for row in cursor.fetchall()
+                if row["estimate"] >= 0
+            }
+
+    def get_primary_key(self, table_name: str) -> list[str]:
+        conn = self.connect()
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            query = """
+                SELECT kcu.column_name
+                FROM information_schema.table_constraints tc
+                JOIN information_schema.key_column_usage kcu
+                  ON kcu.constraint_name = tc.constraint_name
+                 AND kcu.table_schema = tc.table_schema
+                 AND kcu.table_name = tc.table_name
+                WHERE tc.constraint_type = 'PRIMARY KEY' AND tc.table_name = %s
+                ORDER BY kcu.ordinal_position
+            """
+            cursor.execute(query, (table_name,))
+            return [row["column_name"] for row in cursor.fetchall()]
+
     def get_sample_data(
         self, table_name: str, limit: int = 10
     ) -> list[dict[str, Any]]:
@@ -85,6 +253,32 @@ class PostgreSQLConnector(BaseConnector):
             )
             return cursor.fetchall()
 
+    def get_random_sample(
+        self, table_name: str, limit: int = 10
+    ) -> list[dict[str, Any]]:
+        table = self.quote_identifier(table_name)
+        conn = self.connect()
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(
+                "SELECT relpages FROM pg_class WHERE oid = to_regclass(%s)", (table,)
+            )
+            row = cursor.fetchone()
+            pages = row["relpages"] if row else 0
+            if pages > limit:
+                # SYSTEM reads about ``limit`` random pages; shuffle their
+                # rows so the sample isn't just the first sampled page.
+                cursor.execute(
+                    f"SELECT * FROM {table} TABLESAMPLE SYSTEM (%s) "
+                    "ORDER BY random() LIMIT %s",
+                    (100.0 * limit / pages, limit),
+                )
+                rows = cursor.fetchall()
+                if rows:
+                    return rows
+            # Small or never-analyzed tables
+            cursor.execute(f"SELECT * FROM {table} LIMIT %s", (limit,))
+            return cursor.fetchall()
+
     def execute_query(
         self, query: str, params: tuple | None = None
     ) -> list[dict[str, Any]]:
@@ -92,3 +286,210 @@ class PostgreSQLConnector(BaseConnector):
         with conn.cursor(cursor_factory=RealDictCursor) as cursor:
             cursor.execute(query, params or ())
             return cursor.fetchall()
+
+    def stream_query(
+        self,
+        query: str,
+        params: tuple | None = None,
+        fetch_size: int = DEFAULT_FETCH_SIZE,
+    ) -> Iterator[list[dict[str, Any]]]:
+        conn = self.connect()
+        # A named cursor keeps the result set on the server and fetches it
+        # fetch_size rows at a time.
+        cursor = conn.cursor(
+            name=f"stream_{uuid.uuid4().hex}", cursor_factory=RealDictCursor
+        )
+        cursor.itersize = fetch_size
+        try:
+            cursor.execute(query, params or ())
+            while batch := cursor.fetchmany(fetch_size):
+                yield batch
+        finally:
+            cursor.close()
+            # Named cursors live inside a transaction; end it.
+            if not conn.closed and not self._in_snapshot:
+                conn.rollback()
+
+    def copy_rows(
+        self, query: str, params: tuple | None = None
+    ) -> Iterator[list[str | None]]:
+        conn = self.connect()
+        encoding = psycopg2.extensions.encodings.get(conn.encoding, "utf-8")
+        query = query.strip().rstrip(";")
+        with conn.cursor() as cursor:
+            if params:
+                query = cursor.mogrify(query, params).decode(encoding)
+            # Text format keeps NULL (\N) apart from empty strings, which CSV
+            # output does not; it only gained HEADER in PostgreSQL 15, so the
+            # column names come from describing the query.
+            cursor.execute(f"SELECT * FROM ({query}) AS copy_source LIMIT 0")
+            header = [column[0] for column in cursor.description]
+        copy_sql = f"COPY ({query}) TO STDOUT"
+
+        # copy_expert pushes data into a file object; run it on a thread so
+        # rows can be pulled (and masked) while the export is in flight.
+        chunks: queue.Queue = queue.Queue(maxsize=COPY_QUEUE_CHUNKS)
+        stop = threading.Event()
+        sink = _QueueWriter(chunks, stop)
+        errors: list[BaseException] = []
+
+        def run() -> None:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.copy_expert(copy_sql, sink)
+            except _CopyAborted:
+                conn.cancel()
+            except BaseException as exc:
+                errors.append(exc)
+            try:
+                sink.put(None)
+            except _CopyAborted:
+                pass
+
+        def iter_chunks() -> Iterator[bytes]:
+            while (chunk := chunks.get()) is not None:
+                yield chunk
+            if errors:
+                raise errors[0]
+
+        thread = threading.Thread(target=run, name="pg-copy", daemon=True)
+        thread.start()
+        try:
+            text = io.TextIOWrapper(
+                io.BufferedReader(_ChunkReader(iter_chunks())),
+                encoding=encoding,
+                newline="",
+            )
+            yield header
+            # Newlines and tabs inside values are escaped, so lines and tabs
+            # split records and fields.
+            for line in text:
+                yield [_parse_copy_field(field) for field in line[:-1].split("\t")]
+        finally:
+            stop.set()
+            thread.join()
+            if not conn.closed and not self._in_snapshot:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    # An aborted COPY can leave the session unusable.
+                    self.disconnect()
+
+    def write_rows(
+        self, table_name: str, columns: list[str], rows: Iterable[Sequence[Any]]
+    ) -> int:
+        buffer = io.StringIO()
+        count = 0
+        # Lists are JSON unless the target column is an array; the column
+        # types are only looked up once a list shows up.
+        arrays = [False] * len(columns)
+        arrays_known = False
+        for row in rows:
+            if not arrays_known and any(isinstance(value, list) for value in row):
+                types = self._column_types(table_name)
+                arrays = [types.get(name, "").endswith("[]") for name in columns]
+                arrays_known = True
+            buffer.write(
+                "\t".join(
+                    _copy_text(value, array) for value, array in zip(row, arrays)
+                )
+            )
+            buffer.write("\n")
+            count += 1
+        buffer.seek(0)
+
+        table = self.quote_identifier(table_name)
+        column_list = ", ".join(self.quote_identifier(name) for name in columns)
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.copy_expert(f"COPY {table} ({column_list}) FROM STDIN", buffer)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return count
+
+    def update_rows(
+        self,
+        table_name: str,
+        columns: list[str],
+        key_columns: list[str],
+        update_columns: list[str],
+        rows: Iterable[Sequence[Any]],
+        checkpoint: tuple[str, str] | None = None,
+    ) -> int:
+        rows = list(rows)
+        quote = self.quote_identifier
+        value_columns = key_columns + update_columns
+        position = {name: index for index, name in enumerate(columns)}
+        order = [position[name] for name in value_columns]
+        # VALUES columns are typed from their literals, so an all-NULL (or
+        # all-text) column would be text; cast each to the table's type.
+        types = self._column_types(table_name)
+        assignments = ", ".join(
+            f"{quote(c)} = v.{quote(c)}::{types[c]}" for c in update_columns
+        )
+        match = " AND ".join(
+            f"t.{quote(k)} = v.{quote(k)}::{types[k]}" for k in key_columns
+        )
+        statement = (
+            f"UPDATE {quote(table_name)} AS t SET {assignments} "
+            f"FROM (VALUES %s) AS v ({', '.join(quote(c) for c in value_columns)}) "
+            f"WHERE {match}"
+        )
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                execute_values(
+                    cursor,
+                    statement,
+                    [[row[index] for index in order] for row in rows],
+                    page_size=max(len(rows), 1),
+                )
+                if checkpoint is not None:
+                    self._write_checkpoint(cursor, checkpoint)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return len(rows)
+
+    def _column_types(self, table_name: str) -> dict[str, str]:
+        """SQL type of each column of a table (e.g. ``character varying(20)``)."""
+        if self._types_by_table is None:
+            self._types_by_table = {}
+        cache = self._types_by_table
+        if table_name not in cache:
+            rows = self.execute_query(
+                """
+                SELECT attname AS name, format_type(atttypid, atttypmod) AS type
+                FROM pg_attribute
+                WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+                """,
+                (self.quote_identifier(table_name),),
+            )
+            cache[table_name] = {row["name"]: row["type"] for row in rows}
+        return cache[table_name]
+
+    def export_snapshot(self) -> str | None:
+        conn = self.connect()
+        # set_session outlives the transaction; don't hand this session on.
+        self._reusable = False
+        conn.set_session(isolation_level="REPEATABLE READ", readonly=True)
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_export_snapshot()")
+            return cursor.fetchone()[0]
+
+    def import_snapshot(self, snapshot: str | None) -> None:
+        conn = self.connect()
+        self._reusable = False
+        conn.set_session(isolation_level="REPEATABLE READ", readonly=True)
+        with conn.cursor() as cursor:
+            cursor.execute("SET TRANSACTION SNAPSHOT %s", (snapshot,))
+        self._in_snapshot = True
+
+    def release_snapshot(self) -> None:
+        # Importers keep their view once attached; end the exporting transaction.
+        if self._connection and not self._connection.closed:
+            self._connection.rollback()
@@ -0,0 +1,115 @@
+"""
+Scan Result Cache
+
+Caches each table's scan result in Redis against a fingerprint of its
+schema, so rescans of a data source only re-examine tables that changed.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import Any
+
+import redis
+
+from config import settings
+
+from .scanner import MIN_MATCH_RATIO, SENSITIVE_RULES, ScanResult
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "scan_cache:"
+
+# Results classified under different rules must not be reused.
+_RULES_DIGEST = hashlib.sha256(
+    repr(
+        (sorted((k.value, repr(v)) for k, v in SENSITIVE_RULES.items()), MIN_MATCH_RATIO)
+    ).encode()
+).hexdigest()
+
+_redis_client: redis.Redis | None = None
+
+
+def _get_redis() -> redis.Redis:
+    """Lazy-initialise and return the Redis client."""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_connect_timeout=3,
+        )
+    return _redis_client
+
+
+def table_fingerprint(
+    columns: list[dict[str, Any]], row_estimate: int | None, sample_size: int
+) -> str:
+    """
+    Fingerprint the parts of a table a scan result depends on.
+
+    Covers column names and types in order, the row estimate rounded to a
+    power of two (so ordinary growth doesn't invalidate the entry), the
+    sample size and the scanner rules.
+    """
+    payload = json.dumps(
+        {
+            "columns": [[col["name"], str(col.get("type"))] for col in columns],
+            "rows": None if row_estimate is None else int(row_estimate).bit_length(),
+            "sample_size": sample_size,
+            "rules": _RULES_DIGEST,
+        },
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ScanCache:
+    """Scan results of one data source, stored as a single Redis hash.
+
+    ``scope`` identifies the data source (tenant, connector type and
+    connection); it is hashed so credentials never appear in keys.
+    Redis errors are logged and treated as cache misses.
+    """
+
+    def __init__(self, scope: str):
+        self.key = KEY_PREFIX + hashlib.sha256(scope.encode()).hexdigest()
+
+    def get_many(self, fingerprints: dict[str, str]) -> dict[str, ScanResult]:
+        """Return cached results for tables whose fingerprint is unchanged."""
+        if not fingerprints:
+            return {}
+        tables = list(fingerprints)
+        try:
+            entries = _get_redis().hmget(self.key, tables)
+        except redis.RedisError:
+            logger.warning("Scan cache unavailable; scanning every table")
+            return {}
+        results: dict[str, ScanResult] = {}
+        for table, entry in zip(tables, entries):
+            if entry is None:
+                continue
+            cached = json.loads(entry)
+            if cached["fingerprint"] == fingerprints[table]:
+                results[table] = ScanResult.from_dict(cached["result"])
+        return results
+
+    def set_many(self, entries: dict[str, tuple[str, ScanResult]]) -> None:
+        """Store ``table -> (fingerprint, result)`` and refresh the TTL."""
+        if not entries:
+            return
+        mapping = {
+            table: json.dumps(
+                {"fingerprint": fingerprint, "result": result.to_dict()},
+                ensure_ascii=False,
+            )
+            for table, (fingerprint, result) in entries.items()
+        }
+        try:
+            pipe = _get_redis().pipeline()
+            pipe.hset(self.key, mapping=mapping)
+            pipe.expire(self.key, settings.discovery_cache_ttl_seconds)
+            pipe.execute()
+        except redis.RedisError:
+            logger.warning("Could not store scan results in the scan cache")
@@ -0,0 +1,76 @@
+"""
+Sensitive Field Catalog
+
+Persists discovery scan results as ``SensitiveField`` rows so catalog
+queries are answered from the application database, not the sources.
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from models import SensitiveField
+
+# Tables per catalog read, keeping IN lists a reasonable size.
+_TABLE_CHUNK = 500
+
+
+def record_scan(
+    session: Session,
+    tenant_id: uuid.UUID,
+    source_id: uuid.UUID,
+    tables: list[dict[str, Any]],
+) -> int:
+    """
+    Replace the catalog entries of scanned tables with their latest fields.
+
+    Columns no longer found sensitive are removed; tables not in ``tables``
+    are left alone.  The caller commits.
+
+    Args:
+        session: Application database session
+        tenant_id: Tenant owning the data source
+        source_id: Scanned data source
+        tables: Per-table results as built by ``runner.table_result``
+
+    Returns:
+        Number of catalog entries written
+    """
+    now = datetime.utcnow()
+    written = 0
+    for start in range(0, len(tables), _TABLE_CHUNK):
+        chunk = tables[start : start + _TABLE_CHUNK]
+        existing = {
+            (entry.table_name, entry.column_name): entry
+            for entry in session.query(SensitiveField).filter(
+                SensitiveField.tenant_id == tenant_id,
+                SensitiveField.source_id == source_id,
+                SensitiveField.table_name.in_([t["table_name"] for t in chunk]),
+            )
+        }
+        for table in chunk:
+            for found in table["discovered_fields"]:
+                key = (table["table_name"], found["column_name"])
+                entry = existing.pop(key, None)
+                if entry is None:
+                    entry = SensitiveField(
+                        tenant_id=tenant_id,
+                        source_id=source_id,
+                        table_name=key[0],
+                        column_name=key[1],
+                        first_seen_at=now,
+                    )
+                    session.add(entry)
+                entry.data_type = found["data_type"]
+                entry.sensitivity = found["sensitivity"]
+                entry.confidence = found["confidence"]
+                entry.match_reason = found["match_reason"]
+                entry.match_ratio = found.get("match_ratio")
+                entry.last_scanned_at = now
+                written += 1
+        for stale in existing.values():
+            session.delete(stale)
+    return written
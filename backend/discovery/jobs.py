@@ -0,0 +1,66 @@
+"""
+Discovery Scan Jobs
+
+Redis storage for asynchronous scan jobs: the owning tenant, the summary
+and the per-table results, which clients page through once the job is done.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from config import settings
+
+from .cache import _get_redis
+
+KEY_PREFIX = "scan_job:"
+# Results are appended in slices so one job never builds a huge command.
+_RPUSH_BATCH = 500
+
+
+def _key(job_id: str, part: str) -> str:
+    return f"{KEY_PREFIX}{job_id}:{part}"
+
+
+def register_scan_job(job_id: str, tenant_id: str) -> None:
+    """Record the tenant a scan job belongs to."""
+    _get_redis().set(
+        _key(job_id, "tenant"), tenant_id, ex=settings.discovery_job_ttl_seconds
+    )
+
+
+def get_scan_job_tenant(job_id: str) -> str | None:
+    """Tenant a scan job belongs to, or None for unknown or expired jobs."""
+    return _get_redis().get(_key(job_id, "tenant"))
+
+
+def save_scan_results(
+    job_id: str, tables: list[dict[str, Any]], summary: dict[str, Any]
+) -> None:
+    """Store a finished job's per-table results and summary."""
+    ttl = settings.discovery_job_ttl_seconds
+    pipe = _get_redis().pipeline()
+    pipe.delete(_key(job_id, "tables"))
+    for start in range(0, len(tables), _RPUSH_BATCH):
+        pipe.rpush(
+            _key(job_id, "tables"),
+            *(
+                json.dumps(table, ensure_ascii=False)
+                for table in tables[start : start + _RPUSH_BATCH]
+            ),
+        )
+    pipe.expire(_key(job_id, "tables"), ttl)
+    pipe.set(_key(job_id, "summary"), json.dumps(summary), ex=ttl)
+    pipe.execute()
+
+
+def get_scan_summary(job_id: str) -> dict[str, Any] | None:
+    """Summary of a finished job, or None while it is still running."""
+    summary = _get_redis().get(_key(job_id, "summary"))
+    return json.loads(summary) if summary else None
+
+
+def get_scan_results(job_id: str, offset: int, limit: int) -> list[dict[str, Any]]:
+    """One page of a finished job's per-table results, in scan order."""
+    entries = _get_redis().lrange(_key(job_id, "tables"), offset, offset + limit - 1)
+    return [json.loads(entry) for entry in entries]
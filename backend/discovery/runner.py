@@ -0,0 +1,246 @@
+"""
+Data Source Scan Runner
+
+Scans the tables of a data source for sensitive fields.  Shared by the
+synchronous ``/discovery/scan`` endpoint and the Celery scan-job task.
+"""
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from config import settings
+from connectors.base import BaseConnector
+from connectors.factory import create_connector
+
+from .cache import ScanCache, table_fingerprint
+from .scanner import ScanResult, get_sensitivity_distribution, scan_table_schema
+
+
+@dataclass
+class SourceScan:
+    """Outcome of scanning a data source.
+
+    ``tables`` holds one plain dict per table, in scan order, shaped like
+    the API's ``TableScanResult``.
+    """
+    tables: list[dict[str, Any]] = field(default_factory=list)
+    total_columns: int = 0
+    total_sensitive: int = 0
+    overall_distribution: dict[str, float] = field(default_factory=dict)
+    cached_tables: int = 0
+
+    def summary(self) -> dict[str, Any]:
+        """Totals without the per-table results."""
+        return {
+            "total_tables": len(self.tables),
+            "total_columns": self.total_columns,
+            "total_sensitive": self.total_sensitive,
+            "overall_distribution": self.overall_distribution,
+            "cached_tables": self.cached_tables,
+        }
+
+
+def _scan_table(
+    connector: BaseConnector,
+    table_name: str,
+    sample_size: int,
+    columns: list[dict[str, Any]] | None = None,
+) -> tuple[str, list[dict[str, Any]], ScanResult]:
+    """Sample one table (reading its columns unless given) and classify it."""
+    if columns is None:
+        columns = connector.get_columns(table_name)
+
+    # Every sampled value of a column is classified, not just the first row
+    sample_rows = (
+        connector.get_random_sample(table_name, sample_size) if sample_size else None
+    )
+
+    return (
+        table_name,
+        columns,
+        scan_table_schema(table_name, columns, sample_rows=sample_rows),
+    )
+
+
+def scan_tables(
+    connector_type: str,
+    config: dict[str, Any],
+    tables: list[str],
+    sample_size: int,
+    columns_by_table: dict[str, list[dict[str, Any]]] | None = None,
+    on_table: Callable[[str], None] | None = None,
+) -> list[tuple[str, list[dict[str, Any]], ScanResult]]:
+    """
+    Scan tables concurrently, each thread on its own pooled connection.
+
+    Tables found in ``columns_by_table`` skip the per-table column query.
+    ``on_table(table_name)`` is called, one call at a time, as each table
+    finishes.
+
+    Concurrency is capped by ``discovery_scan_concurrency`` and by the data
+    source's pool size, which also bounds connections across concurrent
+    scans of the same source.  Results come back in ``tables`` order.
+    """
+    workers = max(
+        1,
+        min(settings.discovery_scan_concurrency, settings.db_pool_max_size, len(tables)),
+    )
+    local = threading.local()
+    connectors: list[BaseConnector] = []
+    done_lock = threading.Lock()
+
+    def scan(table_name: str):
+        connector = getattr(local, "connector", None)
+        if connector is None:
+            connector = local.connector = create_connector(connector_type, config)
+            connectors.append(connector)
+        columns = (columns_by_table or {}).get(table_name)
+        scanned = _scan_table(connector, table_name, sample_size, columns)
+        if on_table is not None:
+            with done_lock:
+                on_table(table_name)
+        return scanned
+
+    try:
+        with ThreadPoolExecutor(workers, thread_name_prefix="scan") as executor:
+            return list(executor.map(scan, tables))
+    finally:
+        for connector in connectors:
+            connector.disconnect()
+
+
+def table_result(
+    table_name: str, columns: list[dict[str, Any]], scan_result: ScanResult
+) -> dict[str, Any]:
+    """Plain dict form of one table's scan, as returned by the API."""
+    return {
+        "table_name": table_name,
+        "total_columns": scan_result.total_columns,
+        "sensitive_columns": scan_result.sensitive_columns,
+        "columns": [
+            {"name": c["name"], "type": c["type"], "nullable": c["nullable"]}
+            for c in columns
+        ],
+        "discovered_fields": [
+            {
+                "table_name": f.table_name,
+                "column_name": f.column_name,
+                "data_type": f.data_type.value,
+                "sensitivity": f.sensitivity.value,
+                "sample_value": f.sample_value,
+                "match_reason": f.match_reason,
+                "confidence": f.confidence,
+                "match_ratio": f.match_ratio,
+            }
+            for f in scan_result.fields
+        ],
+        "distribution": get_sensitivity_distribution(scan_result),
+    }
+
+
+def scan_source(
+    connector_type: str,
+    config: dict[str, Any],
+    *,
+    tables: list[str] | None = None,
+    sample_size: int = 10,
+    cache_scope: str,
+    force_rescan: bool = False,
+    on_progress: Callable[[int, int, str], None] | None = None,
+) -> SourceScan:
+    """
+    Scan a data source's tables, reusing cached results of unchanged ones.
+
+    Args:
+        connector_type: Connector type (mysql, postgresql)
+        config: Decrypted connection configuration
+        tables: Tables to scan; all tables when None
+        sample_size: Rows sampled per table; 0 classifies names only
+        cache_scope: Identity of the data source in the scan cache
+        force_rescan: Ignore cached results
+        on_progress: Called with ``(tables_done, total_tables, table_name)``
+            as tables finish
+
+    Returns:
+        SourceScan
+
+    Raises:
+        ConnectionError: If the connection test fails
+    """
+    connector = create_connector(connector_type, config)
+    with connector:
+        # Test connection first
+        success, message = connector.test_connection()
+        if not success:
+            raise ConnectionError(message)
+
+        tables_to_scan = tables or connector.get_tables()
+        if not tables_to_scan:
+            return SourceScan()
+
+        # Columns and row estimates of every table in one query each
+        columns_by_table = connector.get_all_columns()
+        row_estimates = connector.get_row_estimates()
+
+    cache = ScanCache(cache_scope)
+    fingerprints = {
+        table: table_fingerprint(
+            columns_by_table[table], row_estimates.get(table), sample_size
+        )
+        for table in tables_to_scan
+        if table in columns_by_table
+    }
+    cached = {} if force_rescan else cache.get_many(fingerprints)
+
+    done = len(cached)
+    total = len(tables_to_scan)
+
+    def table_done(table_name: str) -> None:
+        nonlocal done
+        done += 1
+        if on_progress is not None:
+            on_progress(done, total, table_name)
+
+    # Only tables whose fingerprint changed are examined again.
+    rescanned = scan_tables(
+        connector_type,
+        config,
+        [table for table in tables_to_scan if table not in cached],
+        sample_size,
+        columns_by_table,
+        on_table=table_done,
+    )
+    cache.set_many(
+        {
+            table_name: (fingerprints[table_name], scan_result)
+            for table_name, _, scan_result in rescanned
+            if table_name in fingerprints
+        }
+    )
+    fresh = {entry[0]: entry for entry in rescanned}
+
+    result = SourceScan(cached_tables=len(cached))
+    all_distribution: dict[str, int] = {}
+    for table in tables_to_scan:
+        table_name, columns, scan_result = fresh.get(table) or (
+            table,
+            columns_by_table[table],
+            cached[table],
+        )
+        result.tables.append(table_result(table_name, columns, scan_result))
+        result.total_columns += scan_result.total_columns
+        result.total_sensitive += scan_result.sensitive_columns
+        for level, count in scan_result.summary.items():
+            all_distribution[level] = all_distribution.get(level, 0) + count
+
+    # Calculate overall distribution
+    if result.total_sensitive > 0:
+        result.overall_distribution = {
+            level: (count / result.total_sensitive) * 100
+            for level, count in all_distribution.items()
+        }
+    return result
@@ -7,8 +7,11 @@ based on column names and data patterns.
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass, field
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, field
 from enum import Enum
+from functools import lru_cache
 from typing import Any
 
 
@@ -121,6 +124,7 @@ class DiscoveredField:
     sample_value: str | None = None
     match_reason: str = ""  # keyword or regex match
     confidence: float = 0.0  # 0.0 to 1.0
+    match_ratio: float | None = None  # share of samples matching the regex
 
 
 @dataclass
@@ -137,77 +141,176 @@ class ScanResult:
         level = field.sensitivity.value
         self.summary[level] = self.summary.get(level, 0) + 1
 
+    def to_dict(self) -> dict[str, Any]:
+        """Plain JSON-serializable form, as read back by ``from_dict``."""
+        return {
+            "total_columns": self.total_columns,
+            "fields": [
+                {
+                    **asdict(f),
+                    "data_type": f.data_type.value,
+                    "sensitivity": f.sensitivity.value,
+                }
+                for f in self.fields
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ScanResult:
+        result = cls(total_columns=data["total_columns"])
+        for f in data["fields"]:
+            result.add_field(
+                DiscoveredField(
+                    **{
+                        **f,
+                        "data_type": DataType(f["data_type"]),
+                        "sensitivity": SensitivityLevel(f["sensitivity"]),
+                    }
+                )
+            )
+        return result
+
 
 def _normalize_column_name(name: str) -> str:
     """Normalize column name for matching."""
     return name.lower().replace("_", "").replace("-", "").replace(" ", "")
 
 
-def _match_by_keyword(column_name: str, keywords: list[str]) -> tuple[bool, float]:
-    """
-    Match column name against keywords.
-    Returns (matched, confidence).
+class _KeywordAutomaton:
+    """Aho-Corasick matcher finding every keyword inside a column name.
+
+    Built once from all rule keywords; a search walks the name a single
+    time, however many keywords there are.
     """
-    normalized = _normalize_column_name(column_name)
 
-    for keyword in keywords:
-        norm_keyword = keyword.lower().replace("_", "").replace("-", "")
-        if norm_keyword in normalized:
-            return True, 0.9
+    def __init__(self, keywords: dict[str, set[DataType]]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[frozenset[DataType]] = [frozenset()]
+        for keyword, data_types in keywords.items():
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(frozenset())
+                state = next_state
+            self._out[state] |= data_types
+
+        # Breadth-first, so each failure target is finished before use.
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._out[next_state] |= self._out[self._fail[next_state]]
+                queue.append(next_state)
+
+    def search(self, text: str) -> frozenset[DataType]:
+        """Return the data types of every keyword occurring in ``text``."""
+        found: set[DataType] = set()
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            found |= self._out[state]
+        return frozenset(found)
+
+
+def _build_keyword_automaton() -> _KeywordAutomaton:
+    keywords: dict[str, set[DataType]] = {}
+    for data_type, rule in SENSITIVE_RULES.items():
+        for keyword in rule.get("keywords", []):
+            norm_keyword = keyword.lower().replace("_", "").replace("-", "")
+            keywords.setdefault(norm_keyword, set()).add(data_type)
+    return _KeywordAutomaton(keywords)
+
 
-        # Partial match
-        if len(keyword) >= 3 and keyword.lower() in normalized:
-            return True, 0.7
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+_RULE_REGEXES: dict[DataType, re.Pattern[str]] = {
+    data_type: re.compile(rule["regex"])
+    for data_type, rule in SENSITIVE_RULES.items()
+    if rule.get("regex")
+}
+KEYWORD_CONFIDENCE = 0.9
+REGEX_CONFIDENCE = 0.95
+# Share of non-empty samples that must match a rule's regex
+MIN_MATCH_RATIO = 0.5
 
-    return False, 0.0
 
+@lru_cache(maxsize=65536)
+def _keyword_matches(normalized_name: str) -> frozenset[DataType]:
+    """Data types whose keywords occur in a normalized column name."""
+    return _KEYWORD_AUTOMATON.search(normalized_name)
 
-def _match_by_regex(value: str | None, pattern: str) -> tuple[bool, float]:
-    """
-    Match value against regex pattern.
-    Returns (matched, confidence).
-    """
-    if not value:
-        return False, 0.0
 
-    try:
-        if re.match(pattern, str(value).strip()):
-            return True, 0.95
-    except re.error:
-        pass
+def match_ratios(values: Sequence[Any]) -> dict[DataType, float]:
+    """
+    Fraction of non-empty sample values matching each rule's regex.
 
-    return False, 0.0
+    Each distinct value is tested once against the compiled patterns.
+    """
+    counts = Counter(
+        text for text in (str(value).strip() for value in values if value) if text
+    )
+    total = sum(counts.values())
+    hits: dict[DataType, int] = {}
+    for text, count in counts.items():
+        for data_type, pattern in _RULE_REGEXES.items():
+            if pattern.match(text):
+                hits[data_type] = hits.get(data_type, 0) + count
+    return {data_type: hit / total for data_type, hit in hits.items()}
 
 
 def discover_sensitive_field(
     column_name: str,
     sample_value: str | None = None,
+    sample_values: Sequence[Any] | None = None,
 ) -> DiscoveredField | None:
     """
-    Discover if a column is sensitive based on name and optional sample value.
+    Discover if a column is sensitive based on name and optional sample values.
+
+    A rule's regex counts as matched when at least ``MIN_MATCH_RATIO`` of
+    the non-empty samples match it; its confidence scales with that ratio.
 
     Args:
         column_name: The column/field name
         sample_value: Optional sample value for regex matching
+        sample_values: Optional sampled values, used instead of sample_value
 
     Returns:
         DiscoveredField if sensitive, None otherwise
     """
     best_match: DiscoveredField | None = None
     best_confidence = 0.0
+    if sample_values is None:
+        sample_values = [sample_value] if sample_value else []
+    elif sample_value is None:
+        sample_value = next((str(value) for value in sample_values if value), None)
+    keyword_hits = _keyword_matches(_normalize_column_name(column_name))
+    if not keyword_hits and not sample_value:
+        return None
+    ratios = match_ratios(sample_values) if sample_value else {}
 
     for data_type, rule in SENSITIVE_RULES.items():
-        keywords = rule.get("keywords", [])
-        regex = rule.get("regex")
+        regex = _RULE_REGEXES.get(data_type)
         sensitivity = rule.get("sensitivity", SensitivityLevel.L2)
 
         # Try keyword match
-        keyword_matched, keyword_conf = _match_by_keyword(column_name, keywords)
+        keyword_matched = data_type in keyword_hits
+        keyword_conf = KEYWORD_CONFIDENCE if keyword_matched else 0.0
 
-        # Try regex match if sample value provided
-        regex_matched, regex_conf = False, 0.0
-        if regex and sample_value:
-            regex_matched, regex_conf = _match_by_regex(sample_value, regex)
+        # Try regex match if sample values provided
+        match_ratio = ratios.get(data_type, 0.0) if regex and sample_value else None
+        regex_matched = bool(match_ratio) and match_ratio >= MIN_MATCH_RATIO
+        regex_conf = REGEX_CONFIDENCE * match_ratio if regex_matched else 0.0
 
         # Calculate final confidence
         if keyword_matched and regex_matched:
@@ -233,6 +336,7 @@ def discover_sensitive_field(
                 sample_value=sample_value[:50] + "..." if sample_value and len(sample_value) > 50 else sample_value,
                 match_reason=match_reason,
                 confidence=confidence,
+                match_ratio=match_ratio,
             )
 
     return best_match
@@ -242,6 +346,7 @@ def scan_table_schema(
     table_name: str,
     columns: list[dict[str, Any]],
     samples: dict[str, str | None] | None = None,
+    sample_rows: list[dict[str, Any]] | None = None,
 ) -> ScanResult:
     """
     Scan a table schema for sensitive columns.
@@ -250,6 +355,8 @@ def scan_table_schema(
         table_name: Table name
         columns: List of column info [{"name": "col1", "type": "varchar"}, ...]
         samples: Optional sample values {"col1": "sample_value", ...}
+        sample_rows: Optional sampled rows; every value of a column is
+            classified, taking precedence over ``samples``
 
     Returns:
         ScanResult with discovered sensitive fields
@@ -259,8 +366,13 @@ def scan_table_schema(
     for col in columns:
         col_name = col.get("name", "")
         sample = (samples or {}).get(col_name)
+        values = (
+            [row.get(col_name) for row in sample_rows]
+            if sample_rows is not None
+            else None
+        )
 
-        discovered = discover_sensitive_field(col_name, sample)
+        discovered = discover_sensitive_field(col_name, sample, values)
         if discovered:
             discovered.table_name = table_name
             result.add_field(discovered)
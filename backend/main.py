@@ -381,6 +381,11 @@ async def websocket_status(websocket: WebSocket, task_id: str):
     await pubsub.subscribe(f"task_progress:{task_id}")
 
     try:
+        # Progress events are throttled, so replay the last one for clients
+        # that connect between publishes.
+        latest = await r.get(f"task_progress:{task_id}:latest")
+        if latest:
+            await websocket.send_text(latest.decode("utf-8"))
         async for message in pubsub.listen():
             if message["type"] == "message":
                 # Redis message data is bytes, decode it
@@ -8,9 +8,11 @@ from __future__ import annotations
 
 import ast
 import operator
+from collections.abc import Callable, Mapping, Sequence
+from functools import lru_cache, partial
 from typing import Any
 
-from .rules import MaskingStrategy, get_masking_strategy
+from .rules import MaskingStrategy, MaskMemo, get_masking_strategy
 
 # ---------------------------------------------------------------------------
 # Safe condition evaluator – replaces the former eval()-based approach
@@ -70,61 +72,122 @@ def _validate_ast(node: ast.AST) -> None:
             )
 
 
-def _eval_node(node: ast.AST, variables: dict[str, Any]) -> Any:
-    """Recursively evaluate a validated AST node against *variables*."""
+_NAME_CONSTANTS: dict[str, Any] = {"None": None, "True": True, "False": False}
 
-    if isinstance(node, ast.Expression):
-        return _eval_node(node.body, variables)
 
-    if isinstance(node, ast.Constant):
-        return node.value
+def _contains(left: Any, right: Any) -> bool:
+    return right is not None and left in right
 
-    if isinstance(node, ast.Name):
-        if node.id == "None":
-            return None
-        if node.id == "True":
-            return True
-        if node.id == "False":
-            return False
+
+def _not_contains(left: Any, right: Any) -> bool:
+    return right is not None and left not in right
+
+
+_MEMBERSHIP_OPERATORS: dict[type, Any] = {
+    ast.In: _contains,
+    ast.NotIn: _not_contains,
+}
+
+Evaluator = Callable[[Any], Any]
+
+
+def _mapping_getter(name: str) -> Evaluator:
+    def get(row: Mapping[str, Any]) -> Any:
         try:
-            return variables[node.id]
+            return row[name]
         except KeyError:
-            raise ValueError(f"Unknown column reference: {node.id!r}")
+            raise ValueError(f"Unknown column reference: {name!r}")
+
+    return get
+
+
+def _positional_getter(name: str, positions: dict[str, int]) -> Evaluator:
+    if name not in positions:
+
+        def missing(row: Sequence[Any]) -> Any:
+            raise ValueError(f"Unknown column reference: {name!r}")
+
+        return missing
+    return operator.itemgetter(positions[name])
+
+
+def _compile_node(node: ast.AST, resolve: Callable[[str], Evaluator]) -> Evaluator:
+    """Turn a validated AST node into a closure evaluated against a row."""
+
+    if isinstance(node, ast.Constant):
+        value = node.value
+        return lambda row: value
+
+    if isinstance(node, ast.Name):
+        if node.id in _NAME_CONSTANTS:
+            value = _NAME_CONSTANTS[node.id]
+            return lambda row: value
+        return resolve(node.id)
 
     if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
-        return not _eval_node(node.operand, variables)
+        operand = _compile_node(node.operand, resolve)
+        return lambda row: not operand(row)
 
     if isinstance(node, ast.BoolOp):
+        parts = [_compile_node(v, resolve) for v in node.values]
         if isinstance(node.op, ast.And):
-            return all(_eval_node(v, variables) for v in node.values)
+            return lambda row: all(part(row) for part in parts)
         if isinstance(node.op, ast.Or):
-            return any(_eval_node(v, variables) for v in node.values)
+            return lambda row: any(part(row) for part in parts)
 
     if isinstance(node, ast.Compare):
-        left = _eval_node(node.left, variables)
+        left = _compile_node(node.left, resolve)
+        pairs = []
         for op_node, comparator in zip(node.ops, node.comparators):
-            right = _eval_node(comparator, variables)
-            op_func = _CMP_OPERATORS.get(type(op_node))
+            op_func = _CMP_OPERATORS.get(type(op_node)) or _MEMBERSHIP_OPERATORS.get(
+                type(op_node)
+            )
             if op_func is None:
-                if isinstance(op_node, ast.In):
-                    if right is None or left not in right:
-                        return False
-                elif isinstance(op_node, ast.NotIn):
-                    if right is None or left in right:
-                        return False
-                else:
-                    raise UnsafeExpressionError(
-                        f"Unsupported comparison: {type(op_node).__name__}"
-                    )
-            else:
-                if not op_func(left, right):
+                raise UnsafeExpressionError(
+                    f"Unsupported comparison: {type(op_node).__name__}"
+                )
+            pairs.append((op_func, _compile_node(comparator, resolve)))
+
+        def compare(row: Any) -> bool:
+            left_value = left(row)
+            for op_func, right in pairs:
+                right_value = right(row)
+                if not op_func(left_value, right_value):
                     return False
-            left = right
-        return True
+                left_value = right_value
+            return True
+
+        return compare
 
     raise UnsafeExpressionError(f"Cannot evaluate node: {type(node).__name__}")
 
 
+@lru_cache(maxsize=1024)
+def compile_condition(
+    condition: str, columns: tuple[str, ...] | None = None
+) -> Callable[[Any], bool]:
+    """Parse, validate and compile a condition expression once.
+
+    The returned evaluator takes a mapping of column -> value, or, when
+    *columns* is given, a positional row laid out in that order.  Compiled
+    evaluators are cached per (condition, columns), so rules sharing an
+    expression share one evaluator.
+
+    Raises ``UnsafeExpressionError`` or ``SyntaxError`` for expressions
+    ``safe_eval_condition`` would reject; unknown column references raise
+    ``ValueError`` when evaluated.
+    """
+    tree = ast.parse(condition, mode="eval")
+    _validate_ast(tree)
+    if columns is None:
+        resolve = _mapping_getter
+    else:
+        positions = {name: index for index, name in enumerate(columns)}
+        resolve = partial(_positional_getter, positions=positions)
+    evaluate = _compile_node(tree.body, resolve)
+    return lambda row: bool(evaluate(row))
+
+
 def safe_eval_condition(condition: str, row: dict[str, Any]) -> bool:
     """Safely evaluate a condition expression against a row of data.
 
@@ -138,9 +201,34 @@ def safe_eval_condition(condition: str, row: dict[str, Any]) -> bool:
     Raises ``UnsafeExpressionError`` if the expression contains disallowed
     constructs (function calls, attribute access, etc.).
     """
-    tree = ast.parse(condition, mode="eval")
-    _validate_ast(tree)
-    return bool(_eval_node(tree, row))
+    return compile_condition(condition)(row)
+
+
+def _always_apply(row: Any) -> bool:
+    return True
+
+
+def _fail_closed(evaluate: Callable[[Any], bool]) -> Callable[[Any], bool]:
+    """Wrap an evaluator so evaluation errors apply the rule."""
+
+    def guarded(row: Any) -> bool:
+        try:
+            return evaluate(row)
+        except (UnsafeExpressionError, ValueError):
+            return True
+
+    return guarded
+
+
+def _compile_fail_closed(
+    condition: str, columns: tuple[str, ...] | None = None
+) -> Callable[[Any], bool]:
+    try:
+        return _fail_closed(compile_condition(condition, columns))
+    except (UnsafeExpressionError, SyntaxError, ValueError):
+        # If the condition is malformed or unsafe, default to applying
+        # the rule (fail-closed).
+        return _always_apply
 
 
 class MaskingRule:
@@ -167,6 +255,9 @@ class MaskingRule:
         self.params = params or {}
         self.condition = condition
         self._strategy: MaskingStrategy | None = None
+        self._memo: MaskMemo | None = None
+        self._condition_source: str | None = None
+        self._condition_check: Callable[[Any], bool] = _always_apply
 
     @property
     def strategy(self) -> MaskingStrategy:
@@ -175,21 +266,50 @@ class MaskingRule:
             self._strategy = get_masking_strategy(self.masking_type)
         return self._strategy
 
+    @property
+    def memo(self) -> MaskMemo | None:
+        """This column's memo of masked values, for memoizable strategies."""
+        if self._memo is None and self.strategy.memoizable:
+            self._memo = MaskMemo(
+                partial(self.strategy.mask, params=self.params),
+                partial(self.strategy.mask_batch, params=self.params),
+            )
+        return self._memo
+
+    def maskers(self) -> tuple[Callable[[Any], Any], Callable[[Sequence[Any]], list[Any]]]:
+        """``(mask, mask_batch)`` for this rule, going through the memo if any."""
+        memo = self.memo
+        if memo is not None:
+            return memo.mask, memo.mask_batch
+        return (
+            partial(self.strategy.mask, params=self.params),
+            partial(self.strategy.mask_batch, params=self.params),
+        )
+
     def apply(self, value: Any) -> Any:
         """Apply masking to a value."""
+        memo = self.memo
+        if memo is not None:
+            return memo.mask(value)
         return self.strategy.mask(value, self.params)
 
+    def apply_batch(self, values: Sequence[Any]) -> list[Any]:
+        """Apply masking to a column chunk."""
+        memo = self.memo
+        if memo is not None:
+            return memo.mask_batch(values)
+        return self.strategy.mask_batch(values, self.params)
+
     def should_apply(self, row: dict[str, Any]) -> bool:
         """Check if masking should be applied based on condition."""
         if not self.condition:
             return True
 
-        try:
-            return safe_eval_condition(self.condition, row)
-        except (UnsafeExpressionError, SyntaxError, ValueError):
-            # If the condition is malformed or unsafe, default to applying
-            # the rule (fail-closed).
-            return True
+        if self._condition_source != self.condition:
+            # Parse and validate once per condition, not once per row.
+            self._condition_check = _compile_fail_closed(self.condition)
+            self._condition_source = self.condition
+        return self._condition_check(row)
 
     def to_dict(self) -> dict[str, Any]:
         """Convert rule to dictionary."""
@@ -262,6 +382,34 @@ class MaskingEngine:
         """Apply masking rules to multiple rows."""
         return [self.apply_to_row(row, skip_unmatched) for row in rows]
 
+    def apply_to_batch(
+        self, columns: Sequence[str], rows: Sequence[Sequence[Any]]
+    ) -> list[list[Any]]:
+        """
+        Apply masking rules column-by-column to a batch of positional rows.
+
+        Convenience wrapper around ``compile(columns).apply_batch(rows)``;
+        callers masking many batches against one header should compile once.
+        """
+        return self.compile(columns).apply_batch(rows)
+
+    def compile(self, columns: Sequence[str]) -> "MaskingPlan":
+        """Resolve rules against a header into a positional masking plan."""
+        steps = []
+        for index, col_name in enumerate(columns):
+            rule = self.get_rule(col_name)
+            if rule is not None:
+                steps.append((index, rule))
+        return MaskingPlan(columns, steps)
+
+    def cache_stats(self) -> dict[str, dict[str, int]]:
+        """Memo hit/miss counts per column, for rules that used a memo."""
+        return {
+            rule.column_name: rule._memo.stats()
+            for rule in self.rules.values()
+            if rule._memo is not None
+        }
+
     def get_rules_summary(self) -> list[dict[str, Any]]:
         """Get summary of all rules."""
         return [rule.to_dict() for rule in self.rules.values()]
@@ -278,3 +426,115 @@ class MaskingEngine:
             rule = MaskingRule.from_dict(rule_data)
             engine.add_rule(rule)
         return engine
+
+
+class MaskingPlan:
+    """Masking rules bound to column positions for one header.
+
+    Built by ``MaskingEngine.compile``.  Rule lookup, name normalisation and
+    strategy resolution happen once; rows are then masked as lists or tuples
+    without building per-row dictionaries.
+    """
+
+    def __init__(
+        self, columns: Sequence[str], steps: Sequence[tuple[int, MaskingRule]]
+    ):
+        self.columns = list(columns)
+        self.width = len(self.columns)
+        self.rules = [rule for _, rule in steps]
+        # Conditions are compiled against column positions, and rules that
+        # share an expression share one evaluator so it runs once per row.
+        self._conditions: dict[str, Callable[[Sequence[Any]], bool]] = {}
+        header = tuple(self.columns)
+        for _, rule in steps:
+            if rule.condition and rule.condition not in self._conditions:
+                self._conditions[rule.condition] = _compile_fail_closed(
+                    rule.condition, header
+                )
+        self._steps = [
+            (index, *rule.maskers(), rule.condition or None) for index, rule in steps
+        ]
+
+    @property
+    def masked_columns(self) -> list[str]:
+        """Names of the columns that have a rule."""
+        return [self.columns[index] for index, *_ in self._steps]
+
+    def _pad(self, row: Sequence[Any]) -> list[Any]:
+        width = self.width
+        if len(row) == width:
+            return list(row)
+        return list(row[:width]) + [""] * (width - len(row))
+
+    def apply_row(self, row: Sequence[Any]) -> list[Any]:
+        """
+        Mask one positional row.
+
+        Rows are padded or truncated to the header width (missing cells
+        become ``""``).  Conditions see the unmasked row.
+        """
+        source = self._pad(row)
+        masked = list(source)
+        outcomes: dict[str, bool] = {}
+        for index, mask, _, condition in self._steps:
+            if condition is not None:
+                if condition not in outcomes:
+                    outcomes[condition] = self._conditions[condition](source)
+                if not outcomes[condition]:
+                    continue
+            masked[index] = mask(source[index])
+        return masked
+
+    def apply_batch(self, rows: Sequence[Sequence[Any]]) -> list[list[Any]]:
+        """Mask a batch of positional rows, one ``mask_batch`` call per column."""
+        if not self.width:
+            return [[] for _ in rows]
+        padded = [self._pad(row) for row in rows]
+        if not padded:
+            return []
+
+        columns = [list(column) for column in zip(*padded)]
+        selections: dict[str, list[int]] = {}
+        for index, _, mask_batch, condition in self._steps:
+            values = columns[index]
+            if condition is None:
+                columns[index] = mask_batch(values)
+                continue
+
+            if condition not in selections:
+                evaluate = self._conditions[condition]
+                selections[condition] = [
+                    row_index
+                    for row_index, row in enumerate(padded)
+                    if evaluate(row)
+                ]
+            selected = selections[condition]
+            masked = mask_batch([values[row_index] for row_index in selected])
+            for row_index, value in zip(selected, masked):
+                values[row_index] = value
+
+        return [list(row) for row in zip(*columns)]
+
+
+def merge_cache_stats(
+    total: dict[str, dict[str, int]], stats: dict[str, dict[str, int]]
+) -> dict[str, dict[str, int]]:
+    """Add per-column memo counts (e.g. from pool workers) into ``total``."""
+    for column, counts in stats.items():
+        merged = total.setdefault(column, {"hits": 0, "misses": 0})
+        merged["hits"] += counts["hits"]
+        merged["misses"] += counts["misses"]
+    return total
+
+
+def cache_hit_ratios(stats: dict[str, dict[str, int]]) -> dict[str, dict[str, Any]]:
+    """Per-column memo counts with their hit ratio, as reported by tasks."""
+    return {
+        column: {
+            **counts,
+            "hit_ratio": round(
+                counts["hits"] / max(counts["hits"] + counts["misses"], 1), 4
+            ),
+        }
+        for column, counts in stats.items()
+    }
@@ -0,0 +1,241 @@
+"""
+Masking Pushdown Planner
+
+Translates masking rules into SQL expressions so that simple strategies run
+inside the source database instead of in the worker.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from .engine import MaskingEngine, MaskingRule
+
+PUSHDOWN_DIALECTS = ("postgresql", "mysql")
+# Column types whose values reach Python as the same string SQL sees.  Other
+# types are cast to text differently (0/false, float and decimal formatting)
+# and fixed-width CHAR is blank-padded, so their rules stay in Python.
+TEXT_TYPES = frozenset(
+    {
+        "text",
+        "character varying",
+        "varchar",
+        "citext",
+        "tinytext",
+        "mediumtext",
+        "longtext",
+    }
+)
+
+
+def is_text_type(column_type: str | None) -> bool:
+    """True for ``get_columns`` types listed in ``TEXT_TYPES``, any length."""
+    return (column_type or "").split("(", 1)[0].strip().lower() in TEXT_TYPES
+
+
+class _Dialect:
+    """SQL building blocks shared by the supported databases."""
+
+    def text(self, column: str) -> str:
+        return f"CAST({column} AS TEXT)"
+
+    def regexp_replace_all(self, value: str, pattern: str, replacement: str) -> str:
+        return f"REGEXP_REPLACE({value}, '{pattern}', '{replacement}', 'g')"
+
+    def regexp_substr(self, value: str, pattern: str) -> str:
+        return f"SUBSTRING({value} FROM '{pattern}')"
+
+    def sha256_hex(self, value: str) -> str:
+        return f"ENCODE(SHA256(CONVERT_TO({value}, 'UTF8')), 'hex')"
+
+
+class _MySQLDialect(_Dialect):
+    def text(self, column: str) -> str:
+        return f"CAST({column} AS CHAR)"
+
+    def regexp_replace_all(self, value: str, pattern: str, replacement: str) -> str:
+        return f"REGEXP_REPLACE({value}, '{pattern}', '{replacement}')"
+
+    def regexp_substr(self, value: str, pattern: str) -> str:
+        return f"REGEXP_SUBSTR({value}, '{pattern}')"
+
+    def sha256_hex(self, value: str) -> str:
+        return f"SHA2({value}, 256)"
+
+
+_DIALECTS: dict[str, _Dialect] = {
+    "postgresql": _Dialect(),
+    "mysql": _MySQLDialect(),
+}
+
+
+def _keep_ends(text: str, keep_start: int, keep_end: int) -> str:
+    # Strings no longer than the kept ends are fully starred, as in Python.
+    length = f"CHAR_LENGTH({text})"
+    keep = keep_start + keep_end
+    kept = f"LEFT({text}, {keep_start})"
+    if keep_end:
+        kept = f"CONCAT({kept}, REPEAT('*', {length} - {keep}), RIGHT({text}, {keep_end}))"
+    else:
+        kept = f"CONCAT({kept}, REPEAT('*', {length} - {keep}))"
+    return f"CASE WHEN {length} <= {keep} THEN REPEAT('*', {length}) ELSE {kept} END"
+
+
+def _phone(text: str, dialect: _Dialect) -> str:
+    # Keep the first 3 and last 4 digits; separators are left in place.
+    digits = f"CHAR_LENGTH({dialect.regexp_replace_all(text, '[^0-9]', '')})"
+    head = dialect.regexp_substr(text, "^[^0-9]*[0-9][^0-9]*[0-9][^0-9]*[0-9]")
+    tail = dialect.regexp_substr(
+        text, "[0-9][^0-9]*[0-9][^0-9]*[0-9][^0-9]*[0-9][^0-9]*$"
+    )
+    middle = (
+        f"SUBSTRING({text}, CHAR_LENGTH({head}) + 1, "
+        f"CHAR_LENGTH({text}) - CHAR_LENGTH({head}) - CHAR_LENGTH({tail}))"
+    )
+    return (
+        f"CASE WHEN {digits} < 4 THEN REPEAT('*', CHAR_LENGTH({text})) "
+        f"WHEN {digits} <= 7 THEN {text} "
+        f"ELSE CONCAT({head}, {dialect.regexp_replace_all(middle, '[0-9]', '*')}, {tail}) END"
+    )
+
+
+def rule_to_sql(
+    rule: MaskingRule, column: str, dialect: str
+) -> tuple[str, list[Any]] | None:
+    """
+    Translate a masking rule into a SQL expression over ``column``.
+
+    Args:
+        rule: Masking rule to translate
+        column: Quoted column reference
+        dialect: Database dialect ("postgresql" or "mysql")
+
+    Returns:
+        ``(expression, params)`` with ``%s`` placeholders, or None when the
+        rule cannot be expressed in SQL (conditional rules and strategies
+        without a SQL form).  Matches the Python strategies for text values
+        only, except that only spaces are trimmed where Python strips
+        whitespace; ``plan_pushdown`` applies it to text columns alone.
+    """
+    sql = _DIALECTS.get(dialect)
+    if sql is None or rule.condition:
+        return None
+
+    text = sql.text(column)
+    masking_type = rule.masking_type
+    params: list[Any] = []
+    if masking_type == "nullify":
+        return "NULL", params
+    if masking_type == "replace":
+        return "%s", [rule.params.get("replace_value", "***REDACTED***")]
+    if masking_type == "redact":
+        masked = f"REPEAT('*', CHAR_LENGTH({text}))"
+    elif masking_type == "id_card":
+        masked = _keep_ends(f"TRIM({text})", 2, 2)
+    elif masking_type == "address":
+        masked = _keep_ends(f"TRIM({text})", 6, 0)
+    elif masking_type == "phone":
+        masked = _phone(text, sql)
+    elif masking_type == "hash":
+        masked = sql.sha256_hex(f"CONCAT({text}, %s)")
+        params.append(rule.params.get("salt", ""))
+    else:
+        return None
+
+    # Every strategy maps NULL and empty input to an empty string.
+    return f"CASE WHEN {column} IS NULL OR {text} = '' THEN '' ELSE {masked} END", params
+
+
+class PushdownPlan:
+    """Split of a table's masking rules into SQL expressions and leftovers.
+
+    Built by ``plan_pushdown``.  ``select_list`` has one expression per
+    column: the masked expression for pushed rules, the plain column
+    otherwise.  ``residual`` holds the rules that still need Python.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        select_list: Sequence[str],
+        params: Sequence[Any],
+        pushed: Sequence[str],
+        residual: MaskingEngine,
+        quote: Callable[[str], str],
+    ):
+        self.columns = list(columns)
+        self.select_list = list(select_list)
+        self.params = list(params)
+        self.pushed = list(pushed)
+        self.residual = residual
+        self._quote = quote
+
+    @property
+    def fully_pushed(self) -> bool:
+        """True when no rule needs Python."""
+        return not self.residual.rules
+
+    def select_sql(self, table_name: str) -> str:
+        """``SELECT`` returning the table with pushed rules applied."""
+        expressions = ", ".join(
+            f"{expression} AS {self._quote(name)}"
+            for name, expression in zip(self.columns, self.select_list)
+        )
+        return f"SELECT {expressions} FROM {self._quote(table_name)}"
+
+    def insert_select_sql(self, source_table: str, target_table: str) -> str:
+        """``INSERT ... SELECT`` copying masked rows into an existing table."""
+        column_list = ", ".join(self._quote(name) for name in self.columns)
+        return (
+            f"INSERT INTO {self._quote(target_table)} ({column_list}) "
+            f"{self.select_sql(source_table)}"
+        )
+
+    def create_table_sql(self, source_table: str, target_table: str) -> str:
+        """``CREATE TABLE ... AS SELECT`` creating the masked copy."""
+        return f"CREATE TABLE {self._quote(target_table)} AS {self.select_sql(source_table)}"
+
+
+def plan_pushdown(
+    engine: MaskingEngine,
+    columns: Sequence[dict[str, Any]],
+    dialect: str,
+    quote: Callable[[str], str],
+) -> PushdownPlan:
+    """
+    Plan which of an engine's rules run as SQL for a table's columns.
+
+    Only rules on text-typed columns are pushed down; the rest run in Python.
+
+    Args:
+        engine: Masking engine holding the rules
+        columns: Table columns as returned by ``get_columns``, in table order
+        dialect: Database dialect ("postgresql" or "mysql")
+        quote: Identifier quoting function of the source connector
+
+    Returns:
+        PushdownPlan
+    """
+    names = [col["name"] for col in columns]
+    select_list: list[str] = []
+    params: list[Any] = []
+    pushed: list[str] = []
+    residual = MaskingEngine()
+    for col in columns:
+        name = col["name"]
+        column = quote(name)
+        rule = engine.get_rule(name)
+        translated = None
+        if rule is not None and is_text_type(col.get("type")):
+            translated = rule_to_sql(rule, column, dialect)
+        if translated is None:
+            select_list.append(column)
+            if rule is not None:
+                residual.add_rule(rule)
+            continue
+        expression, expression_params = translated
+        select_list.append(expression)
+        params.extend(expression_params)
+        pushed.append(name)
+    return PushdownPlan(names, select_list, params, pushed, residual, quote)
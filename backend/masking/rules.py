@@ -6,9 +6,12 @@ Provides various data masking strategies and a rule engine for applying them.
 from __future__ import annotations
 
 import hashlib
+import hmac
 import random
 import string
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
 from enum import Enum
 from typing import Any
 
@@ -17,7 +20,8 @@ class MaskingType(str, Enum):
     """Types of masking strategies."""
     MASK = "mask"  # Replace with * or other character
     REPLACE = "replace"  # Replace with fixed value
-    HASH = "hash"  # SHA256 hash
+    TOKENIZE = "tokenize"  # Stable pseudonym from a token vault
+    HASH = "hash"  # SHA256 hash or keyed hash
     ENCRYPT = "encrypt"  # Format-preserving encryption
     REDACT = "redact"  # Complete redaction
     GENERALIZE = "generalize"  # Reduce precision (e.g., age ranges)
@@ -25,14 +29,33 @@ class MaskingType(str, Enum):
     NULLIFY = "nullify"  # Set to NULL/empty
 
 
+# Masked values remembered per column by memoizable strategies
+DEFAULT_MEMO_SIZE = 65536
+
+
 class MaskingStrategy(ABC):
     """Base class for masking strategies."""
 
+    # Deterministic strategies costly enough that repeated values in a
+    # column are worth remembering (see ``MaskMemo``).
+    memoizable = False
+
     @abstractmethod
     def mask(self, value: Any, params: dict[str, Any] | None = None) -> Any:
         """Apply masking to a value."""
         pass
 
+    def mask_batch(
+        self, values: Sequence[Any], params: dict[str, Any] | None = None
+    ) -> list[Any]:
+        """Apply masking to a column chunk.
+
+        Must return the same results as calling ``mask`` on each value.
+        Strategies override this when they can skip per-value overhead.
+        """
+        mask = self.mask
+        return [mask(value, params) for value in values]
+
     @property
     @abstractmethod
     def masking_type(self) -> MaskingType:
@@ -93,6 +116,24 @@ class PhoneMasking(MaskingStrategy):
 
         return "".join(result)
 
+    def mask_batch(
+        self, values: Sequence[Any], params: dict[str, Any] | None = None
+    ) -> list[str]:
+        result = []
+        append = result.append
+        for value in values:
+            if not value:
+                append("")
+                continue
+            text = value if isinstance(value, str) else str(value)
+            # Plain digit strings are the common case and keep the first 3
+            # and last 4 digits; anything with separators takes the slow path.
+            if len(text) >= 7 and text.isdigit():
+                append(f"{text[:3]}{'*' * (len(text) - 7)}{text[-4:]}")
+            else:
+                append(self.mask(text))
+        return result
+
     @property
     def masking_type(self) -> MaskingType:
         return MaskingType.MASK
@@ -112,6 +153,22 @@ class IDCardMasking(MaskingStrategy):
         # Keep first 2 and last 2
         return f"{text[:2]}{'*' * (len(text) - 4)}{text[-2:]}"
 
+    def mask_batch(
+        self, values: Sequence[Any], params: dict[str, Any] | None = None
+    ) -> list[str]:
+        result = []
+        append = result.append
+        for value in values:
+            if not value:
+                append("")
+                continue
+            text = str(value).strip()
+            if len(text) <= 4:
+                append("*" * len(text))
+            else:
+                append(f"{text[:2]}{'*' * (len(text) - 4)}{text[-2:]}")
+        return result
+
     @property
     def masking_type(self) -> MaskingType:
         return MaskingType.MASK
@@ -157,6 +214,22 @@ class AddressMasking(MaskingStrategy):
 
         return f"{text[:6]}{'*' * (len(text) - 6)}"
 
+    def mask_batch(
+        self, values: Sequence[Any], params: dict[str, Any] | None = None
+    ) -> list[str]:
+        result = []
+        append = result.append
+        for value in values:
+            if not value:
+                append("")
+                continue
+            text = str(value).strip()
+            if len(text) <= 6:
+                append("*" * len(text))
+            else:
+                append(f"{text[:6]}{'*' * (len(text) - 6)}")
+        return result
+
     @property
     def masking_type(self) -> MaskingType:
         return MaskingType.MASK
@@ -165,6 +238,8 @@ class AddressMasking(MaskingStrategy):
 class HashMasking(MaskingStrategy):
     """SHA256 hash masking with optional salt."""
 
+    memoizable = True
+
     def mask(self, value: Any, params: dict[str, Any] | None = None) -> str:
         if not value:
             return ""
@@ -179,6 +254,81 @@ class HashMasking(MaskingStrategy):
         return MaskingType.HASH
 
 
+class KeyedHashMasking(MaskingStrategy):
+    """Keyed hash masking: BLAKE2b in keyed mode, or HMAC-SHA256.
+
+    Unlike ``hash``, the secret is a real MAC key rather than an appended
+    salt.  Params: ``key`` (required), ``algorithm`` (``blake2b`` or
+    ``hmac_sha256``, default ``blake2b``).
+    """
+
+    memoizable = True
+
+    def mask(self, value: Any, params: dict[str, Any] | None = None) -> str:
+        if not value:
+            return ""
+        return self._hasher(params)(str(value).encode())
+
+    def mask_batch(
+        self, values: Sequence[Any], params: dict[str, Any] | None = None
+    ) -> list[str]:
+        digest = self._hasher(params)
+        return [digest(str(value).encode()) if value else "" for value in values]
+
+    @staticmethod
+    def _hasher(params: dict[str, Any] | None) -> Callable[[bytes], str]:
+        params = params or {}
+        key = params.get("key")
+        if not key:
+            raise ValueError("keyed_hash masking requires a 'key' param")
+        key = key.encode() if isinstance(key, str) else bytes(key)
+        algorithm = params.get("algorithm", "blake2b")
+        if algorithm == "blake2b":
+            if len(key) > hashlib.blake2b.MAX_KEY_SIZE:
+                raise ValueError(
+                    f"blake2b keys are at most {hashlib.blake2b.MAX_KEY_SIZE} bytes"
+                )
+            return lambda data: hashlib.blake2b(
+                data, key=key, digest_size=32
+            ).hexdigest()
+        if algorithm == "hmac_sha256":
+            return lambda data: hmac.new(key, data, hashlib.sha256).hexdigest()
+        raise ValueError(f"Unknown keyed_hash algorithm: {algorithm}")
+
+    @property
+    def masking_type(self) -> MaskingType:
+        return MaskingType.HASH
+
+
+class TokenizeMasking(MaskingStrategy):
+    """Replace values with random tokens kept in a persistent vault.
+
+    The same value gets the same token across tables and runs sharing the
+    ``namespace`` param (default ``default``), so joins survive masking.
+    Batches resolve all their values in bulk; the per-column memo keeps
+    hot tokens in process.
+    """
+
+    memoizable = True
+
+    def mask(self, value: Any, params: dict[str, Any] | None = None) -> str:
+        return self.mask_batch([value], params)[0]
+
+    def mask_batch(
+        self, values: Sequence[Any], params: dict[str, Any] | None = None
+    ) -> list[str]:
+        from .vault import TokenVault
+
+        texts = [str(value) if value else "" for value in values]
+        vault = TokenVault((params or {}).get("namespace", "default"))
+        tokens = vault.tokenize_many(text for text in texts if text)
+        return [tokens[text] if text else "" for text in texts]
+
+    @property
+    def masking_type(self) -> MaskingType:
+        return MaskingType.TOKENIZE
+
+
 class FixedReplaceMasking(MaskingStrategy):
     """Replace with a fixed value."""
 
@@ -200,6 +350,14 @@ class RedactMasking(MaskingStrategy):
         text = str(value)
         return "*" * len(text)
 
+    def mask_batch(
+        self, values: Sequence[Any], params: dict[str, Any] | None = None
+    ) -> list[str]:
+        return [
+            "*" * len(value if isinstance(value, str) else str(value)) if value else ""
+            for value in values
+        ]
+
     @property
     def masking_type(self) -> MaskingType:
         return MaskingType.REDACT
@@ -227,6 +385,23 @@ class GeneralizeAgeMasking(MaskingStrategy):
         except (ValueError, TypeError):
             return str(value)
 
+    def mask_batch(
+        self, values: Sequence[Any], params: dict[str, Any] | None = None
+    ) -> list[str]:
+        # Ages are low-cardinality, so each distinct input is bucketed once.
+        buckets: dict[Any, str] = {}
+        result = []
+        append = result.append
+        for value in values:
+            try:
+                append(buckets[value])
+            except KeyError:
+                buckets[value] = bucket = self.mask(value)
+                append(bucket)
+            except TypeError:
+                append(self.mask(value))
+        return result
+
     @property
     def masking_type(self) -> MaskingType:
         return MaskingType.GENERALIZE
@@ -251,6 +426,8 @@ MASKING_REGISTRY: dict[str, type[MaskingStrategy]] = {
     "name": NameMasking,
     "address": AddressMasking,
     "hash": HashMasking,
+    "keyed_hash": KeyedHashMasking,
+    "tokenize": TokenizeMasking,
     "replace": FixedReplaceMasking,
     "redact": RedactMasking,
     "generalize_age": GeneralizeAgeMasking,
@@ -268,6 +445,98 @@ def get_masking_strategy(masking_type: str) -> MaskingStrategy:
     return MASKING_REGISTRY[masking_type]()
 
 
+class MaskMemo:
+    """Bounded LRU of one column's masked values, with hit counters.
+
+    Wraps a deterministic strategy's ``mask``/``mask_batch`` (params
+    already bound); each distinct value is masked once while it stays in
+    the memo.  Values are keyed with their type so ``1`` and ``True``
+    never share an entry.
+    """
+
+    def __init__(
+        self,
+        mask: Callable[[Any], Any],
+        mask_batch: Callable[[Sequence[Any]], list[Any]],
+        maxsize: int = DEFAULT_MEMO_SIZE,
+    ):
+        self._mask = mask
+        self._mask_batch = mask_batch
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Any, Any] = OrderedDict()
+
+    @staticmethod
+    def _key(value: Any) -> Any:
+        return value if type(value) is str else (type(value), value)
+
+    def _store(self, key: Any, masked: Any) -> None:
+        entries = self._entries
+        entries[key] = masked
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    def mask(self, value: Any) -> Any:
+        try:
+            key = self._key(value)
+            masked = self._entries[key]
+        except TypeError:  # unhashable
+            return self._mask(value)
+        except KeyError:
+            self.misses += 1
+            masked = self._mask(value)
+            self._store(key, masked)
+            return masked
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return masked
+
+    def mask_batch(self, values: Sequence[Any]) -> list[Any]:
+        entries = self._entries
+        result: list[Any] = [None] * len(values)
+        # Distinct values not in the memo, with the positions they fill
+        missing: dict[Any, list[int]] = {}
+        missing_values: list[Any] = []
+        uncached: list[int] = []
+        for position, value in enumerate(values):
+            try:
+                key = self._key(value)
+                result[position] = entries[key]
+            except TypeError:
+                uncached.append(position)
+                continue
+            except KeyError:
+                if key in missing:
+                    missing[key].append(position)
+                    self.hits += 1
+                else:
+                    missing[key] = [position]
+                    missing_values.append(value)
+                    self.misses += 1
+                continue
+            entries.move_to_end(key)
+            self.hits += 1
+
+        if missing_values:
+            for (key, positions), masked in zip(
+                missing.items(), self._mask_batch(missing_values)
+            ):
+                self._store(key, masked)
+                for position in positions:
+                    result[position] = masked
+        if uncached:
+            for position, masked in zip(
+                uncached, self._mask_batch([values[i] for i in uncached])
+            ):
+                result[position] = masked
+        return result
+
+    def stats(self) -> dict[str, int]:
+        """Hit and miss counts so far."""
+        return {"hits": self.hits, "misses": self.misses}
+
+
 def _generic_mask(value: str, keep_start: int = 1, keep_end: int = 1) -> str:
     """Generic masking helper."""
     if not value:
@@ -0,0 +1,80 @@
+"""
+Tokenization Vault
+
+Persistent value -> token mapping in Redis, so a value gets the same
+pseudonym in every table and every run that uses the same namespace.
+"""
+from __future__ import annotations
+
+import secrets
+from collections.abc import Iterable
+
+import redis
+
+from config import settings
+
+KEY_PREFIX = "token_vault:"
+TOKEN_PREFIX = "tok_"
+# Values resolved per Redis command, keeping commands a reasonable size
+_LOOKUP_BATCH = 1000
+
+_redis_client: redis.Redis | None = None
+
+
+def _get_redis() -> redis.Redis:
+    """Lazy-initialise and return the vault's Redis client."""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(
+            settings.token_vault_url or settings.redis_url,
+            decode_responses=True,
+            socket_connect_timeout=3,
+        )
+    return _redis_client
+
+
+def _new_token() -> str:
+    return TOKEN_PREFIX + secrets.token_hex(12)
+
+
+class TokenVault:
+    """Tokens of one namespace, stored as a single Redis hash.
+
+    Tokens are random, so they reveal nothing about the value; the vault
+    is what makes them stable.  Concurrent workers may race to tokenize
+    the same new value: ``HSETNX`` keeps the first token and every worker
+    reads that one back.
+    """
+
+    def __init__(self, namespace: str = "default"):
+        self.key = KEY_PREFIX + namespace
+
+    def tokenize_many(self, values: Iterable[str]) -> dict[str, str]:
+        """
+        Return the token of every value, creating tokens for new ones.
+
+        Takes one round trip per batch of known values and a second for
+        batches holding new values.
+
+        Raises:
+            redis.RedisError: If the vault is unreachable
+        """
+        distinct = list(dict.fromkeys(values))
+        tokens: dict[str, str] = {}
+        client = _get_redis()
+        for start in range(0, len(distinct), _LOOKUP_BATCH):
+            chunk = distinct[start : start + _LOOKUP_BATCH]
+            missing = []
+            for value, token in zip(chunk, client.hmget(self.key, chunk)):
+                if token is None:
+                    missing.append(value)
+                else:
+                    tokens[value] = token
+            if not missing:
+                continue
+            pipe = client.pipeline(transaction=False)
+            for value in missing:
+                pipe.hsetnx(self.key, value, _new_token())
+            pipe.hmget(self.key, missing)
+            tokens.update(zip(missing, pipe.execute()[-1]))
+        return tokens
@@ -5,7 +5,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Any
 
-from sqlalchemy import Boolean, DateTime, Enum as SQLEnum, Index, Integer, JSON, String, Text
+from sqlalchemy import Boolean, DateTime, Enum as SQLEnum, Float, Index, Integer, JSON, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -226,6 +226,59 @@ class AuditLog(Base):
     )
 
 
+class SensitiveField(Base):
+    """Catalog entry for a sensitive column found by a discovery scan.
+
+    One row per (tenant, data source, table, column), refreshed on every
+    scan of the table.  ``data_type`` and ``sensitivity`` hold
+    ``discovery.scanner.DataType`` / ``SensitivityLevel`` values.
+    """
+    __tablename__ = "sensitive_fields"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    tenant_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    source_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    table_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    column_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    data_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    sensitivity: Mapped[str] = mapped_column(String(10), nullable=False)
+    confidence: Mapped[float] = mapped_column(Float, nullable=False)
+    match_reason: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    match_ratio: Mapped[float | None] = mapped_column(Float, nullable=True)
+    first_seen_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    last_scanned_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    # The lookups also cover (source, table) so table listings are index-only.
+    __table_args__ = (
+        Index(
+            "ix_sensitive_fields_column",
+            "tenant_id",
+            "source_id",
+            "table_name",
+            "column_name",
+            unique=True,
+        ),
+        Index(
+            "ix_sensitive_fields_sensitivity",
+            "tenant_id",
+            "sensitivity",
+            "source_id",
+            "table_name",
+        ),
+        Index(
+            "ix_sensitive_fields_data_type",
+            "tenant_id",
+            "data_type",
+            "source_id",
+            "table_name",
+        ),
+    )
+
+
 # Keep backward compatibility with existing DataRecord model
 class DataRecord(Base):
     __tablename__ = "data_records"
@@ -0,0 +1,245 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from connectors.pool import ConnectionPool, PoolTimeoutError
+from connectors.postgresql import PostgreSQLConnector
+
+
+def _copy_connector(payload: bytes, columns=("id", "note"), piece: int = 5):
+    def copy_expert(sql, sink):
+        copy_expert.sql = sql
+        for start in range(0, len(payload), piece):
+            sink.write(payload[start : start + piece])
+
+    conn = MagicMock(encoding="UTF8", closed=False)
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.copy_expert = copy_expert
+    cursor.description = [(name,) for name in columns]
+    connector = PostgreSQLConnector({})
+    connector._connection = conn
+    return connector, copy_expert
+
+
+def test_copy_rows_streams_text_format_across_chunks():
+    payload = "1\tmulti\\nline,\\tquoted\n2\t\n3\t张三\n4\t\\N\n".encode()
+    connector, copy_expert = _copy_connector(payload)
+
+    rows = list(connector.copy_rows("SELECT * FROM users;"))
+
+    assert copy_expert.sql == "COPY (SELECT * FROM users) TO STDOUT"
+    assert rows == [
+        ["id", "note"],
+        ["1", "multi\nline,\tquoted"],
+        ["2", ""],
+        ["3", "张三"],
+        ["4", None],
+    ]
+    connector._connection.rollback.assert_called_once()
+
+
+def test_copy_rows_round_trips_nulls_in_non_text_columns():
+    # As COPY TO prints an integer, a date and a text column with NULLs
+    payload = b"1\t\\N\t\n\\N\t2024-01-31\ta\\\\b\n"
+    connector, _ = _copy_connector(payload, columns=("score", "born", "note"))
+    header, *rows = connector.copy_rows("SELECT score, born, note FROM people")
+
+    assert rows == [["1", None, ""], [None, "2024-01-31", "a\\b"]]
+
+    captured = {}
+    target = PostgreSQLConnector({})
+    target._connection = MagicMock(closed=False)
+    target._connection.cursor.return_value.__enter__.return_value.copy_expert = (
+        lambda sql, buffer: captured.setdefault("data", buffer.read())
+    )
+    target.write_rows("people", header, rows)
+
+    # What COPY FROM reads back is exactly what COPY TO wrote.
+    assert captured["data"].encode() == payload
+
+
+def test_copy_rows_stops_export_when_consumer_closes():
+    payload = b"".join(b"%d\n" % i for i in range(100_000))
+    connector, _ = _copy_connector(payload, columns=("id",), piece=64)
+
+    rows = connector.copy_rows("SELECT id FROM users")
+    assert next(rows) == ["id"]
+    assert next(rows) == ["0"]
+    rows.close()
+
+    connector._connection.cancel.assert_called_once()
+
+
+def test_write_rows_copies_text_format_in_one_transaction():
+    captured = {}
+
+    def copy_expert(sql, buffer):
+        captured["sql"] = sql
+        captured["data"] = buffer.read()
+
+    conn = MagicMock(closed=False)
+    conn.cursor.return_value.__enter__.return_value.copy_expert = copy_expert
+    connector = PostgreSQLConnector({})
+    connector._connection = conn
+
+    written = connector.write_rows(
+        "users", ["id", "note"], [(1, "tab\there"), (2, None), (3, "a\\b\nc")]
+    )
+
+    assert written == 3
+    assert captured["sql"] == 'COPY "users" ("id", "note") FROM STDIN'
+    assert captured["data"] == "1\ttab\\there\n2\t\\N\n3\ta\\\\b\\nc\n"
+    conn.commit.assert_called_once()
+
+
+def test_write_rows_formats_json_array_and_bytea_values():
+    captured = {}
+    conn = MagicMock(closed=False)
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.copy_expert = lambda sql, buffer: captured.setdefault("data", buffer.read())
+    cursor.fetchall.return_value = [
+        {"name": "doc", "type": "jsonb"},
+        {"name": "tags", "type": "text[]"},
+        {"name": "grid", "type": "integer[]"},
+        {"name": "blob", "type": "bytea"},
+    ]
+    connector = PostgreSQLConnector({})
+    connector._connection = conn
+
+    connector.write_rows(
+        "docs",
+        ["doc", "tags", "grid", "blob"],
+        [
+            ({"a": [1, "x\ty"]}, ["b c", 'q"t', None], [[1, 2], [3, None]], b"\x01\xff"),
+            ([1, 2], [], None, memoryview(b"ab")),
+        ],
+    )
+
+    rows = [line.split("\t") for line in captured["data"].splitlines()]
+    assert rows[0] == [
+        '{"a": [1, "x\\\\ty"]}',
+        '{"b c","q\\\\"t",NULL}',
+        '{{"1","2"},{"3",NULL}}',
+        "\\\\x01ff",
+    ]
+    # A list in a json column stays JSON; bytes from a memoryview are hex.
+    assert rows[1] == ["[1, 2]", "{}", "\\N", "\\\\x6162"]
+
+
+def test_update_rows_joins_values_list_on_key():
+    conn = MagicMock(closed=False)
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = [
+        {"name": "id", "type": "integer"},
+        {"name": "name", "type": "text"},
+        {"name": "phone", "type": "character varying(20)"},
+    ]
+    connector = PostgreSQLConnector({})
+    connector._connection = conn
+
+    with patch("connectors.postgresql.execute_values") as execute_values:
+        written = connector.update_rows(
+            "users",
+            ["id", "name", "phone"],
+            ["id"],
+            ["phone"],
+            [(1, "Alice", "138****5678"), (2, "Bob", "139****5678")],
+            checkpoint=("cp", "[2]"),
+        )
+
+    _, statement, values = execute_values.call_args.args
+    assert written == 2
+    assert statement == (
+        'UPDATE "users" AS t SET "phone" = v."phone"::character varying(20) '
+        'FROM (VALUES %s) AS v ("id", "phone") WHERE t."id" = v."id"::integer'
+    )
+    assert values == [[1, "138****5678"], [2, "139****5678"]]
+    # The checkpoint is written on the update's cursor, before its commit.
+    assert cursor.execute.call_args.args == (
+        'INSERT INTO "desensitize_checkpoints" (checkpoint_name, last_key) '
+        "VALUES (%s, %s)",
+        ("cp", "[2]"),
+    )
+    conn.commit.assert_called_once()
+
+
+def test_get_all_columns_groups_one_catalog_query_by_table():
+    conn = MagicMock(closed=False)
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = [
+        {"table_name": "orders", "column_name": "id", "data_type": "integer", "is_nullable": "NO"},
+        {"table_name": "users", "column_name": "id", "data_type": "integer", "is_nullable": "NO"},
+        {"table_name": "users", "column_name": "phone", "data_type": "text", "is_nullable": "YES"},
+    ]
+    connector = PostgreSQLConnector({})
+    connector._connection = conn
+
+    columns = connector.get_all_columns()
+
+    cursor.execute.assert_called_once()
+    assert cursor.execute.call_args.args[1] == ("public",)
+    assert columns == {
+        "orders": [{"name": "id", "type": "integer", "nullable": False}],
+        "users": [
+            {"name": "id", "type": "integer", "nullable": False},
+            {"name": "phone", "type": "text", "nullable": True},
+        ],
+    }
+
+def _pooled_connector(**options):
+    opened = []
+
+    def open_connection():
+        conn = MagicMock(closed=False)
+        conn.close.side_effect = lambda: setattr(conn, "closed", True)
+        opened.append(conn)
+        return conn
+
+    driver = PostgreSQLConnector({})
+    driver._open_connection = open_connection
+    settings = dict(
+        max_size=2, idle_timeout=300, health_check_seconds=30, checkout_timeout=0
+    )
+    pool = ConnectionPool(driver, **{**settings, **options})
+    return lambda: PostgreSQLConnector({}, pool=pool), pool, opened
+
+
+def test_pool_reuses_released_connections_up_to_max_size():
+    make, pool, opened = _pooled_connector()
+    first, second = make(), make()
+    conn = first.connect()
+    second.connect()
+    with pytest.raises(PoolTimeoutError):
+        make().connect()
+
+    first.disconnect()
+    conn.rollback.assert_called_once()
+    assert make().connect() is conn
+    assert len(opened) == 2 and pool.size == 2
+
+
+def test_pool_discards_dead_and_session_altered_connections():
+    make, pool, opened = _pooled_connector(health_check_seconds=0)
+    connector = make()
+    connector.connect().cursor.side_effect = Exception("server closed the connection")
+    connector.disconnect()
+
+    # The idle connection fails its ping, so a fresh one is opened.
+    connector.connect()
+    assert len(opened) == 2 and opened[0].closed and pool.size == 1
+
+    connector.export_snapshot()
+    connector.disconnect()
+    assert opened[1].closed and pool.size == 0
+
+
+def test_pool_closes_connections_idle_past_timeout():
+    make, pool, opened = _pooled_connector(idle_timeout=60)
+    connector = make()
+    connector.connect()
+    with patch("connectors.pool.time.monotonic", return_value=0.0):
+        connector.disconnect()
+    with patch("connectors.pool.time.monotonic", return_value=61.0):
+        connector.connect()
+
+    assert opened[0].closed and len(opened) == 2 and pool.size == 1
@@ -0,0 +1,659 @@
+import csv
+import io
+import json
+from functools import partial
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from config import settings
+from models import TaskStatus
+from worker import (
+    _desensitize_in_parallel,
+    _desensitize_table_in_parallel,
+    _desensitize_tables_in_snapshot,
+    _iter_json_array,
+    _JsonRecordWriter,
+    _mask_table_in_place,
+    _plan_key_ranges,
+    _plan_maskers,
+    _iter_rows,
+    _read_csv_header,
+    _ReadProgress,
+    _split_record_ranges,
+    ProgressReporter,
+    process_db_desensitize,
+    process_desensitize,
+)
+
+
+def _published(redis_mock):
+    pipe = redis_mock.pipeline.return_value
+    return [json.loads(call.args[1]) for call in pipe.publish.call_args_list]
+
+
+def _write_csv(path, rows):
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        csv.writer(handle).writerows(rows)
+
+
+def test_csv_progress_tracks_bytes_consumed(tmp_path):
+    source = tmp_path / "people.csv"
+    _write_csv(source, [["name", "phone"]] + [["Alice", "13812345678"]] * 50)
+
+    progress = _ReadProgress()
+    rows = list(_iter_rows(source, "csv", progress))
+
+    assert len(rows) == 51
+    assert progress.total == source.stat().st_size
+    assert progress.current == progress.total
+
+
+def test_process_desensitize_reads_input_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "output_dir", str(tmp_path / "outputs"))
+    source = tmp_path / "people.csv"
+    _write_csv(source, [["name", "phone"]] + [["Alice", "13812345678"]] * 25)
+
+    with patch("worker._count_rows", side_effect=AssertionError("double read")), \
+            patch("worker.redis_client") as redis_mock, \
+            patch.object(process_desensitize, "update_state"):
+        result = process_desensitize.run(str(source))
+
+    published = _published(redis_mock)
+    assert result["current"] == result["total"] == 25
+    progress_events = published[:-1]
+    assert progress_events
+    assert all(event["total"] == source.stat().st_size for event in progress_events)
+    assert published[-1] == {"current": 25, "total": 25, "message": "completed"}
+
+    output = tmp_path / "outputs" / result["output_file"]
+    with output.open(newline="") as handle:
+        masked = list(csv.reader(handle))
+    assert masked[0] == ["name", "phone"]
+    assert masked[1] == ["A****", "*******5678"]
+
+
+def test_progress_reporter_coalesces_updates():
+    now = [0.0]
+    task = MagicMock()
+    task.request.id = "abc"
+    with patch("worker.redis_client") as redis_mock, \
+            patch("worker._update_task_record") as record:
+        reporter = ProgressReporter(
+            task, "db-1", interval=0.5, db_interval=5.0, clock=lambda: now[0]
+        )
+        for step in range(1, 101):
+            now[0] = step * 0.125
+            reporter.update(step, 100, f"row {step}", rows=step)
+        reporter.publish(100, 100, "completed")
+
+    published = _published(redis_mock)
+    # One event per half second of a 12.5 second run, plus completion.
+    assert len(published) == 26
+    assert published[1]["rows_per_sec"] == 8.0
+    assert published[1]["eta_seconds"] == 11.9
+    assert published[-1] == {"current": 100, "total": 100, "message": "completed"}
+    assert record.call_count == 2
+    pipe = redis_mock.pipeline.return_value
+    assert pipe.set.call_args.args[0] == "task_progress:abc:latest"
+
+
+def test_split_record_ranges_skips_quoted_newlines(tmp_path):
+    source = tmp_path / "notes.csv"
+    _write_csv(
+        source,
+        [["name", "note"]]
+        + [[f"user{i}", "line one\nline two, \"quoted\""] for i in range(200)],
+    )
+
+    header, start = _read_csv_header(source)
+    ranges = _split_record_ranges(source, "csv", start, 64)
+
+    assert header == ["name", "note"]
+    assert ranges[0][0] == start
+    assert ranges[-1][1] == source.stat().st_size
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    data = source.read_bytes()
+    parsed = []
+    for range_start, range_end in ranges:
+        text = data[range_start:range_end].decode()
+        parsed.extend(csv.reader(io.StringIO(text, newline="")))
+    assert len(parsed) == 200
+    assert all(row[1] == "line one\nline two, \"quoted\"" for row in parsed)
+
+
+def test_parallel_csv_matches_serial_output(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "output_dir", str(tmp_path))
+    source = tmp_path / "people.csv"
+    _write_csv(
+        source,
+        [["name", "phone", "city"]]
+        + [[f"User {'ABCDEFGHIJ'[i % 10]}", f"138{i:08d}", "北京\nline"] for i in range(500)],
+    )
+    with patch("worker.redis_client"), \
+            patch.object(process_desensitize, "update_state"):
+        serial = process_desensitize.run(str(source))
+
+    parallel_path = tmp_path / "parallel.csv"
+    data_rows, masked_fields = _desensitize_in_parallel(
+        source, "csv", parallel_path, processes=4, chunk_size_bytes=1024
+    )
+
+    assert data_rows == serial["total"] == 500
+    assert masked_fields == 2
+    assert parallel_path.read_bytes() == (tmp_path / serial["output_file"]).read_bytes()
+    assert not list(tmp_path.glob("*.part*"))
+
+
+def test_parallel_jsonl_masks_by_key(tmp_path):
+    source = tmp_path / "people.jsonl"
+    source.write_text(
+        "".join(
+            json.dumps({"id": i, "email": f"user{i}@example.com"}) + "\n"
+            for i in range(300)
+        )
+    )
+
+    output = tmp_path / "out.jsonl"
+    data_rows, masked_fields = _desensitize_in_parallel(
+        source, "jsonl", output, processes=3, chunk_size_bytes=512
+    )
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert data_rows == len(lines) == 300
+    assert masked_fields == 1
+    assert lines[7] == {"id": 7, "email": "u***@example.com"}
+
+
+def test_jsonl_records_keep_their_own_keys_on_both_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "output_dir", str(tmp_path))
+    source = tmp_path / "people.jsonl"
+    records = [
+        {"id": 1, "email": "a@example.com"},
+        {"id": 2, "phone": "13812345678", "vip": True},
+        {"email": None, "id": 3},
+        ["not", "an", "object"],
+    ] * 8000
+    source.write_text("".join(json.dumps(record) + "\n" for record in records))
+    assert source.stat().st_size > 1024 * 1024
+
+    outputs = []
+    for processes in (0, 3):
+        monkeypatch.setattr(settings, "desensitize_processes", processes)
+        # The file is just over 1MB, so the parallel run really splits it.
+        monkeypatch.setattr(settings, "desensitize_chunk_mb", 1)
+        with patch("worker.redis_client"), \
+                patch.object(process_desensitize, "update_state"):
+            result = process_desensitize.run(str(source))
+        outputs.append((tmp_path / result["output_file"]).read_bytes())
+
+    assert outputs[0] == outputs[1]
+    masked = [json.loads(line) for line in outputs[0].decode().splitlines()]
+    assert masked[:4] == [
+        {"id": 1, "email": "a***@example.com"},
+        {"id": 2, "phone": "*******5678", "vip": True},
+        {"email": "", "id": 3},
+        ["not", "an", "object"],
+    ]
+
+
+def test_masker_plan_follows_sampled_values_before_headers(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "output_dir", str(tmp_path))
+    source = tmp_path / "export.csv"
+    rows = [[f"139{i:08d}", f"user{i}@example.com", "n/a", "ok"] for i in range(150)]
+    _write_csv(source, [["col7", "username", "phone", "note"]] + rows)
+
+    maskers = _plan_maskers(["col7", "username", "phone", "note"], rows[:100])
+    # "n/a" contradicts the phone keyword, so that column is left alone.
+    assert [m.__name__ if m else None for m in maskers] == [
+        "_mask_phone", "_mask_email", None, None,
+    ]
+
+    with patch("worker.redis_client"), \
+            patch.object(process_desensitize, "update_state"):
+        result = process_desensitize.run(str(source))
+
+    with (tmp_path / result["output_file"]).open(newline="") as handle:
+        masked = list(csv.reader(handle))
+    assert len(masked) == 151
+    # Rows after the sample are masked with the same plan.
+    assert masked[150] == ["*******0149", "u***@example.com", "n/a", "ok"]
+
+
+def test_masker_plan_skips_header_keyword_the_sample_contradicts():
+    handles = [[f"dev_{i}", f"Ann Lee{'-Smith' * (i % 2)}", "2 Main St"] for i in range(20)]
+    maskers = _plan_maskers(["username", "full_name", "address"], handles)
+    # Handles are not names; real names and free-form addresses keep their
+    # keyword masker.
+    assert [m.__name__ if m else None for m in maskers] == [
+        None, "_mask_name", "_mask_address",
+    ]
+    # Without a sample there is nothing to contradict the header.
+    assert _plan_maskers(["username"], [])[0].__name__ == "_mask_name"
+
+
+def test_json_array_streams_across_chunk_boundaries():
+    records = [
+        {"id": 12345, "note": "brackets ] and , inside", "tags": [1, [2.5e3]]},
+        98765,
+        "plain",
+        None,
+        {"nested": {"deep": [True, False]}},
+    ]
+    text = " \n" + json.dumps(records, indent=1)
+
+    for chunk_size in (1, 3, 7, 64):
+        parsed = list(_iter_json_array(io.StringIO(text), chunk_size=chunk_size))
+        assert parsed == records
+    assert list(_iter_json_array(io.StringIO("[ ]"), chunk_size=1)) == []
+    assert list(_iter_json_array(io.StringIO('{"a": 1}'))) == [{"a": 1}]
+
+
+def test_json_array_rereads_numbers_cut_at_chunk_boundaries():
+    # Raw literals, since json.dumps never writes an exponent like 1.5e3.
+    text = "[1.5, 1.5e3, -0.25E-2, 123.25, 7, 2e10]"
+    expected = [1.5, 1500.0, -0.0025, 123.25, 7, 2e10]
+    for chunk_size in range(1, len(text) + 1):
+        parsed = list(_iter_json_array(io.StringIO(text), chunk_size=chunk_size))
+        assert parsed == expected, chunk_size
+
+
+def test_json_record_writer_matches_json_dump():
+    records = [{"name": "张三", "lines": "a\nb"}, {"name": "B", "n": [1, {"x": 2}]}]
+    for items in (records, []):
+        handle = io.StringIO()
+        writer = _JsonRecordWriter(handle, "json")
+        writer.writerows(iter(items))
+        writer.close()
+        assert handle.getvalue() == json.dumps(items, ensure_ascii=False, indent=2)
+
+
+def test_process_desensitize_streams_json_records(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "output_dir", str(tmp_path / "outputs"))
+    source = tmp_path / "people.json"
+    source.write_text(
+        json.dumps([{"name": "Alice", "phone": "13812345678"}] * 3)
+    )
+
+    with patch("worker.redis_client"), \
+            patch.object(process_desensitize, "update_state"):
+        result = process_desensitize.run(str(source))
+
+    output = tmp_path / "outputs" / result["output_file"]
+    assert result["total"] == 3
+    assert json.loads(output.read_text()) == [
+        {"name": "A****", "phone": "*******5678"}
+    ] * 3
+
+
+def test_process_db_desensitize_streams_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "output_dir", str(tmp_path))
+    record = MagicMock(
+        source_config={
+            "connector_type": "postgresql",
+            "table": "users",
+            "fetch_size": 2,
+        },
+        target_config={},
+        rules={"rules": [{"column_name": "phone", "masking_type": "phone"}]},
+    )
+    session = MagicMock()
+    session.query.return_value.filter.return_value.first.return_value = record
+    connector = MagicMock(extract_modes=("cursor",))
+    # The catalog underestimates the table; progress never passes 100%.
+    connector.get_row_estimates.return_value = {"users": 2}
+    connector.execute_query.side_effect = AssertionError("fetchall")
+    connector.stream_query.return_value = iter(
+        [
+            [{"id": 1, "phone": "13812345678"}, {"id": 2, "phone": "13912345678"}],
+            [{"id": 3, "phone": "13712345678"}],
+        ]
+    )
+
+    with patch("worker.init_db"), \
+            patch("worker.SessionLocal", return_value=session), \
+            patch("worker._update_task_record"), \
+            patch("worker.redis_client") as redis_mock, \
+            patch("worker.ProgressReporter", partial(ProgressReporter, interval=0)), \
+            patch("connectors.factory.create_connector", return_value=connector), \
+            patch.object(process_db_desensitize, "update_state"):
+        result = process_db_desensitize.run("task-1")
+
+    connector.stream_query.assert_called_once_with(
+        "SELECT * FROM users", None, 2
+    )
+    progress = [(event["current"], event["total"]) for event in _published(redis_mock)]
+    assert progress[:3] == [(0, 2), (2, 2), (3, 3)]
+    assert result["output_rows"] == 3
+    with (tmp_path / result["output_file"]).open(newline="") as handle:
+        masked = list(csv.reader(handle))
+    assert masked[0] == ["id", "phone"]
+    assert [row[1] for row in masked[1:]] == ["138****5678", "139****5678", "137****5678"]
+
+
+def test_process_db_desensitize_rejects_unsupported_extract_mode():
+    from connectors.mysql import MySQLConnector
+
+    record = MagicMock(
+        source_config={
+            "connector_type": "mysql",
+            "table": "users",
+            "extract_mode": "copy",
+        },
+        target_config={},
+        rules={"rules": [{"column_name": "phone", "masking_type": "phone"}]},
+    )
+    session = MagicMock()
+    session.query.return_value.filter.return_value.first.return_value = record
+    connector = MagicMock(extract_modes=MySQLConnector.extract_modes)
+
+    with patch("worker.init_db"), \
+            patch("worker.SessionLocal", return_value=session), \
+            patch("worker._update_task_record") as update_record, \
+            patch("worker.redis_client"), \
+            patch("connectors.factory.create_connector", return_value=connector), \
+            patch.object(process_db_desensitize, "update_state"), \
+            pytest.raises(ValueError, match="extract_mode 'copy' is not supported for mysql"):
+        process_db_desensitize.run("task-1")
+
+    connector.connect.assert_not_called()
+    connector.stream_query.assert_not_called()
+    assert update_record.call_args.kwargs["status"] == TaskStatus.FAILED
+
+
+class _TableConnector:
+    """In-memory stand-in for a connector over one ``users`` table."""
+
+    rows = [{"id": i, "phone": f"138{i:08d}"} for i in range(1, 101)]
+
+    def __init__(self, *args):
+        pass
+
+    def connect(self):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def get_primary_key(self, table_name):
+        return ["id"]
+
+    def get_columns(self, table_name):
+        return [{"name": "id", "type": "bigint"}, {"name": "phone", "type": "text"}]
+
+    def quote_identifier(self, name):
+        return f'"{name}"'
+
+    def execute_query(self, query, params=None):
+        return [{"lo": 1, "hi": 100}]
+
+    def stream_query(self, query, params=None, fetch_size=5000):
+        low, high = params
+        rows = [row for row in self.rows if low <= row["id"] < high]
+        for start in range(0, len(rows), fetch_size):
+            yield rows[start : start + fetch_size]
+
+
+def test_plan_key_ranges_covers_integer_key():
+    key, ranges = _plan_key_ranges(_TableConnector(), "users", 8)
+
+    assert key == "id"
+    assert ranges[0][0] == 1 and ranges[-1][1] == 101
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+
+
+def test_parallel_table_extraction_merges_ranges_in_key_order(tmp_path):
+    connector = _TableConnector()
+    output = tmp_path / "users.csv"
+    progress = []
+    with patch("connectors.factory.create_connector", _TableConnector):
+        rows = _desensitize_table_in_parallel(
+            connector,
+            "postgresql",
+            {},
+            "users",
+            _plan_key_ranges(connector, "users", 6),
+            output,
+            processes=3,
+            fetch_size=7,
+            rules_list=[{"column_name": "phone", "masking_type": "phone"}],
+            on_part=lambda *args: progress.append(args),
+        )
+
+    with output.open(newline="") as handle:
+        masked = list(csv.reader(handle))
+    assert rows == 100
+    assert masked[0] == ["id", "phone"]
+    assert [int(row[0]) for row in masked[1:]] == list(range(1, 101))
+    assert masked[1][1] == "138****0001"
+    assert progress[-1] == (100, 6, 6)
+    assert not list(tmp_path.glob("*.part*"))
+
+
+def test_process_db_desensitize_writes_to_target_table(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "output_dir", str(tmp_path))
+    record = MagicMock(
+        source_config={"connector_type": "postgresql", "table": "users"},
+        target_type="db",
+        target_config={
+            "connector_type": "mysql",
+            "connection": {"host": "staging"},
+            "table": "users_masked",
+            "batch_size": 2,
+        },
+        rules={"rules": [{"column_name": "phone", "masking_type": "phone"}]},
+    )
+    session = MagicMock()
+    session.query.return_value.filter.return_value.first.return_value = record
+    source = MagicMock(extract_modes=("cursor",))
+    source.get_row_estimates.return_value = {}
+    source.stream_query.return_value = iter(
+        [[{"id": i, "phone": f"138{i:08d}"} for i in range(1, 6)]]
+    )
+    target = MagicMock()
+    connectors = {"postgresql": source, "mysql": target}
+
+    with patch("worker.init_db"), \
+            patch("worker.SessionLocal", return_value=session), \
+            patch("worker._update_task_record"), \
+            patch("worker.redis_client"), \
+            patch("connectors.factory.create_connector", side_effect=lambda kind, _: connectors[kind]), \
+            patch.object(process_db_desensitize, "update_state"):
+        result = process_db_desensitize.run("task-1")
+
+    assert result["output_file"] is None
+    assert result["output_rows"] == 5
+    batches = [call.args for call in target.write_rows.call_args_list]
+    assert [len(rows) for _, _, rows in batches] == [2, 2, 1]
+    assert batches[0][:2] == ("users_masked", ["id", "phone"])
+    assert list(batches[0][2][0]) == [1, "138****0001"]
+    assert not list(tmp_path.iterdir())
+    target.disconnect.assert_called_once()
+
+
+def test_process_db_desensitize_pushes_masking_into_the_database(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "output_dir", str(tmp_path))
+    connection = {"host": "db", "database": "app"}
+    record = MagicMock(
+        source_config={
+            "connector_type": "postgresql",
+            "connection": connection,
+            "table": "users",
+            "pushdown": True,
+        },
+        target_type="db",
+        target_config={
+            "connector_type": "postgresql",
+            "connection": connection,
+            "table": "users_masked",
+        },
+        rules={"rules": [{"column_name": "phone", "masking_type": "phone"}]},
+    )
+    session = MagicMock()
+    session.query.return_value.filter.return_value.first.return_value = record
+    connector = MagicMock(extract_modes=("cursor",))
+    connector.get_row_estimates.return_value = {}
+    connector.get_columns.return_value = [
+        {"name": "id", "type": "integer"},
+        {"name": "phone", "type": "character varying"},
+    ]
+    connector.quote_identifier.side_effect = lambda name: f'"{name}"'
+    connector.execute.return_value = 42
+
+    with patch("worker.init_db"), \
+            patch("worker.SessionLocal", return_value=session), \
+            patch("worker._update_task_record"), \
+            patch("worker.redis_client"), \
+            patch("connectors.factory.create_connector", return_value=connector), \
+            patch.object(process_db_desensitize, "update_state"):
+        result = process_db_desensitize.run("task-1")
+
+    statement, params = connector.execute.call_args.args
+    assert statement.startswith('INSERT INTO "users_masked" ("id", "phone") SELECT ')
+    assert statement.endswith(' FROM "users"')
+    assert params == []
+    assert result["output_rows"] == 42
+    connector.stream_query.assert_not_called()
+
+
+class _KeysetConnector(_TableConnector):
+    """Serves keyset-paged SELECTs and records in-place updates."""
+
+    def __init__(self, fail_on_update=None):
+        self.rows = [dict(row) for row in _TableConnector.rows]
+        self.updates = []
+        self.fail_on_update = fail_on_update
+        self.checkpoints = {}
+
+    def execute_query(self, query, params=None):
+        after = params[0] if params else 0
+        limit = int(query.rsplit("LIMIT", 1)[1])
+        return [row for row in self.rows if row["id"] > after][:limit]
+
+    def update_rows(
+        self, table_name, columns, key_columns, update_columns, rows, checkpoint=None
+    ):
+        # A failed update commits neither its rows nor its checkpoint.
+        if len(self.updates) == self.fail_on_update:
+            raise RuntimeError("connection lost")
+        self.updates.append([row[0] for row in rows])
+        for row in rows:
+            self.rows[row[0] - 1]["phone"] = row[1]
+        if checkpoint is not None:
+            self.checkpoints[checkpoint[0]] = checkpoint[1]
+
+    def read_checkpoint(self, name):
+        return self.checkpoints.get(name)
+
+    def clear_checkpoint(self, name):
+        self.checkpoints.pop(name, None)
+
+
+def test_in_place_masking_resumes_after_last_committed_key():
+    from masking.engine import MaskingEngine
+
+    engine = MaskingEngine.from_rules_config(
+        [{"column_name": "phone", "masking_type": "phone"}]
+    )
+    connector = _KeysetConnector(fail_on_update=2)
+
+    try:
+        _mask_table_in_place(
+            connector, "users", engine, batch_size=30, checkpoint_key="cp"
+        )
+    except RuntimeError:
+        pass
+    assert json.loads(connector.checkpoints["cp"]) == [60]
+
+    connector.fail_on_update = None
+    resumed = _mask_table_in_place(
+        connector, "users", engine, batch_size=30, checkpoint_key="cp"
+    )
+
+    assert resumed == 40
+    assert [batch[0] for batch in connector.updates] == [1, 31, 61, 91]
+    assert all(row["phone"] == f"138****{row['id']:04d}" for row in connector.rows)
+    assert "cp" not in connector.checkpoints
+
+
+class _SnapshotConnector:
+    """Connector over two tables that only serves reads at snapshot "snap-1"."""
+
+    tables = {
+        "users": [{"id": i, "phone": f"138{i:08d}"} for i in range(1, 8)],
+        "orders": [{"id": i, "phone": f"139{i:08d}"} for i in range(1, 4)],
+    }
+
+    def __init__(self, *args):
+        self.snapshot = None
+        self.released = False
+        # Like psycopg2 without autocommit, any query opens a transaction.
+        self.in_transaction = False
+
+    def connect(self):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def _set_session(self):
+        if self.in_transaction:
+            raise RuntimeError("set_session cannot be used inside a transaction")
+        self.in_transaction = True
+
+    def export_snapshot(self):
+        self._set_session()
+        return "snap-1"
+
+    def import_snapshot(self, snapshot):
+        self._set_session()
+        self.snapshot = snapshot
+
+    def release_snapshot(self):
+        self.in_transaction = False
+        self.released = True
+
+    def quote_identifier(self, name):
+        return f'"{name}"'
+
+    def get_all_columns(self, schema=None):
+        self.in_transaction = True
+        return {table: [{"name": "id"}, {"name": "phone"}] for table in self.tables}
+
+    def stream_query(self, query, params=None, fetch_size=5000):
+        assert self.snapshot == "snap-1"
+        self.in_transaction = True
+        rows = self.tables[query.rsplit(" ", 1)[1].strip('"')]
+        for start in range(0, len(rows), fetch_size):
+            yield rows[start : start + fetch_size]
+
+
+def test_snapshot_dump_masks_tables_in_parallel_into_archive(tmp_path):
+    from zipfile import ZipFile
+
+    coordinator = _SnapshotConnector()
+    output = tmp_path / "task_desensitized.zip"
+    progress = []
+    with patch("connectors.factory.create_connector", _SnapshotConnector):
+        table_rows, masked_fields = _desensitize_tables_in_snapshot(
+            coordinator,
+            "postgresql",
+            {},
+            ["users", "orders"],
+            output,
+            processes=2,
+            fetch_size=3,
+            rules_config={"rules": [{"column_name": "phone", "masking_type": "phone"}]},
+            on_progress=lambda done, rows: progress.append((done, dict(rows))),
+        )
+
+    assert coordinator.released
+    assert table_rows == {"users": 7, "orders": 3}
+    assert masked_fields == 2
+    assert progress[-1] == (2, {"users": 7, "orders": 3})
+    with ZipFile(output) as archive:
+        assert sorted(archive.namelist()) == ["orders.csv", "users.csv"]
+        users = archive.read("users.csv").decode().splitlines()
+    assert users[0] == "id,phone"
+    assert users[1] == "1,138****0001"
+    assert [path.name for path in tmp_path.iterdir()] == [output.name]
@@ -0,0 +1,254 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from discovery import runner
+from models import SensitiveField
+
+
+class _ScanConnector:
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+    disconnected = 0
+
+    def __init__(self, connector_type, config):
+        pass
+
+    def get_columns(self, table_name):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        time.sleep(0.02)
+        with cls.lock:
+            cls.active -= 1
+        return [{"name": "phone", "type": "varchar", "nullable": True}]
+
+    def get_random_sample(self, table_name, limit):
+        return [{"phone": "13812345678"}]
+
+    def disconnect(self):
+        with type(self).lock:
+            type(self).disconnected += 1
+
+
+def test_scan_tables_runs_concurrently_within_cap_and_keeps_order():
+    tables = [f"t{i}" for i in range(12)]
+    with (
+        patch.object(runner, "create_connector", _ScanConnector),
+        patch.object(runner.settings, "discovery_scan_concurrency", 3),
+    ):
+        scanned = runner.scan_tables("postgresql", {}, tables, sample_size=1)
+
+    assert [name for name, _, _ in scanned] == tables
+    assert all(result.sensitive_columns == 1 for _, _, result in scanned)
+    assert _ScanConnector.peak == 3
+    assert 1 <= _ScanConnector.disconnected <= 3
+
+
+def test_keyword_automaton_matches_every_contained_keyword():
+    from discovery.scanner import SENSITIVE_RULES, _keyword_matches
+
+    keywords = {
+        keyword.lower().replace("_", "").replace("-", ""): data_type
+        for data_type, rule in SENSITIVE_RULES.items()
+        for keyword in rule["keywords"]
+    }
+    for name in ["shippingaddr", "emailphone", "userbirthdaydob", "身份证号码", "memo"]:
+        expected = {dt for keyword, dt in keywords.items() if keyword in name}
+        assert _keyword_matches(name) == expected
+
+
+def test_scan_classifies_every_sampled_value_by_match_ratio():
+    from discovery.scanner import DataType, scan_table_schema
+
+    columns = [{"name": "contact"}, {"name": "notes"}, {"name": "code"}]
+    rows = [
+        {"contact": None, "notes": "a@b.com", "code": "x"},
+        {"contact": "13812345678", "notes": "hello", "code": "y"},
+        {"contact": "13912345678", "notes": "c@d.org", "code": "a@b.com"},
+        {"contact": "13712345678", "notes": "e@f.net", "code": "z"},
+    ]
+
+    result = scan_table_schema("t", columns, sample_rows=rows)
+    fields = {f.column_name: f for f in result.fields}
+
+    # The leading NULL no longer decides the match.
+    assert fields["contact"].data_type == DataType.PHONE
+    assert fields["contact"].match_reason == "keyword+regex"
+    assert fields["contact"].sample_value == "13812345678"
+    assert fields["notes"].match_ratio == 0.75
+    assert fields["notes"].confidence == 0.95 * 0.75 * 0.9
+    # One email in four falls short of MIN_MATCH_RATIO.
+    assert "code" not in fields
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+        self.values = {}
+        self.lists = {}
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def delete(self, key):
+        self.lists.pop(key, None)
+
+    def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(values)
+
+    def lrange(self, key, start, end):
+        return self.lists.get(key, [])[start : end + 1]
+
+    def hmget(self, key, fields):
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    def pipeline(self):
+        return self
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    def expire(self, key, seconds):
+        pass
+
+    def execute(self):
+        pass
+
+
+def test_scan_cache_reuses_results_until_the_schema_changes():
+    from discovery.cache import ScanCache, table_fingerprint
+    from discovery.scanner import scan_table_schema
+
+    columns = [{"name": "phone", "type": "varchar"}, {"name": "id", "type": "int"}]
+    result = scan_table_schema("users", columns)
+    cache = ScanCache("tenant:postgresql:{}")
+    fingerprint = table_fingerprint(columns, 1000, 10)
+
+    with patch("discovery.cache._get_redis", return_value=_FakeRedis()):
+        cache.set_many({"users": (fingerprint, result)})
+        # Ordinary growth keeps the entry; a column type change drops it.
+        hit = cache.get_many({"users": table_fingerprint(columns, 1020, 10)})
+        changed = [{**columns[0], "type": "text"}, columns[1]]
+        miss = cache.get_many({"users": table_fingerprint(changed, 1000, 10)})
+
+    assert hit["users"].to_dict() == result.to_dict()
+    assert hit["users"].summary == result.summary
+    assert miss == {}
+
+
+class _SourceConnector(_ScanConnector):
+    def test_connection(self):
+        return True, "ok"
+
+    def get_tables(self):
+        return ["a", "b", "c"]
+
+    def get_all_columns(self):
+        return {t: [{"name": "phone", "type": "text", "nullable": True}] for t in "abc"}
+
+    def get_row_estimates(self):
+        return {"a": 10, "b": 10, "c": 10}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.disconnect()
+
+
+def test_scan_job_reports_progress_and_pages_results():
+    from discovery import jobs
+    from worker import process_discovery_scan
+
+    redis = _FakeRedis()
+    progress = []
+    with (
+        patch.object(runner, "create_connector", _SourceConnector),
+        patch("discovery.cache._get_redis", return_value=redis),
+        patch("discovery.jobs._get_redis", return_value=redis),
+        patch("worker.ProgressReporter") as reporter,
+    ):
+        reporter.return_value.update.side_effect = (
+            lambda done, total, message, extra: progress.append((done, extra["table"]))
+        )
+        process_discovery_scan.push_request(id="job-1")
+        try:
+            first = process_discovery_scan.run(
+                "postgresql", {}, {"sample_size": 1, "cache_scope": "s"}
+            )
+            second = process_discovery_scan.run(
+                "postgresql", {}, {"sample_size": 1, "cache_scope": "s"}
+            )
+        finally:
+            process_discovery_scan.pop_request()
+        page = jobs.get_scan_results("job-1", 1, 5)
+        summary = jobs.get_scan_summary("job-1")
+
+    assert sorted(done for done, _ in progress) == [1, 2, 3]
+    assert first["total_sensitive"] == 3 and first["cached_tables"] == 0
+    # Unchanged tables come from the scan cache on the second run.
+    assert second["cached_tables"] == 3
+    assert [table["table_name"] for table in page] == ["b", "c"]
+    assert summary["total_tables"] == 3
+
+
+def _catalog_entry(**values):
+    return SimpleNamespace(**values)
+
+
+# Filter criteria are built from the real columns; rows stay plain objects.
+_catalog_entry.tenant_id = SensitiveField.tenant_id
+_catalog_entry.source_id = SensitiveField.source_id
+_catalog_entry.table_name = SensitiveField.table_name
+
+
+class _CatalogSession:
+    def __init__(self, entries):
+        self.entries = entries
+        self.added = []
+        self.deleted = []
+
+    def query(self, model):
+        return self
+
+    def filter(self, *criteria):
+        return list(self.entries)
+
+    def add(self, entry):
+        self.added.append(entry)
+
+    def delete(self, entry):
+        self.deleted.append(entry)
+
+
+def test_catalog_rescan_updates_adds_and_drops_fields():
+    import uuid
+
+    from discovery.catalog import record_scan
+    from discovery.runner import table_result
+    from discovery.scanner import scan_table_schema
+
+    columns = [{"name": n, "type": "text", "nullable": True} for n in ("phone", "email")]
+    tenant, source = uuid.uuid4(), uuid.uuid4()
+    phone = _catalog_entry(table_name="users", column_name="phone", sensitivity="L1")
+    id_card = _catalog_entry(table_name="users", column_name="id_card")
+    session = _CatalogSession([phone, id_card])
+
+    with patch("discovery.catalog.SensitiveField", _catalog_entry):
+        written = record_scan(
+            session, tenant, source,
+            [table_result("users", columns, scan_table_schema("users", columns))],
+        )
+
+    assert written == 2
+    assert phone.sensitivity == "L3" and phone.last_scanned_at is not None
+    assert [(e.column_name, e.source_id) for e in session.added] == [("email", source)]
+    # Columns no longer found sensitive leave the catalog.
+    assert session.deleted == [id_card]
@@ -0,0 +1,274 @@
+"""Tests for masking strategies and the masking engine."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+from masking.engine import (
+    MaskingEngine,
+    UnsafeExpressionError,
+    cache_hit_ratios,
+    safe_eval_condition,
+)
+from masking.rules import MASKING_REGISTRY, MaskMemo, get_masking_strategy
+
+SAMPLE_VALUES = [
+    None,
+    "",
+    0,
+    "13812345678",
+    "+86 138-1234-5678",
+    "123",
+    "110101199001011234",
+    "  110101199001011234  ",
+    "john@example.com",
+    "张三",
+    "John Smith",
+    "北京市朝阳区建国路88号",
+    17,
+    "45",
+    "abc",
+    13812345678,
+]
+
+STRATEGY_PARAMS = {
+    "hash": {"salt": "pepper"},
+    "keyed_hash": {"key": "secret"},
+}
+
+
+class _VaultRedis:
+    """In-memory stand-in for the vault's Redis, counting round trips."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.round_trips = 0
+
+    def hmget(self, key, fields):
+        self.round_trips += 1
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    def pipeline(self, transaction=True):
+        return _VaultPipeline(self)
+
+
+class _VaultPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def hsetnx(self, key, field, value):
+        self.commands.append(
+            lambda: self.redis.hashes.setdefault(key, {}).setdefault(field, value)
+        )
+
+    def hmget(self, key, fields):
+        self.commands.append(
+            lambda: [self.redis.hashes.get(key, {}).get(field) for field in fields]
+        )
+
+    def execute(self):
+        self.redis.round_trips += 1
+        return [command() for command in self.commands]
+
+
+@pytest.mark.parametrize("masking_type", sorted(MASKING_REGISTRY))
+def test_mask_batch_matches_scalar_mask(masking_type):
+    strategy = get_masking_strategy(masking_type)
+    params = STRATEGY_PARAMS.get(masking_type)
+
+    with patch("masking.vault._get_redis", return_value=_VaultRedis()):
+        expected = [strategy.mask(value, params) for value in SAMPLE_VALUES]
+
+        assert strategy.mask_batch(SAMPLE_VALUES, params) == expected
+
+
+def test_apply_to_batch_masks_columns_and_pads_rows():
+    engine = MaskingEngine.from_rules_config(
+        [
+            {"column_name": "Phone", "masking_type": "phone"},
+            {"column_name": "id_card", "masking_type": "id_card"},
+        ]
+    )
+
+    masked = engine.apply_to_batch(
+        ["name", "phone", "id_card"],
+        [
+            ["Alice", "13812345678", "110101199001011234"],
+            ("Bob", "13900001111"),
+        ],
+    )
+
+    assert masked == [
+        ["Alice", "138****5678", "11**************34"],
+        ["Bob", "139****1111", ""],
+    ]
+
+
+def test_apply_to_batch_respects_conditions():
+    engine = MaskingEngine.from_rules_config(
+        [
+            {
+                "column_name": "phone",
+                "masking_type": "redact",
+                "condition": "country == 'CN'",
+            }
+        ]
+    )
+
+    rows = [["CN", "13812345678"], ["US", "5551234567"]]
+
+    assert engine.apply_to_batch(["country", "phone"], rows) == [
+        ["CN", "***********"],
+        ["US", "5551234567"],
+    ]
+    assert [
+        list(engine.apply_to_row({"country": c, "phone": p}).values())
+        for c, p in rows
+    ] == engine.apply_to_batch(["country", "phone"], rows)
+
+
+def test_compiled_plan_masks_rows_positionally():
+    engine = MaskingEngine.from_rules_config(
+        [
+            {"column_name": "EMAIL", "masking_type": "email"},
+            {"column_name": "age", "masking_type": "generalize_age"},
+        ]
+    )
+    plan = engine.compile(["name", "email", "age"])
+
+    assert plan.masked_columns == ["email", "age"]
+    row = ("Alice", "alice@example.com", "34")
+    assert plan.apply_row(row) == ["Alice", "a****@example.com", "30-44"]
+    assert plan.apply_batch([row, row]) == [plan.apply_row(row)] * 2
+    assert row == ("Alice", "alice@example.com", "34")
+
+
+@pytest.mark.parametrize(
+    ("condition", "row", "expected"),
+    [
+        ("age >= 18 and country == 'CN'", {"age": 20, "country": "CN"}, True),
+        ("age >= 18 and country == 'CN'", {"age": 12, "country": "CN"}, False),
+        ("not vip or email is None", {"vip": True, "email": None}, True),
+        ("1 < age < 5", {"age": 3}, True),
+        ("'@' in email", {"email": "a@b.c"}, True),
+        ("'@' not in email", {"email": None}, False),
+    ],
+)
+def test_safe_eval_condition(condition, row, expected):
+    assert safe_eval_condition(condition, row) is expected
+
+
+@pytest.mark.parametrize(
+    "condition",
+    ["__import__('os').system('id')", "row.__class__", "(lambda: 1)()", "[x for x in y]"],
+)
+def test_safe_eval_condition_rejects_unsafe_expressions(condition):
+    with pytest.raises(UnsafeExpressionError):
+        safe_eval_condition(condition, {})
+
+
+def test_conditions_compile_once_and_are_shared_per_row():
+    engine = MaskingEngine.from_rules_config(
+        [
+            {"column_name": "phone", "masking_type": "phone", "condition": "vip == 'no'"},
+            {"column_name": "email", "masking_type": "email", "condition": "vip == 'no'"},
+            {"column_name": "name", "masking_type": "name", "condition": "bad syntax ("},
+        ]
+    )
+    plan = engine.compile(["vip", "phone", "email", "name"])
+    rows = [
+        ["no", "13812345678", "ann@example.com", "Ann"],
+        ["yes", "13812345678", "bob@example.com", "Bob"],
+    ]
+
+    with patch("masking.engine.ast.parse", side_effect=AssertionError("re-parsed")):
+        masked = plan.apply_batch(rows)
+
+    assert masked == [
+        ["no", "138****5678", "a**@example.com", "A**"],
+        ["yes", "13812345678", "bob@example.com", "B**"],
+    ]
+
+
+def test_keyed_hash_uses_the_key_as_a_mac_key():
+    import hashlib
+    import hmac
+
+    strategy = get_masking_strategy("keyed_hash")
+
+    assert strategy.mask("Beijing", {"key": "k1"}) == hashlib.blake2b(
+        b"Beijing", key=b"k1", digest_size=32
+    ).hexdigest()
+    assert strategy.mask("Beijing", {"key": "k1", "algorithm": "hmac_sha256"}) == (
+        hmac.new(b"k1", b"Beijing", hashlib.sha256).hexdigest()
+    )
+    assert strategy.mask("Beijing", {"key": "k2"}) != strategy.mask(
+        "Beijing", {"key": "k1"}
+    )
+    with pytest.raises(ValueError):
+        strategy.mask("Beijing")
+
+
+def test_memoized_columns_hash_each_distinct_value_once():
+    engine = MaskingEngine.from_rules_config(
+        [
+            {"column_name": "city", "masking_type": "keyed_hash", "params": {"key": "k"}},
+            {"column_name": "phone", "masking_type": "phone"},
+        ]
+    )
+    rows = [["Beijing", "13812345678"], ["Shanghai", "13812345678"]] * 50
+    strategy = engine.get_rule("city").strategy
+
+    with patch.object(strategy, "mask_batch", wraps=strategy.mask_batch) as hashed:
+        plan = engine.compile(["city", "phone"])
+        first = plan.apply_batch(rows)
+        second = plan.apply_batch(rows)
+
+    assert first == second
+    assert first[0][0] == strategy.mask("Beijing", {"key": "k"})
+    assert [call.args[0] for call in hashed.call_args_list] == [["Beijing", "Shanghai"]]
+    assert cache_hit_ratios(engine.cache_stats()) == {
+        "city": {"hits": 198, "misses": 2, "hit_ratio": 0.99}
+    }
+
+
+def test_mask_memo_is_bounded_lru():
+    memo = MaskMemo(
+        lambda value: str(value).upper(),
+        lambda values: [str(value).upper() for value in values],
+        maxsize=2,
+    )
+
+    assert memo.mask_batch(["a", "b"]) == ["A", "B"]
+    memo.mask("a")
+    memo.mask("c")  # evicts "b", the least recently used
+    memo.mask("a")
+    memo.mask("b")
+
+    assert memo.stats() == {"hits": 2, "misses": 4}
+    assert memo.mask(True) == "TRUE" and memo.mask(1) == "1"
+
+
+def test_tokenize_is_stable_across_tables_and_runs_in_bulk():
+    redis = _VaultRedis()
+    rules = [{"column_name": "customer_id", "masking_type": "tokenize"}]
+
+    def run(header, rows):
+        # A fresh engine per table and run, as in separate tasks
+        plan = MaskingEngine.from_rules_config(rules).compile(header)
+        return plan.apply_batch(rows)
+
+    with patch("masking.vault._get_redis", return_value=redis):
+        orders = run(["customer_id", "total"], [["c1", "9"], ["c2", "5"], ["c1", "7"]])
+        trips = redis.round_trips
+        tickets = run(["customer_id"], [[f"c{i}"] for i in range(1, 4)] + [[""]])
+
+    # One lookup plus one insert for the whole batch, not per cell
+    assert trips == 2
+    assert orders[0][0] == orders[2][0] != orders[1][0]
+    assert orders[0][0].startswith("tok_")
+    assert [row[0] for row in tickets[:2]] == [orders[0][0], orders[1][0]]
+    assert tickets[3] == [""]
@@ -0,0 +1,168 @@
+"""Tests for translating masking rules into SQL."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+from decimal import Decimal
+
+import pytest
+
+from masking.engine import MaskingEngine, MaskingRule
+from masking.pushdown import plan_pushdown, rule_to_sql
+from masking.rules import get_masking_strategy
+
+TEXT_VALUES = [
+    None,
+    "",
+    "13812345678",
+    "+86 138-1234-5678",
+    "(010) 1234567",
+    "123",
+    "12345",
+    "110101199001011234",
+    "  110101199001011234  ",
+    "北京市朝阳区建国路88号",
+    "abc",
+    13812345678,
+]
+
+
+def _mysql_functions() -> sqlite3.Connection:
+    """SQLite connection emulating the MySQL functions the planner emits."""
+    conn = sqlite3.connect(":memory:")
+
+    def concat(*parts):
+        return None if None in parts else "".join(str(part) for part in parts)
+
+    def regexp_replace(value, pattern, replacement):
+        return None if value is None else re.sub(pattern, replacement, value)
+
+    def regexp_substr(value, pattern):
+        match = re.search(pattern, value or "")
+        return match.group(0) if match else None
+
+    conn.create_function("CONCAT", -1, concat)
+    # LEFT/RIGHT are join keywords in SQLite; queries use LEFT_/RIGHT_.
+    conn.create_function("LEFT_", 2, lambda value, n: value[:n])
+    conn.create_function("RIGHT_", 2, lambda value, n: value[-n:] if n else "")
+    conn.create_function("REPEAT", 2, lambda value, n: value * max(n, 0))
+    conn.create_function("CHAR_LENGTH", 1, len)
+    conn.create_function("REGEXP_REPLACE", 3, regexp_replace)
+    conn.create_function("REGEXP_SUBSTR", 2, regexp_substr)
+    conn.create_function(
+        "SHA2", 2, lambda value, bits: hashlib.sha256(value.encode()).hexdigest()
+    )
+    return conn
+
+
+@pytest.mark.parametrize(
+    "masking_type, params",
+    [
+        ("phone", None),
+        ("id_card", None),
+        ("address", None),
+        ("redact", None),
+        ("nullify", None),
+        ("hash", {"salt": "pepper"}),
+        ("replace", {"replace_value": "N/A"}),
+    ],
+)
+def test_sql_matches_python_strategy(masking_type, params):
+    rule = MaskingRule("value", masking_type, params)
+    expression, sql_params = rule_to_sql(rule, "value", "mysql")
+    conn = _mysql_functions()
+    conn.execute("CREATE TABLE t (id INTEGER, value)")
+    conn.executemany("INSERT INTO t VALUES (?, ?)", enumerate(TEXT_VALUES))
+
+    expression = re.sub(r"\b(LEFT|RIGHT)\(", r"\1_(", expression).replace("%s", "?")
+    query = f"SELECT {expression} FROM t ORDER BY id"
+    masked = [row[0] for row in conn.execute(query, sql_params)]
+
+    strategy = get_masking_strategy(masking_type)
+    assert masked == [strategy.mask(value, params) for value in TEXT_VALUES]
+
+
+def test_unsupported_and_conditional_rules_stay_in_python():
+    assert rule_to_sql(MaskingRule("c", "email"), "c", "postgresql") is None
+    assert rule_to_sql(MaskingRule("c", "phone"), "c", "sqlite") is None
+    conditional = MaskingRule("c", "redact", condition="c != ''")
+    assert rule_to_sql(conditional, "c", "postgresql") is None
+
+
+def test_plan_pushdown_splits_rules_and_builds_statements():
+    engine = MaskingEngine.from_rules_config(
+        [
+            {"column_name": "phone", "masking_type": "phone"},
+            {"column_name": "email", "masking_type": "email"},
+            {"column_name": "ssn", "masking_type": "hash", "params": {"salt": "s"}},
+        ]
+    )
+
+    columns = [
+        {"name": "id", "type": "integer"},
+        {"name": "phone", "type": "character varying"},
+        {"name": "email", "type": "text"},
+        {"name": "ssn", "type": "text"},
+    ]
+    plan = plan_pushdown(engine, columns, "postgresql", lambda n: f'"{n}"')
+
+    assert plan.pushed == ["phone", "ssn"]
+    assert list(plan.residual.rules) == ["email"]
+    assert not plan.fully_pushed
+    assert plan.params == ["s"]
+    select = plan.select_sql("users")
+    assert select.startswith('SELECT "id" AS "id", CASE WHEN "phone" IS NULL')
+    assert '"email" AS "email"' in select
+    assert "SHA256(CONVERT_TO(" in select
+    assert select.endswith(' FROM "users"')
+    assert plan.insert_select_sql("users", "users_masked").startswith(
+        'INSERT INTO "users_masked" ("id", "phone", "email", "ssn") SELECT '
+    )
+    assert plan.create_table_sql("users", "users_masked").startswith(
+        'CREATE TABLE "users_masked" AS SELECT '
+    )
+
+
+def test_plan_pushdown_keeps_rules_on_non_text_columns_in_python():
+    engine = MaskingEngine.from_rules_config(
+        [
+            {"column_name": column, "masking_type": "redact"}
+            for column in ("note", "code", "flag", "amount", "ratio")
+        ]
+    )
+    columns = [
+        {"name": "id", "type": "int(11)"},
+        {"name": "note", "type": "varchar(64)"},
+        {"name": "code", "type": "char(4)"},
+        {"name": "flag", "type": "tinyint(1)"},
+        {"name": "amount", "type": "decimal(10,2)"},
+        {"name": "ratio", "type": "double"},
+    ]
+    rows = [
+        (1, "secret", "AB  ", False, Decimal("1.50"), 0.1),
+        (2, None, None, None, None, None),
+        (3, "", "", 0, Decimal("0"), 1e20),
+    ]
+
+    plan = plan_pushdown(engine, columns, "mysql", lambda n: f'"{n}"')
+
+    assert plan.pushed == ["note"]
+    assert sorted(plan.residual.rules) == ["amount", "code", "flag", "ratio"]
+    # Pushed SQL followed by the residual Python rules gives exactly what
+    # masking every column in Python does.
+    conn = _mysql_functions()
+    conn.execute("CREATE TABLE t (id, note, code, flag, amount, ratio)")
+    conn.executemany(
+        "INSERT INTO t VALUES (?, ?, ?, ?, ?, ?)",
+        [(*row[:4], str(row[4]) if row[4] is not None else None, row[5]) for row in rows],
+    )
+    select = plan.select_sql("t").replace("%s", "?")
+    sql_rows = [list(row) for row in conn.execute(select + " ORDER BY id", plan.params)]
+    for sql_row, row in zip(sql_rows, rows):
+        # Hand the residual the values the driver would have returned.
+        sql_row[2:] = row[2:]
+    names = [col["name"] for col in columns]
+    combined = plan.residual.compile(names).apply_batch(sql_rows)
+    assert combined == engine.compile(names).apply_batch([list(row) for row in rows])
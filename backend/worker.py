@@ -3,6 +3,13 @@ from __future__ import annotations
 import csv
 import io
 import json
+import queue
+import re
+import shutil
+import time
+import uuid
+from collections.abc import Callable
+from itertools import chain, islice
 from pathlib import Path
 from zipfile import ZIP_DEFLATED, ZipFile
 
@@ -25,44 +32,257 @@ ID_KEYWORDS = {"id_card", "idcard", "identity", "ssn", "passport", "身份证",
 NAME_KEYWORDS = {"name", "full_name", "first_name", "last_name", "姓名"}
 ADDRESS_KEYWORDS = {"address", "addr", "地址"}
 DEFAULT_SPLIT_CHUNK_BYTES = 140 * 1024 * 1024
+PARALLEL_FILE_TYPES = {"csv", "jsonl"}
+MASK_BATCH_ROWS = 1000
+JSON_READ_CHUNK_CHARS = 64 * 1024
+SNAPSHOT_ATTACH_TIMEOUT_SECONDS = 60
+# Rows sampled when auto-discovering masking rules for a table
+DISCOVERY_SAMPLE_ROWS = 20
+# Leading file rows whose values decide each column's masker
+CONTENT_SAMPLE_ROWS = 100
+# Key ranges per pool process; extra ranges even out gaps in the key space.
+DB_RANGES_PER_PROCESS = 4
+_INTEGER_TYPE = re.compile(r"^(tiny|small|medium|big)?int(eger)?\b|^(small|big)?serial\b")
+# Encoding of CSV/JSON inputs and outputs, shared by the serial and parallel
+# paths so both read and write the same bytes whatever the worker's locale.
+TEXT_ENCODING = "utf-8"
+PROGRESS_INTERVAL_SECONDS = 0.5
+PROGRESS_DB_INTERVAL_SECONDS = 5.0
+PROGRESS_SNAPSHOT_TTL_SECONDS = 24 * 60 * 60
+
+
+class _ReadProgress:
+    """How far a single-pass row iterator has read through its input.
+
+    Text formats report bytes consumed against ``stat().st_size``; XLSX
+    reports sheet rows against the sheet's dimension metadata.  ``total`` is
+    0 when the size is unknown (e.g. XLSX files written without a dimension).
+    """
+
+    def __init__(self) -> None:
+        self.total = 0
+        self._position: Callable[[], int] = lambda: 0
+
+    def bind(self, total: int, position: Callable[[], int]) -> None:
+        self.total = total
+        self._position = position
+
+    def finish(self) -> None:
+        """Pin the position to the end once the underlying handle is closed."""
+        end = self.current
+        self._position = lambda: end
+
+    @property
+    def current(self) -> int:
+        position = self._position()
+        return min(position, self.total) if self.total else position
 
 
-def _iter_csv_rows(path: Path):
-    with path.open("r", newline="") as handle:
+def _iter_csv_rows(path: Path, progress: _ReadProgress | None = None):
+    with path.open("r", newline="", encoding=TEXT_ENCODING) as handle:
+        if progress is not None:
+            progress.bind(path.stat().st_size, handle.buffer.tell)
         reader = csv.reader(handle)
         yield from reader
+        if progress is not None:
+            progress.finish()
 
 
-def _iter_xlsx_rows(path: Path):
+def _iter_xlsx_rows(path: Path, progress: _ReadProgress | None = None):
     workbook = load_workbook(filename=path, read_only=True, data_only=True)
     try:
         sheet = workbook.active
+        rows_read = 0
+        if progress is not None:
+            progress.bind(sheet.max_row or 0, lambda: rows_read)
         for row in sheet.iter_rows(values_only=True):
+            rows_read += 1
             yield row
     finally:
         workbook.close()
 
 
-def _iter_json_rows(path: Path):
-    with path.open("r", encoding="utf-8") as handle:
-        data = json.load(handle)
-    if isinstance(data, list):
-        for item in data:
-            yield list(item.values()) if isinstance(item, dict) else [item]
-    elif isinstance(data, dict):
-        yield list(data.keys())
-        yield list(data.values())
-    else:
-        yield [data]
+def _iter_json_array(handle, chunk_size: int = JSON_READ_CHUNK_CHARS):
+    """Yield the elements of a top-level JSON array one at a time.
+
+    Only the element being decoded (plus one read chunk) is held in memory.
+    A document that is not an array is yielded whole as a single element.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill(min_chars: int = 0) -> None:
+        nonlocal buf, pos, eof
+        chunk = handle.read(max(chunk_size, min_chars))
+        buf = buf[pos:] + chunk
+        pos = 0
+        eof = not chunk
+
+    def peek() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf) or eof:
+                return buf[pos : pos + 1]
+            fill()
+
+    first = peek()
+    if not first:
+        return
+    if first != "[":
+        yield json.loads(buf[pos:] + handle.read())
+        return
+    pos += 1
+    if peek() == "]":
+        return
+
+    while True:
+        peek()
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # Element spans the chunk boundary; grow the buffer and retry.
+            fill(len(buf) - pos)
+            continue
+        if not eof and (end == len(buf) or buf[end] not in " \t\r\n,]"):
+            # A number cut by the chunk boundary decodes as a shorter one
+            # ("1." -> 1, "1.5e" -> 1.5); read on and decode it again.
+            fill(len(buf) - pos)
+            continue
+        pos = end
+        yield item
+
+        delimiter = peek()
+        if delimiter == "]":
+            return
+        if delimiter != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+        pos += 1
+
+
+def _records_to_rows(records):
+    """Turn JSON records into a header row followed by aligned value rows."""
+    header = None
+    for item in records:
+        if not isinstance(item, dict):
+            yield [item]
+            continue
+        if header is None:
+            header = list(item)
+            yield header
+        yield [item.get(key) for key in header]
 
 
-def _iter_jsonl_rows(path: Path):
-    with path.open("r", encoding="utf-8") as handle:
-        for line in handle:
-            line = line.strip()
-            if line:
-                item = json.loads(line)
-                yield list(item.values()) if isinstance(item, dict) else [item]
+def _iter_jsonl_records(handle):
+    for line in handle:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _iter_json_records(
+    path: Path, file_type: str, progress: _ReadProgress | None = None
+):
+    """Yield the records of a JSON array (``json``) or JSON Lines file."""
+    with path.open("r", encoding=TEXT_ENCODING) as handle:
+        if progress is not None:
+            progress.bind(path.stat().st_size, handle.buffer.tell)
+        if file_type == "json":
+            yield from _iter_json_array(handle)
+        else:
+            yield from _iter_jsonl_records(handle)
+        if progress is not None:
+            progress.finish()
+
+
+def _iter_json_rows(path: Path, progress: _ReadProgress | None = None):
+    yield from _records_to_rows(_iter_json_records(path, "json", progress))
+
+
+def _iter_jsonl_rows(path: Path, progress: _ReadProgress | None = None):
+    yield from _records_to_rows(_iter_json_records(path, "jsonl", progress))
+
+
+class _JsonRecordMasker:
+    """Mask JSON records by their own keys, whatever keys other records have.
+
+    Shared by the serial and parallel paths so both give the same output.
+    With an ``engine``, records sharing a key set are masked column-wise
+    through one compiled plan.  Without one, each key gets its
+    ``column_maskers`` entry, else its header-keyword masker.  Records that
+    are not objects pass through unchanged.
+    """
+
+    def __init__(self, engine=None, column_maskers: dict | None = None) -> None:
+        self.engine = engine
+        self.masked_columns: set[str] = set()
+        self._maskers = dict(column_maskers or {})
+        self._plans: dict[tuple, object] = {}
+
+    def _masker(self, key: str):
+        if key not in self._maskers:
+            self._maskers[key] = _select_masker(key)
+        return self._maskers[key]
+
+    def mask_batch(self, records) -> list:
+        masked = list(records)
+        groups: dict[tuple, list[int]] = {}
+        for index, item in enumerate(masked):
+            if isinstance(item, dict):
+                groups.setdefault(tuple(item), []).append(index)
+        for keys, indexes in groups.items():
+            if self.engine is not None:
+                plan = self._plans.get(keys)
+                if plan is None:
+                    plan = self._plans[keys] = self.engine.compile(keys)
+                rows = plan.apply_batch([list(masked[i].values()) for i in indexes])
+                for index, row in zip(indexes, rows):
+                    masked[index] = dict(zip(keys, row))
+                self.masked_columns.update(plan.masked_columns)
+                continue
+            maskers = [self._masker(key) for key in keys]
+            for index in indexes:
+                masked[index] = {
+                    key: value if masker is None else _apply_mask(value, masker)
+                    for key, masker, value in zip(keys, maskers, masked[index].values())
+                }
+            self.masked_columns.update(
+                key for key, masker in zip(keys, maskers) if masker is not None
+            )
+        return masked
+
+
+class _JsonRecordWriter:
+    """Write records as a JSON array (``.json``) or one per line (``.jsonl``).
+
+    Array output is produced incrementally and is byte-identical to
+    ``json.dump(records, handle, ensure_ascii=False, indent=2)``.
+    """
+
+    def __init__(self, handle, file_type: str) -> None:
+        self._handle = handle
+        self._array = file_type == "json"
+        self._count = 0
+
+    def writerows(self, records) -> None:
+        handle = self._handle
+        for record in records:
+            if self._array:
+                text = json.dumps(record, ensure_ascii=False, indent=2)
+                handle.write("[\n  " if self._count == 0 else ",\n  ")
+                handle.write(text.replace("\n", "\n  "))
+            else:
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._count += 1
+
+    def close(self) -> None:
+        if self._array:
+            self._handle.write("\n]" if self._count else "[]")
 
 
 def _count_rows(path: Path, file_type: str) -> int:
@@ -77,15 +297,15 @@ def _count_rows(path: Path, file_type: str) -> int:
     raise ValueError(f"unsupported file type: {file_type}")
 
 
-def _iter_rows(path: Path, file_type: str):
+def _iter_rows(path: Path, file_type: str, progress: _ReadProgress | None = None):
     if file_type == "csv":
-        return _iter_csv_rows(path)
+        return _iter_csv_rows(path, progress)
     if file_type == "xlsx":
-        return _iter_xlsx_rows(path)
+        return _iter_xlsx_rows(path, progress)
     if file_type == "json":
-        return _iter_json_rows(path)
+        return _iter_json_rows(path, progress)
     if file_type == "jsonl":
-        return _iter_jsonl_rows(path)
+        return _iter_jsonl_rows(path, progress)
     raise ValueError(f"unsupported file type: {file_type}")
 
 
@@ -169,6 +389,867 @@ def _apply_mask(value, masker):
     return masker(text) if masker else text
 
 
+def _mask_row(row, maskers) -> list[str]:
+    masked_row = []
+    for i, cell in enumerate(row):
+        masker = maskers[i] if i < len(maskers) else None
+        masked_row.append(_apply_mask(cell, masker))
+    return masked_row
+
+
+# Data types recognised from column values, with the masker each gets
+_CONTENT_MASKERS = {
+    "email": _mask_email,
+    "phone": _mask_phone,
+    "id_card": _mask_id,
+    "bank_card": _mask_id,
+    "credit_card": _mask_id,
+    "ssn": _mask_id,
+}
+
+
+# Person names: words of letters, joined by spaces, dots, hyphens or apostrophes
+_NAME_VALUE = re.compile(r"^[^\W\d_]+(?:[ .'-]+[^\W\d_]+)*\.?$")
+
+
+def _keyword_fit(masker, values: list, ratios: dict[str, float]) -> float | None:
+    """Fraction of sampled values that look like what a header keyword implies.
+
+    None when the keyword's type has no recognisable shape (addresses).
+    """
+    if masker is _mask_name:
+        texts = [text for text in (str(v).strip() for v in values if v) if text]
+        return sum(bool(_NAME_VALUE.match(t)) for t in texts) / len(texts)
+    fits = [
+        ratios.get(data_type, 0.0)
+        for data_type, content_masker in _CONTENT_MASKERS.items()
+        if content_masker is masker
+    ]
+    return max(fits) if fits else None
+
+
+def _select_column_masker(header: str, values: list):
+    """Pick a column's masker from its sampled values, else from its header.
+
+    The scanner's regexes must match at least ``MIN_MATCH_RATIO`` of the
+    non-empty values; the best-matching type wins.  A header keyword is
+    only used when the sample does not contradict it, i.e. when at least
+    ``MIN_MATCH_RATIO`` of the values look like the keyword's type.
+    """
+    from discovery.scanner import MIN_MATCH_RATIO, match_ratios
+
+    ratios = {data_type.value: ratio for data_type, ratio in match_ratios(values).items()}
+    best, best_ratio = None, 0.0
+    for data_type, masker in _CONTENT_MASKERS.items():
+        ratio = ratios.get(data_type, 0.0)
+        if ratio >= MIN_MATCH_RATIO and ratio > best_ratio:
+            best, best_ratio = masker, ratio
+    if best:
+        return best
+    masker = _select_masker(header)
+    if masker is None or not any(str(value).strip() for value in values if value):
+        return masker
+    fit = _keyword_fit(masker, values, ratios)
+    return None if fit is not None and fit < MIN_MATCH_RATIO else masker
+
+
+def _plan_maskers(header_cells: list[str], sample_rows: list) -> list:
+    """Choose every column's masker once from the leading rows of a file."""
+    return [
+        _select_column_masker(cell, [row[i] for row in sample_rows if i < len(row)])
+        for i, cell in enumerate(header_cells)
+    ]
+
+
+def _iter_batches(rows, size: int):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _mask_batch_with_plan(plan, batch) -> list[list]:
+    text_rows = [["" if cell is None else str(cell) for cell in row] for row in batch]
+    return plan.apply_batch(text_rows)
+
+
+def _use_parallel(path: Path, file_type: str, processes: int, chunk_size_bytes: int) -> bool:
+    return (
+        processes > 1
+        and file_type in PARALLEL_FILE_TYPES
+        and path.stat().st_size > chunk_size_bytes
+    )
+
+
+def _read_csv_header(path: Path) -> tuple[list[str], int]:
+    """Return the CSV header cells and the byte offset where data starts."""
+    raw = b""
+    with path.open("rb") as handle:
+        while True:
+            line = handle.readline()
+            raw += line
+            # A header with a quoted newline spans several physical lines.
+            if not line or raw.count(b'"') % 2 == 0:
+                break
+    if not raw:
+        return [], 0
+    header = next(csv.reader(io.StringIO(raw.decode(TEXT_ENCODING), newline="")), [])
+    return header, len(raw)
+
+
+def _split_record_ranges(
+    path: Path,
+    file_type: str,
+    start: int,
+    chunk_size_bytes: int,
+) -> list[tuple[int, int]]:
+    """Split ``path`` from ``start`` into byte ranges ending on record boundaries.
+
+    Each range ends just after a newline.  For CSV the scan tracks quote
+    parity so newlines inside quoted fields are never used as a boundary;
+    escaped quotes (``""``) flip the parity twice and are therefore neutral.
+    """
+    if chunk_size_bytes <= 0:
+        raise ValueError("chunk_size_bytes must be greater than 0")
+
+    track_quotes = file_type == "csv"
+    size = path.stat().st_size
+    ranges: list[tuple[int, int]] = []
+    range_start = start
+    target = start + chunk_size_bytes
+    in_quotes = False
+
+    with path.open("rb") as handle:
+        handle.seek(start)
+        offset = start
+        while target < size:
+            block = handle.read(1024 * 1024)
+            if not block:
+                break
+            block_end = offset + len(block)
+            pos = 0
+            while target < block_end:
+                cut = max(target - offset, pos)
+                if track_quotes:
+                    in_quotes ^= bool(block.count(b'"', pos, cut) & 1)
+                pos = cut
+                newline = block.find(b"\n", pos)
+                if newline == -1:
+                    break
+                if track_quotes:
+                    in_quotes ^= bool(block.count(b'"', pos, newline) & 1)
+                pos = newline + 1
+                if in_quotes:
+                    target = offset + pos
+                    continue
+                ranges.append((range_start, offset + pos))
+                range_start = offset + pos
+                target = range_start + chunk_size_bytes
+            if track_quotes:
+                in_quotes ^= bool(block.count(b'"', pos) & 1)
+            offset = block_end
+
+    if range_start < size:
+        ranges.append((range_start, size))
+    return ranges
+
+
+def _mask_record_range(job: tuple) -> tuple[int, int, list[str], dict]:
+    """Pool worker: mask one byte range of a CSV/JSONL file into a part file.
+
+    Returns ``(job_index, rows_written, masked_columns, cache_stats)``.
+    """
+    (
+        index, file_path, file_type, start, end, part_path,
+        header_cells, column_maskers, rules_list,
+    ) = job
+    column_maskers = column_maskers or {}
+
+    engine = None
+    if rules_list:
+        from masking.engine import MaskingEngine
+
+        engine = MaskingEngine.from_rules_config(rules_list)
+
+    with open(file_path, "rb") as handle:
+        handle.seek(start)
+        text = handle.read(end - start).decode(TEXT_ENCODING)
+
+    rows = 0
+    masked_columns: set[str] = set()
+    with open(part_path, "w", newline="", encoding=TEXT_ENCODING) as out:
+        if file_type == "csv":
+            plan = engine.compile(header_cells) if engine is not None else None
+            maskers = [
+                column_maskers[cell] if cell in column_maskers else _select_masker(cell)
+                for cell in header_cells
+            ]
+            if plan is not None:
+                masked_columns.update(plan.masked_columns)
+            else:
+                masked_columns.update(
+                    c for c, m in zip(header_cells, maskers) if m is not None
+                )
+            writer = csv.writer(out)
+            reader = csv.reader(io.StringIO(text, newline=""))
+            for batch in _iter_batches(reader, MASK_BATCH_ROWS):
+                if plan is not None:
+                    writer.writerows(_mask_batch_with_plan(plan, batch))
+                else:
+                    writer.writerows(_mask_row(row, maskers) for row in batch)
+                rows += len(batch)
+        else:
+            masker = _JsonRecordMasker(engine, column_maskers)
+            writer = _JsonRecordWriter(out, "jsonl")
+            records = _iter_jsonl_records(io.StringIO(text))
+            for batch in _iter_batches(records, MASK_BATCH_ROWS):
+                writer.writerows(masker.mask_batch(batch))
+                rows += len(batch)
+            masked_columns.update(masker.masked_columns)
+
+    cache_stats = engine.cache_stats() if engine is not None else {}
+    return index, rows, sorted(masked_columns), cache_stats
+
+
+def _desensitize_in_parallel(
+    path: Path,
+    file_type: str,
+    output_path: Path,
+    *,
+    processes: int,
+    chunk_size_bytes: int,
+    rules_list: list[dict] | None = None,
+    column_maskers: dict[str, Callable | None] | None = None,
+    progress: _ReadProgress | None = None,
+    on_chunk: Callable[[int], None] | None = None,
+    cache_stats: dict[str, dict[str, int]] | None = None,
+) -> tuple[int, int]:
+    """Mask a CSV/JSONL file across a process pool.
+
+    The input is cut into record-aligned byte ranges, each range is masked
+    into its own part file, and the parts are concatenated in order into
+    ``output_path``.  Without ``rules_list``, columns are masked with
+    ``column_maskers`` (column name -> masker, as planned from a sample),
+    falling back to header keywords for columns it doesn't cover.
+    The workers' memo counts are added to ``cache_stats`` when given.
+    Returns ``(data_rows, masked_field_count)``.
+    """
+    from masking.engine import merge_cache_stats
+
+    # billiard (Celery's multiprocessing fork) is used because prefork
+    # worker processes are daemonic and the stdlib refuses to let daemonic
+    # processes start a pool of their own.
+    from billiard.pool import Pool
+
+    header_cells: list[str] = []
+    start = 0
+    if file_type == "csv":
+        header_cells, start = _read_csv_header(path)
+
+    ranges = _split_record_ranges(path, file_type, start, chunk_size_bytes)
+    part_paths = [
+        output_path.with_name(f"{output_path.name}.part{index:05d}")
+        for index in range(len(ranges))
+    ]
+    jobs = [
+        (
+            index, str(path), file_type, s, e, str(part),
+            header_cells, column_maskers, rules_list,
+        )
+        for index, ((s, e), part) in enumerate(zip(ranges, part_paths))
+    ]
+
+    done = start
+    if progress is not None:
+        progress.bind(path.stat().st_size, lambda: done)
+
+    data_rows = 0
+    masked_columns: set[str] = set()
+    try:
+        pool = Pool(processes=min(processes, max(len(jobs), 1)))
+        try:
+            # apply_async rather than imap: billiard only tracks message
+            # consumption for ApplyResult, and imap stalls pool shutdown.
+            results = [pool.apply_async(_mask_record_range, (job,)) for job in jobs]
+            for result in results:
+                index, rows, columns, stats = result.get()
+                range_start, range_end = ranges[index]
+                done += range_end - range_start
+                data_rows += rows
+                masked_columns.update(columns)
+                if cache_stats is not None:
+                    merge_cache_stats(cache_stats, stats)
+                if on_chunk is not None:
+                    on_chunk(data_rows)
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+        with output_path.open("wb") as out:
+            if file_type == "csv":
+                header_line = io.StringIO()
+                csv.writer(header_line).writerow(header_cells)
+                out.write(header_line.getvalue().encode(TEXT_ENCODING))
+            for part in part_paths:
+                with part.open("rb") as handle:
+                    shutil.copyfileobj(handle, out, 1024 * 1024)
+    finally:
+        for part in part_paths:
+            part.unlink(missing_ok=True)
+
+    return data_rows, len(masked_columns)
+
+
+def _iter_source_batches(
+    connector,
+    query: str,
+    params: tuple | None = None,
+    *,
+    fetch_size: int,
+    extract_mode: str = "cursor",
+):
+    """Yield the column names, then batches of positional rows, for a query.
+
+    ``cursor`` streams dict rows through a server-side cursor; ``copy`` uses
+    the connector's bulk export (COPY TO STDOUT on PostgreSQL), which skips
+    building a Python dict per row.
+    """
+    if extract_mode == "copy":
+        rows = connector.copy_rows(query, params)
+        header = next(rows, None)
+        if header is not None:
+            yield header
+            yield from _iter_batches(rows, fetch_size)
+        return
+    if extract_mode != "cursor":
+        raise ValueError(f"unsupported extract_mode: {extract_mode}")
+
+    header = None
+    for batch in connector.stream_query(query, params, fetch_size):
+        if header is None:
+            header = list(batch[0].keys())
+            yield header
+        yield [tuple(row.values()) for row in batch]
+
+
+class _DbTableWriter:
+    """Write masked rows into a table on a target database connection.
+
+    Rows are buffered and written ``batch_size`` at a time, one transaction
+    per batch (COPY FROM STDIN on PostgreSQL, multi-row INSERT elsewhere).
+    Mirrors ``csv.writer``'s ``writerows`` so masking loops can use either.
+    """
+
+    def __init__(self, target_config: dict, columns: list[str]) -> None:
+        from connectors.factory import create_connector
+
+        connector_type = target_config.get("connector_type", "")
+        if not connector_type:
+            raise ValueError("target_config must include 'connector_type'")
+        self.table = target_config.get("table")
+        if not self.table:
+            raise ValueError("target_config must include 'table'")
+        self.columns = columns
+        self.batch_size = int(
+            target_config.get("batch_size", settings.db_write_batch_size)
+        )
+        self.connector = create_connector(
+            connector_type, target_config.get("connection", {})
+        )
+        self.connector.connect()
+        self._pending: list = []
+
+    def writerows(self, rows) -> None:
+        self._pending.extend(rows)
+        while len(self._pending) >= self.batch_size:
+            batch = self._pending[: self.batch_size]
+            del self._pending[: self.batch_size]
+            self.connector.write_rows(self.table, self.columns, batch)
+
+    def flush(self) -> None:
+        if self._pending:
+            self.connector.write_rows(self.table, self.columns, self._pending)
+            self._pending = []
+
+    def close(self) -> None:
+        self.connector.disconnect()
+
+
+def _mask_table_in_place(
+    connector,
+    table_name: str,
+    engine,
+    *,
+    batch_size: int,
+    checkpoint_key: str,
+    on_batch: Callable[[int], None] | None = None,
+) -> int:
+    """Mask a table in place, walking it by primary-key keyset.
+
+    Each batch of ``batch_size`` rows is read after the last key, masked,
+    written back with ``connector.update_rows`` and committed on its own,
+    so locks are held briefly.  The batch's last key is committed in the
+    same transaction as a checkpoint named ``checkpoint_key``, so a rerun
+    resumes after exactly the rows already masked and never masks a row
+    twice; the checkpoint is removed once the table is done.  Returns the
+    number of rows updated.
+    """
+    key = connector.get_primary_key(table_name)
+    if not key:
+        raise ValueError(f"in-place masking requires a primary key on {table_name}")
+    columns = [col["name"] for col in connector.get_columns(table_name)]
+    plan = engine.compile(columns)
+    # Key columns are never rewritten; they identify the rows to update.
+    update_columns = [name for name in plan.masked_columns if name not in key]
+    if not update_columns:
+        return 0
+    key_positions = [columns.index(name) for name in key]
+    masks_key = len(update_columns) < len(plan.masked_columns)
+
+    quote = connector.quote_identifier
+    key_list = ", ".join(quote(name) for name in key)
+    placeholders = ", ".join(["%s"] * len(key))
+    select = f"SELECT * FROM {quote(table_name)}"
+    order = f" ORDER BY {key_list} LIMIT {int(batch_size)}"
+    resume = f"{select} WHERE ({key_list}) > ({placeholders}){order}"
+
+    checkpoint = connector.read_checkpoint(checkpoint_key)
+    last_key = json.loads(checkpoint) if checkpoint else None
+    rows_done = 0
+    while True:
+        if last_key is None:
+            batch = connector.execute_query(select + order)
+        else:
+            batch = connector.execute_query(resume, tuple(last_key))
+        if not batch:
+            break
+        source = [tuple(row.values()) for row in batch]
+        masked = plan.apply_batch(source)
+        if masks_key:
+            for row, original in zip(masked, source):
+                for index in key_positions:
+                    row[index] = original[index]
+        last_key = [source[-1][index] for index in key_positions]
+        connector.update_rows(
+            table_name,
+            columns,
+            key,
+            update_columns,
+            masked,
+            checkpoint=(checkpoint_key, json.dumps(last_key, default=str)),
+        )
+        rows_done += len(batch)
+        if on_batch is not None:
+            on_batch(rows_done)
+
+    connector.clear_checkpoint(checkpoint_key)
+    return rows_done
+
+
+def _discover_rules(connector, table_name: str, columns=None) -> list[dict]:
+    """Build masking rules for a table from the sensitive-field scanner."""
+    from discovery.scanner import scan_table_schema
+
+    if columns is None:
+        columns = connector.get_columns(table_name)
+    samples = connector.get_random_sample(table_name, limit=DISCOVERY_SAMPLE_ROWS)
+
+    scan_result = scan_table_schema(table_name, columns, sample_rows=samples)
+    # Convert discovered fields into masking rules
+    return [
+        {
+            "column_name": field.column_name,
+            "masking_type": field.data_type.value,
+        }
+        for field in scan_result.fields
+    ]
+
+
+# Pool-process state for snapshot dumps: one connection per process, opened
+# at the shared snapshot by _attach_snapshot and reused for every table.
+_snapshot_connector = None
+_snapshot_events = None
+
+
+def _attach_snapshot(connector_type, connection_config, snapshot, ready, events):
+    """Pool initializer: open this process's connection at the snapshot."""
+    global _snapshot_connector, _snapshot_events
+    from connectors.factory import create_connector
+
+    _snapshot_events = events
+    try:
+        connector = create_connector(connector_type, connection_config)
+        connector.connect()
+        connector.import_snapshot(snapshot)
+    except Exception as exc:
+        ready.put(f"{type(exc).__name__}: {exc}")
+        return
+    _snapshot_connector = connector
+    ready.put(None)
+
+
+def _mask_snapshot_table(job: tuple) -> tuple[str, int, int, dict]:
+    """Pool worker: mask one table read through the snapshot connection.
+
+    Rows go to a CSV file, or into the same-named table on the target when
+    a database target is configured.  Returns ``(table, rows, masked_fields,
+    cache_stats)``.
+    """
+    table_name, output_path, target_config, rules_list, fetch_size, columns = job
+
+    from masking.engine import MaskingEngine
+
+    connector = _snapshot_connector
+    if connector is None:
+        raise RuntimeError("snapshot connection is not attached")
+    engine = MaskingEngine.from_rules_config(
+        rules_list or _discover_rules(connector, table_name, columns)
+    )
+    batches = _iter_source_batches(
+        connector,
+        f"SELECT * FROM {connector.quote_identifier(table_name)}",
+        fetch_size=fetch_size,
+    )
+    header = next(batches, None)
+    if header is None:
+        if columns is None:
+            columns = connector.get_columns(table_name)
+        header = [col["name"] for col in columns]
+    plan = engine.compile(header)
+
+    rows = 0
+
+    def mask_into(writer) -> None:
+        nonlocal rows
+        for batch in batches:
+            writer.writerows(plan.apply_batch(batch))
+            rows += len(batch)
+            _snapshot_events.put((table_name, rows))
+
+    if target_config is not None:
+        writer = _DbTableWriter({**target_config, "table": table_name}, header)
+        try:
+            mask_into(writer)
+            writer.flush()
+        finally:
+            writer.close()
+    else:
+        with open(output_path, "w", newline="", encoding=TEXT_ENCODING) as out:
+            writer = csv.writer(out)
+            writer.writerow(header)
+            mask_into(writer)
+    return table_name, rows, len(plan.masked_columns), engine.cache_stats()
+
+
+def _desensitize_tables_in_snapshot(
+    connector,
+    connector_type: str,
+    connection_config: dict,
+    tables: list[str],
+    output_path: Path | None,
+    *,
+    processes: int,
+    fetch_size: int,
+    rules_config: dict,
+    target_config: dict | None = None,
+    on_progress: Callable[[int, dict[str, int]], None] | None = None,
+    cache_stats: dict[str, dict[str, int]] | None = None,
+) -> tuple[dict[str, int], int]:
+    """Mask many tables in parallel, all read at one consistent snapshot.
+
+    ``connector`` exports the snapshot, each pool process attaches its own
+    connection to it, and the snapshot is released once all have attached.
+    Tables are written as CSVs zipped into ``output_path``, or into
+    same-named tables on the database target.  Rules come from
+    ``rules_config["tables"][table]``, then ``rules_config["rules"]``, then
+    auto-discovery.  ``on_progress(tables_done, rows_per_table)`` is called
+    as rows are masked; memo counts are added to ``cache_stats`` under
+    ``table.column`` when given.  Returns ``(rows_per_table,
+    masked_field_count)``.
+    """
+    import billiard
+    from billiard.pool import Pool
+
+    from masking.engine import merge_cache_stats
+
+    table_rules = rules_config.get("tables", {})
+    csv_paths = []
+    jobs = []
+    ready = billiard.Queue()
+    events = billiard.Queue()
+    size = max(1, min(processes, len(tables)))
+    table_rows = dict.fromkeys(tables, 0)
+    masked_fields = 0
+
+    # Nothing may run on the connection before the export: PostgreSQL
+    # can only switch the session to REPEATABLE READ outside a transaction.
+    snapshot = connector.export_snapshot()
+    try:
+        # One catalog query, read at the snapshot, instead of one per table
+        # in every pool process
+        columns_by_table = connector.get_all_columns()
+        for table in tables:
+            csv_path = None
+            if target_config is None:
+                csv_path = output_path.with_name(f"{output_path.stem}_{table}.csv")
+                csv_paths.append(csv_path)
+            rules_list = table_rules.get(table) or rules_config.get("rules", [])
+            jobs.append(
+                (
+                    table,
+                    str(csv_path) if csv_path else None,
+                    target_config,
+                    rules_list,
+                    fetch_size,
+                    columns_by_table.get(table),
+                )
+            )
+        pool = Pool(
+            processes=size,
+            initializer=_attach_snapshot,
+            initargs=(connector_type, connection_config, snapshot, ready, events),
+        )
+    except BaseException:
+        connector.release_snapshot()
+        raise
+    try:
+        try:
+            # Every reader must attach before the snapshot is let go.
+            for _ in range(size):
+                error = ready.get(timeout=SNAPSHOT_ATTACH_TIMEOUT_SECONDS)
+                if error:
+                    raise RuntimeError(f"could not attach to snapshot: {error}")
+        finally:
+            connector.release_snapshot()
+
+        pending = [pool.apply_async(_mask_snapshot_table, (job,)) for job in jobs]
+        finished: set[str] = set()
+        while pending:
+            try:
+                table, rows = events.get(timeout=PROGRESS_INTERVAL_SECONDS)
+                if table not in finished:
+                    table_rows[table] = rows
+            except queue.Empty:
+                pass
+            for result in [result for result in pending if result.ready()]:
+                pending.remove(result)
+                table, rows, masked, stats = result.get()
+                finished.add(table)
+                table_rows[table] = rows
+                masked_fields += masked
+                if cache_stats is not None:
+                    merge_cache_stats(
+                        cache_stats,
+                        {f"{table}.{column}": counts for column, counts in stats.items()},
+                    )
+            if on_progress is not None:
+                on_progress(len(finished), table_rows)
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        for csv_path in csv_paths:
+            csv_path.unlink(missing_ok=True)
+        raise
+    finally:
+        pool.join()
+
+    if output_path is not None:
+        with ZipFile(output_path, "w", compression=ZIP_DEFLATED) as archive:
+            for table, csv_path in zip(tables, csv_paths):
+                archive.write(csv_path, arcname=f"{table}.csv")
+                csv_path.unlink()
+    return table_rows, masked_fields
+
+
+def _plan_key_ranges(connector, table_name: str, count: int):
+    """Split a table on its integer primary key into ``count`` ranges.
+
+    Returns ``(key_column, [(low, high), ...])`` with half-open ranges, or
+    None when the table has no single-column integer key or no rows.
+    """
+    key = connector.get_primary_key(table_name)
+    if len(key) != 1:
+        return None
+    types = {
+        col["name"]: str(col["type"]).lower()
+        for col in connector.get_columns(table_name)
+    }
+    if not _INTEGER_TYPE.match(types.get(key[0], "")):
+        return None
+
+    column = connector.quote_identifier(key[0])
+    table = connector.quote_identifier(table_name)
+    bounds = connector.execute_query(
+        f"SELECT MIN({column}) AS lo, MAX({column}) AS hi FROM {table}"
+    )
+    low, high = bounds[0]["lo"], bounds[0]["hi"]
+    if low is None:
+        return None
+    step = -(-(high - low + 1) // count)
+    ranges = [
+        (start, min(start + step, high + 1)) for start in range(low, high + 1, step)
+    ]
+    return key[0], ranges
+
+
+def _mask_key_range(job: tuple) -> tuple[int, int]:
+    """Pool worker: mask one primary-key range of a table.
+
+    Rows go to a part file, or straight into the target table when a
+    database target is configured.  Each worker opens its own connections.
+    Returns ``(job_index, rows, cache_stats)``.
+    """
+    (
+        index,
+        connector_type,
+        connection_config,
+        query,
+        params,
+        part_path,
+        columns,
+        rules_list,
+        fetch_size,
+        extract_mode,
+        target_config,
+    ) = job
+
+    from connectors.factory import create_connector
+    from masking.engine import MaskingEngine
+
+    engine = MaskingEngine.from_rules_config(rules_list)
+    plan = engine.compile(columns)
+    connector = create_connector(connector_type, connection_config)
+    connector.connect()
+    rows = 0
+    try:
+        batches = _iter_source_batches(
+            connector,
+            query,
+            params,
+            fetch_size=fetch_size,
+            extract_mode=extract_mode,
+        )
+        next(batches, None)
+        if target_config is not None:
+            writer = _DbTableWriter(target_config, columns)
+            try:
+                for batch in batches:
+                    writer.writerows(plan.apply_batch(batch))
+                    rows += len(batch)
+                writer.flush()
+            finally:
+                writer.close()
+        else:
+            with open(part_path, "w", newline="", encoding=TEXT_ENCODING) as out:
+                writer = csv.writer(out)
+                for batch in batches:
+                    writer.writerows(plan.apply_batch(batch))
+                    rows += len(batch)
+    finally:
+        connector.disconnect()
+    return index, rows, engine.cache_stats()
+
+
+def _desensitize_table_in_parallel(
+    connector,
+    connector_type: str,
+    connection_config: dict,
+    table_name: str,
+    key_ranges: tuple[str, list[tuple[int, int]]],
+    output_path: Path | None,
+    *,
+    processes: int,
+    fetch_size: int,
+    rules_list: list[dict],
+    extract_mode: str = "cursor",
+    target_config: dict | None = None,
+    on_part: Callable[[int, int, int], None] | None = None,
+    cache_stats: dict[str, dict[str, int]] | None = None,
+) -> int:
+    """Mask a table across a process pool, one primary-key range per job.
+
+    Range results are written to part files and concatenated in key order
+    into ``output_path``, or, with ``target_config``, written by each worker
+    directly into the target table.  ``on_part(rows, parts_done,
+    parts_total)`` is called as parts finish, and the workers' memo counts
+    are added to ``cache_stats`` when given.  Returns the number of rows
+    written.
+    """
+    from billiard.pool import Pool
+
+    from masking.engine import merge_cache_stats
+
+    key, ranges = key_ranges
+    columns = [col["name"] for col in connector.get_columns(table_name)]
+    column = connector.quote_identifier(key)
+    query = (
+        f"SELECT * FROM {connector.quote_identifier(table_name)} "
+        f"WHERE {column} >= %s AND {column} < %s"
+    )
+    part_paths = (
+        []
+        if target_config is not None
+        else [
+            output_path.with_name(f"{output_path.name}.part{index:05d}")
+            for index in range(len(ranges))
+        ]
+    )
+    jobs = [
+        (
+            index,
+            connector_type,
+            connection_config,
+            query,
+            bounds,
+            str(part) if part else None,
+            columns,
+            rules_list,
+            fetch_size,
+            extract_mode,
+            target_config,
+        )
+        for index, (bounds, part) in enumerate(
+            zip(ranges, part_paths or [None] * len(ranges))
+        )
+    ]
+
+    data_rows = 0
+    try:
+        pool = Pool(processes=min(processes, len(jobs)))
+        try:
+            results = [pool.apply_async(_mask_key_range, (job,)) for job in jobs]
+            for done, result in enumerate(results, start=1):
+                _, rows, stats = result.get()
+                data_rows += rows
+                if cache_stats is not None:
+                    merge_cache_stats(cache_stats, stats)
+                if on_part is not None:
+                    on_part(data_rows, done, len(jobs))
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+        if target_config is not None:
+            return data_rows
+        with output_path.open("wb") as out:
+            header_line = io.StringIO()
+            csv.writer(header_line).writerow(columns)
+            out.write(header_line.getvalue().encode(TEXT_ENCODING))
+            for part in part_paths:
+                with part.open("rb") as handle:
+                    shutil.copyfileobj(handle, out, 1024 * 1024)
+    finally:
+        for part in part_paths:
+            part.unlink(missing_ok=True)
+
+    return data_rows
+
+
 def _part_path(output_dir: Path, task_id: str, part_index: int, suffix: str) -> Path:
     return output_dir / f"{task_id}_part_{part_index:03d}{suffix}"
 
@@ -339,6 +1420,7 @@ def process_csv(self: Task, file_path: str) -> dict:
     if total == 0:
         return {"current": 0, "total": 0, "message": "no rows"}
 
+    reporter = ProgressReporter(self)
     session = SessionLocal()
     try:
         for index, row in enumerate(_iter_rows(path, file_type), start=1):
@@ -353,35 +1435,19 @@ def process_csv(self: Task, file_path: str) -> dict:
                 session.commit()
 
             if index == total or index % 10 == 0:
-                self.update_state(
-                    state="PROGRESS",
-                    meta={
-                        "current": index,
-                        "total": total,
-                        "message": f"Processing row {index}/{total}",
-                    },
-                )
-                # Publish progress to Redis
-                redis_client.publish(
-                    f"task_progress:{self.request.id}",
-                    json.dumps(
-                        {
-                            "current": index,
-                            "total": total,
-                            "message": f"Processing row {index}/{total}",
-                        }
-                    ),
+                reporter.update(
+                    index,
+                    total,
+                    f"Processing row {index}/{total}",
+                    rows=index,
+                    force=index == total,
                 )
 
         session.commit()
     finally:
         session.close()
 
-    # Publish completion message
-    redis_client.publish(
-        f"task_progress:{self.request.id}",
-        json.dumps({"current": total, "total": total, "message": "completed"}),
-    )
+    reporter.publish(total, total, "completed")
 
     return {"current": total, "total": total, "message": "completed"}
 
@@ -393,133 +1459,87 @@ def process_desensitize(self: Task, file_path: str) -> dict:
         raise FileNotFoundError(f"file not found: {file_path}")
 
     suffix = path.suffix.lower()
-    if suffix not in {".csv", ".xlsx"}:
+    if suffix not in {".csv", ".xlsx", ".json", ".jsonl"}:
         raise ValueError(f"unsupported file type: {suffix}")
-    file_type = "xlsx" if suffix == ".xlsx" else "csv"
+    file_type = suffix[1:]
 
     output_dir = Path(settings.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
     output_path = output_dir / f"{self.request.id}_desensitized{suffix}"
 
-    total_rows = _count_rows(path, file_type)
-    rows = _iter_rows(path, file_type)
+    progress = _ReadProgress()
+    rows = _iter_rows(path, file_type, progress)
     try:
         header = next(rows)
     except StopIteration:
         return {"current": 0, "total": 0, "message": "no rows"}
 
     header_cells = ["" if cell is None else str(cell) for cell in header]
-    maskers = [_select_masker(cell) for cell in header_cells]
-
-    data_total = max(total_rows - 1, 0)
+    # Plan the maskers once from the leading rows, then stream the rest.
+    sample = list(islice(rows, CONTENT_SAMPLE_ROWS))
+    maskers = _plan_maskers(header_cells, sample)
+    body = chain(sample, rows)
+
+    reporter = ProgressReporter(self)
+
+    def report(index: int) -> None:
+        # Progress is measured against the input size rather than a row
+        # count, so the file is only read once.
+        reporter.update(
+            progress.current,
+            progress.total,
+            f"Desensitizing row {index}",
+            rows=index,
+        )
 
-    if file_type == "csv":
-        with output_path.open("w", newline="") as handle:
+    data_total = 0
+    chunk_size_bytes = settings.desensitize_chunk_mb * 1024 * 1024
+    if _use_parallel(path, file_type, settings.desensitize_processes, chunk_size_bytes):
+        rows.close()
+        data_total, _ = _desensitize_in_parallel(
+            path,
+            file_type,
+            output_path,
+            processes=settings.desensitize_processes,
+            chunk_size_bytes=chunk_size_bytes,
+            column_maskers=dict(zip(header_cells, maskers)),
+            progress=progress,
+            on_chunk=report,
+        )
+    elif file_type == "csv":
+        with output_path.open("w", newline="", encoding=TEXT_ENCODING) as handle:
             writer = csv.writer(handle)
             writer.writerow(header_cells)
-            for index, row in enumerate(rows, start=1):
-                masked_row = []
-                for i, cell in enumerate(row):
-                    masker = maskers[i] if i < len(maskers) else None
-                    masked_row.append(_apply_mask(cell, masker))
-                writer.writerow(masked_row)
-
-                if data_total and (index == data_total or index % 10 == 0):
-                    message = f"Desensitizing row {index}/{data_total}"
-                    self.update_state(
-                        state="PROGRESS",
-                        meta={
-                            "current": index,
-                            "total": data_total,
-                            "message": message,
-                        },
-                    )
-                    redis_client.publish(
-                        f"task_progress:{self.request.id}",
-                        json.dumps(
-                            {"current": index, "total": data_total, "message": message}
-                        ),
-                    )
+            for batch in _iter_batches(body, MASK_BATCH_ROWS):
+                writer.writerows(_mask_row(row, maskers) for row in batch)
+                data_total += len(batch)
+                report(data_total)
     elif file_type == "xlsx":
         workbook = Workbook(write_only=True)
         sheet = workbook.create_sheet()
         sheet.append(header_cells)
-        for index, row in enumerate(rows, start=1):
-            masked_row = []
-            for i, cell in enumerate(row):
-                masker = maskers[i] if i < len(maskers) else None
-                masked_row.append(_apply_mask(cell, masker))
-            sheet.append(masked_row)
-
-            if data_total and (index == data_total or index % 10 == 0):
-                message = f"Desensitizing row {index}/{data_total}"
-                self.update_state(
-                    state="PROGRESS",
-                    meta={"current": index, "total": data_total, "message": message},
-                )
-                redis_client.publish(
-                    f"task_progress:{self.request.id}",
-                    json.dumps(
-                        {"current": index, "total": data_total, "message": message}
-                    ),
-                )
+        for batch in _iter_batches(body, MASK_BATCH_ROWS):
+            for row in batch:
+                sheet.append(_mask_row(row, maskers))
+            data_total += len(batch)
+            report(data_total)
         workbook.save(output_path)
         workbook.close()
     elif file_type in ("json", "jsonl"):
-        rows_list = []
-        rows_iter = _iter_rows(path, file_type)
-        try:
-            header = next(rows_iter)
-        except StopIteration:
-            header = []
-        header_cells = ["" if cell is None else str(cell) for cell in header]
-
-        for index, row in enumerate(rows_iter, start=1):
-            masked_row = []
-            for i, cell in enumerate(row):
-                masker = maskers[i] if i < len(maskers) else None
-                masked_row.append(_apply_mask(cell, masker))
-            row_dict = dict(zip(header_cells, masked_row))
-            rows_list.append(row_dict)
-
-            if data_total and (index == data_total or index % 10 == 0):
-                message = f"Desensitizing row {index}/{data_total}"
-                self.update_state(
-                    state="PROGRESS",
-                    meta={"current": index, "total": data_total, "message": message},
-                )
-                redis_client.publish(
-                    f"task_progress:{self.request.id}",
-                    json.dumps(
-                        {"current": index, "total": data_total, "message": message}
-                    ),
-                )
-
-        with output_path.open("w", encoding="utf-8") as handle:
-            if file_type == "json":
-                json.dump(rows_list, handle, ensure_ascii=False, indent=2)
-            else:
-                for row in rows_list:
-                    handle.write(json.dumps(row, ensure_ascii=False) + "\n")
-
-    if data_total == 0:
-        redis_client.publish(
-            f"task_progress:{self.request.id}",
-            json.dumps({"current": 0, "total": 0, "message": "completed"}),
-        )
-        return {
-            "current": 0,
-            "total": 0,
-            "message": "completed",
-            "output_file": output_path.name,
-        }
-
-    redis_client.publish(
-        f"task_progress:{self.request.id}",
-        json.dumps(
-            {"current": data_total, "total": data_total, "message": "completed"}
-        ),
-    )
+        # Records keep their own keys, so they are re-read as records
+        # rather than as rows aligned to the first record's keys.
+        rows.close()
+        masker = _JsonRecordMasker(column_maskers=dict(zip(header_cells, maskers)))
+        records = _iter_json_records(path, file_type, progress)
+        with output_path.open("w", encoding=TEXT_ENCODING) as handle:
+            writer = _JsonRecordWriter(handle, file_type)
+            for batch in _iter_batches(records, MASK_BATCH_ROWS):
+                writer.writerows(masker.mask_batch(batch))
+                data_total += len(batch)
+                report(data_total)
+            writer.close()
+
+    reporter.publish(data_total, data_total, "completed")
 
     return {
         "current": data_total,
@@ -578,6 +1598,89 @@ def _update_task_record(
         session.close()
 
 
+class ProgressReporter:
+    """Coalesced progress reporting shared by all worker tasks.
+
+    ``update`` can be called as often as is convenient (e.g. once per
+    batch).  At most one Celery state update and Redis publish is emitted per
+    ``interval`` seconds, and the DesensitizeTask row, when there is one, is
+    written at most once per ``db_interval`` seconds.  Each event carries the
+    rows processed so far, rows/sec and an ETA derived from
+    ``current``/``total``.
+    """
+
+    def __init__(
+        self,
+        task: Task,
+        task_db_id: str | None = None,
+        *,
+        interval: float = PROGRESS_INTERVAL_SECONDS,
+        db_interval: float = PROGRESS_DB_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.task = task
+        self.task_db_id = task_db_id
+        self.channel = f"task_progress:{task.request.id}"
+        self.interval = interval
+        self.db_interval = db_interval
+        self._clock = clock
+        self._started = clock()
+        self._last_emit: float | None = None
+        self._last_db = self._started
+
+    def update(
+        self,
+        current: int,
+        total: int,
+        message: str,
+        *,
+        rows: int | None = None,
+        force: bool = False,
+        extra: dict | None = None,
+    ) -> None:
+        now = self._clock()
+        if (
+            not force
+            and self._last_emit is not None
+            and now - self._last_emit < self.interval
+        ):
+            return
+        self._last_emit = now
+
+        meta = {"current": current, "total": total, "message": message}
+        elapsed = now - self._started
+        if rows is not None:
+            meta["rows"] = rows
+            meta["rows_per_sec"] = round(rows / elapsed, 1) if elapsed > 0 else None
+        if total and current:
+            meta["eta_seconds"] = round(elapsed * (total - current) / current, 1)
+        if extra:
+            meta.update(extra)
+
+        self.task.update_state(state="PROGRESS", meta=meta)
+        self._publish(meta)
+
+        if self.task_db_id and (force or now - self._last_db >= self.db_interval):
+            self._last_db = now
+            _update_task_record(
+                self.task_db_id,
+                progress=current / total if total else 0.0,
+                message=message,
+            )
+
+    def publish(self, current: int, total: int, message: str) -> None:
+        """Publish a terminal event (completed/failed) immediately."""
+        self._publish({"current": current, "total": total, "message": message})
+
+    def _publish(self, payload: dict) -> None:
+        data = json.dumps(payload)
+        # One round trip for the event and the snapshot late subscribers read.
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.publish(self.channel, data)
+        pipe.set(f"{self.channel}:latest", data, ex=PROGRESS_SNAPSHOT_TTL_SECONDS)
+        pipe.execute()
+
+
 @celery_app.task(bind=True)
 def process_split_archive(self: Task, file_path: str, chunk_size_mb: int = 140) -> dict:
     path = Path(file_path)
@@ -592,14 +1695,8 @@ def process_split_archive(self: Task, file_path: str, chunk_size_mb: int = 140)
     output_dir.mkdir(parents=True, exist_ok=True)
 
     chunk_size_bytes = chunk_size_mb * 1024 * 1024
-    self.update_state(
-        state="PROGRESS",
-        meta={"current": 0, "total": 1, "message": "splitting file"},
-    )
-    redis_client.publish(
-        f"task_progress:{self.request.id}",
-        json.dumps({"current": 0, "total": 1, "message": "splitting file"}),
-    )
+    reporter = ProgressReporter(self)
+    reporter.update(0, 1, "splitting file", force=True)
 
     zip_path, part_paths = split_file_and_build_zip(
         path,
@@ -610,10 +1707,7 @@ def process_split_archive(self: Task, file_path: str, chunk_size_mb: int = 140)
 
     part_count = len(part_paths)
     message = f"completed ({part_count} parts)"
-    redis_client.publish(
-        f"task_progress:{self.request.id}",
-        json.dumps({"current": part_count, "total": part_count, "message": message}),
-    )
+    reporter.publish(part_count, part_count, message)
 
     return {
         "current": part_count,
@@ -626,16 +1720,17 @@ def process_split_archive(self: Task, file_path: str, chunk_size_mb: int = 140)
 @celery_app.task(bind=True)
 def process_db_desensitize(self: Task, task_db_id: str) -> dict:
     """
-    Database-to-CSV desensitization task.
+    Database desensitization task.
 
-    Reads data from a source database table, applies masking rules,
-    and writes the masked output to a CSV file.
+    Reads data from a source database table (or, with ``tables``, several
+    tables at one consistent snapshot), applies masking rules, and writes
+    the masked output to a CSV file, a target database, or back in place.
     """
     from datetime import datetime
 
     from connectors.factory import create_connector
-    from discovery.scanner import scan_table_schema
-    from masking.engine import MaskingEngine
+    from masking.engine import MaskingEngine, cache_hit_ratios, merge_cache_stats
+    from masking.pushdown import PUSHDOWN_DIALECTS, plan_pushdown
 
     init_db()
 
@@ -651,11 +1746,14 @@ def process_db_desensitize(self: Task, task_db_id: str) -> dict:
             raise ValueError(f"DesensitizeTask not found: {task_db_id}")
 
         source_config = task_record.source_config or {}
+        target_type = task_record.target_type
         target_config = task_record.target_config or {}
         rules_config = task_record.rules or {}
     finally:
         session.close()
 
+    reporter = ProgressReporter(self, task_db_id)
+
     # Mark task as running
     _update_task_record(
         task_db_id,
@@ -670,152 +1768,264 @@ def process_db_desensitize(self: Task, task_db_id: str) -> dict:
         if not connector_type:
             raise ValueError("source_config must include 'connector_type'")
 
+        tables = source_config.get("tables")
         table_name = source_config.get("table")
-        if not table_name:
-            raise ValueError("source_config must include 'table'")
+        if not table_name and not tables:
+            raise ValueError("source_config must include 'table' or 'tables'")
 
         connection_config = source_config.get("connection", {})
+        # Per-column memo hit/miss counts of memoized strategies
+        cache_stats: dict[str, dict[str, int]] = {}
+
+        if tables:
+            # Multi-table dump: every table is read at one consistent snapshot
+            connector = create_connector(connector_type, connection_config)
+            connector.connect()
+            output_path = None
+            try:
+                if target_type != "db":
+                    output_dir = Path(
+                        target_config.get("output_dir", settings.output_dir)
+                    )
+                    output_dir.mkdir(parents=True, exist_ok=True)
+                    output_path = output_dir / f"{task_db_id}_desensitized.zip"
+
+                def report_tables(done: int, table_rows: dict[str, int]) -> None:
+                    rows = sum(table_rows.values())
+                    reporter.update(
+                        done,
+                        len(tables),
+                        f"Desensitized {done}/{len(tables)} tables",
+                        rows=rows,
+                        extra={"tables": table_rows},
+                    )
+
+                table_rows, masked_field_count = _desensitize_tables_in_snapshot(
+                    connector,
+                    connector_type,
+                    connection_config,
+                    tables,
+                    output_path,
+                    processes=int(
+                        target_config.get(
+                            "parallel_processes", settings.desensitize_processes
+                        )
+                    ),
+                    fetch_size=int(
+                        source_config.get("fetch_size", settings.db_fetch_size)
+                    ),
+                    rules_config=rules_config,
+                    target_config=target_config if target_type == "db" else None,
+                    on_progress=report_tables,
+                    cache_stats=cache_stats,
+                )
+            finally:
+                connector.disconnect()
+
+            total_rows = sum(table_rows.values())
+            _update_task_record(
+                task_db_id,
+                status=TaskStatus.COMPLETED,
+                progress=1.0,
+                message=f"completed ({len(tables)} tables)",
+                input_rows=total_rows,
+                output_rows=total_rows,
+                masked_fields=masked_field_count,
+                completed_at=datetime.utcnow(),
+            )
+            reporter.publish(total_rows, total_rows, "completed")
+            return {
+                "current": total_rows,
+                "total": total_rows,
+                "message": "completed",
+                "output_file": output_path.name if output_path else None,
+                "input_rows": total_rows,
+                "output_rows": total_rows,
+                "masked_fields": masked_field_count,
+                "tables": table_rows,
+                "cache_stats": cache_hit_ratios(cache_stats),
+            }
 
         # Connect to source database
         connector = create_connector(connector_type, connection_config)
+        extract_mode = source_config.get("extract_mode", "cursor")
+        if extract_mode not in connector.extract_modes:
+            raise ValueError(
+                f"extract_mode '{extract_mode}' is not supported for "
+                f"{connector_type} (supported: {', '.join(connector.extract_modes)})"
+            )
         connector.connect()
 
         try:
-            # Build masking engine
-            rules_list = rules_config.get("rules", [])
-            if rules_list:
-                # Use explicitly provided rules
-                engine = MaskingEngine.from_rules_config(rules_list)
-            else:
-                # Auto-discover sensitive columns using scanner
-                columns = connector.get_columns(table_name)
-                samples = connector.get_sample_data(table_name, limit=5)
-                sample_values: dict[str, str | None] = {}
-                if samples:
-                    first_row = samples[0]
-                    for col_name, val in first_row.items():
-                        sample_values[col_name] = str(val) if val is not None else None
-
-                scan_result = scan_table_schema(table_name, columns, sample_values)
-                # Convert discovered fields into masking rules
-                auto_rules = []
-                for field in scan_result.fields:
-                    auto_rules.append(
-                        {
-                            "column_name": field.column_name,
-                            "masking_type": field.data_type.value,
-                        }
-                    )
-                engine = MaskingEngine.from_rules_config(auto_rules)
+            # Build masking engine: explicit rules, else auto-discovered ones
+            rules_list = rules_config.get("rules", []) or _discover_rules(
+                connector, table_name
+            )
+            engine = MaskingEngine.from_rules_config(rules_list)
 
             masked_field_count = len(engine.rules)
 
-            # Query all rows from source table
             query = source_config.get("query")
-            if query:
-                rows = connector.execute_query(query)
-            else:
-                rows = connector.execute_query(f"SELECT * FROM {table_name}")
-
-            total_rows = len(rows)
-
-            # Prepare output
-            output_dir = Path(target_config.get("output_dir", settings.output_dir))
-            output_dir.mkdir(parents=True, exist_ok=True)
-            output_path = output_dir / f"{task_db_id}_desensitized.csv"
-
-            # Publish initial progress
-            self.update_state(
-                state="PROGRESS",
-                meta={
-                    "current": 0,
-                    "total": total_rows,
-                    "message": "Starting desensitization",
-                },
+            query_params = None
+            fetch_size = int(source_config.get("fetch_size", settings.db_fetch_size))
+            processes = int(
+                target_config.get("parallel_processes", settings.desensitize_processes)
             )
-            redis_client.publish(
-                f"task_progress:{self.request.id}",
-                json.dumps(
-                    {
-                        "current": 0,
-                        "total": total_rows,
-                        "message": "Starting desensitization",
-                    }
-                ),
+            # Opt-in: run rules that have a SQL form inside the source database
+            pushdown = None
+            if (
+                source_config.get("pushdown")
+                and not query
+                and target_type != "in_place"
+                and connector_type in PUSHDOWN_DIALECTS
+            ):
+                pushdown = plan_pushdown(
+                    engine,
+                    connector.get_columns(table_name),
+                    connector_type,
+                    connector.quote_identifier,
+                )
+            # INSERT ... SELECT / CREATE TABLE AS when nothing needs Python and
+            # the target lives on the source connection
+            server_side = (
+                pushdown is not None
+                and pushdown.fully_pushed
+                and target_type == "db"
+                and target_config.get("connector_type") == connector_type
+                and target_config.get("connection", {}) == connection_config
             )
-
-            if total_rows == 0:
-                # Write empty CSV with headers if available
-                with output_path.open("w", newline="") as handle:
-                    writer = csv.writer(handle)
-                    # Try to get column names from schema
-                    columns = connector.get_columns(table_name)
-                    if columns:
-                        writer.writerow([col["name"] for col in columns])
-
-                _update_task_record(
-                    task_db_id,
-                    status=TaskStatus.COMPLETED,
-                    progress=1.0,
-                    message="completed (no rows)",
-                    input_rows=0,
-                    output_rows=0,
-                    masked_fields=masked_field_count,
-                    completed_at=datetime.utcnow(),
+            if pushdown is not None and not server_side:
+                query, query_params = pushdown.select_sql(table_name), pushdown.params
+                engine = pushdown.residual
+
+            key_ranges = None
+            if processes > 1 and not query and target_type != "in_place":
+                key_ranges = _plan_key_ranges(
+                    connector, table_name, processes * DB_RANGES_PER_PROCESS
                 )
 
-                redis_client.publish(
-                    f"task_progress:{self.request.id}",
-                    json.dumps({"current": 0, "total": 0, "message": "completed"}),
-                )
+            # Prepare output; a database target is written directly
+            output_path = None
+            if target_type not in ("db", "in_place"):
+                output_dir = Path(target_config.get("output_dir", settings.output_dir))
+                output_dir.mkdir(parents=True, exist_ok=True)
+                output_path = output_dir / f"{task_db_id}_desensitized.csv"
+
+            # The exact row count is not known up front; a whole-table read
+            # is measured against the catalog's row estimate, which may be
+            # low (it never drops below the rows seen).  A custom query, or a
+            # table without statistics, reports rows with an open-ended total.
+            estimated_rows = 0
+            if not source_config.get("query"):
+                schema, _, name = table_name.rpartition(".")
+                estimates = connector.get_row_estimates(schema or None)
+                estimated_rows = estimates.get(name, 0)
+
+            def rows_total(rows: int) -> int:
+                return max(estimated_rows, rows) if estimated_rows else 0
+
+            reporter.update(0, estimated_rows, "Starting desensitization", force=True)
+
+            total_rows = 0
+            if target_type == "in_place":
+
+                def report_batch(rows: int) -> None:
+                    reporter.update(
+                        rows, rows_total(rows), f"Updated row {rows}", rows=rows
+                    )
 
-                return {
-                    "current": 0,
-                    "total": 0,
-                    "message": "completed",
-                    "output_file": output_path.name,
-                    "input_rows": 0,
-                    "output_rows": 0,
-                    "masked_fields": masked_field_count,
-                }
+                total_rows = _mask_table_in_place(
+                    connector,
+                    table_name,
+                    engine,
+                    batch_size=int(
+                        target_config.get("batch_size", settings.db_write_batch_size)
+                    ),
+                    checkpoint_key=f"inplace_checkpoint:{task_db_id}",
+                    on_batch=report_batch,
+                )
+            elif server_side:
+                target_table = target_config.get("table")
+                if not target_table:
+                    raise ValueError("target_config must include 'table'")
+                if target_config.get("create_table"):
+                    statement = pushdown.create_table_sql(table_name, target_table)
+                else:
+                    statement = pushdown.insert_select_sql(table_name, target_table)
+                total_rows = connector.execute(statement, pushdown.params)
+            elif key_ranges is not None:
+
+                def report_part(rows: int, done: int, parts: int) -> None:
+                    reporter.update(
+                        done,
+                        parts,
+                        f"Desensitized {rows} rows ({done}/{parts} key ranges)",
+                        rows=rows,
+                    )
 
-            # Write masked rows to CSV
-            header = list(rows[0].keys())
-            with output_path.open("w", newline="") as handle:
-                writer = csv.writer(handle)
-                writer.writerow(header)
-
-                for index, row in enumerate(rows, start=1):
-                    masked_row = engine.apply_to_row(row)
-                    writer.writerow([masked_row.get(col, "") for col in header])
-
-                    if index == total_rows or index % 50 == 0:
-                        progress = index / total_rows
-                        message = f"Desensitizing row {index}/{total_rows}"
-                        self.update_state(
-                            state="PROGRESS",
-                            meta={
-                                "current": index,
-                                "total": total_rows,
-                                "message": message,
-                            },
-                        )
-                        redis_client.publish(
-                            f"task_progress:{self.request.id}",
-                            json.dumps(
-                                {
-                                    "current": index,
-                                    "total": total_rows,
-                                    "message": message,
-                                }
-                            ),
-                        )
-                        _update_task_record(
-                            task_db_id,
-                            progress=progress,
-                            message=message,
+                total_rows = _desensitize_table_in_parallel(
+                    connector,
+                    connector_type,
+                    connection_config,
+                    table_name,
+                    key_ranges,
+                    output_path,
+                    processes=processes,
+                    fetch_size=fetch_size,
+                    rules_list=rules_list,
+                    extract_mode=extract_mode,
+                    target_config=target_config if target_type == "db" else None,
+                    on_part=report_part,
+                    cache_stats=cache_stats,
+                )
+            else:
+                # Stream rows through a single server-side cursor
+                batches = _iter_source_batches(
+                    connector,
+                    query or f"SELECT * FROM {table_name}",
+                    query_params,
+                    fetch_size=fetch_size,
+                    extract_mode=extract_mode,
+                )
+                header = next(batches, None)
+                plan = engine.compile(header) if header is not None else None
+
+                def mask_into(writer) -> int:
+                    rows = 0
+                    for batch in batches:
+                        writer.writerows(plan.apply_batch(batch))
+                        rows += len(batch)
+                        reporter.update(
+                            rows,
+                            rows_total(rows),
+                            f"Desensitizing row {rows}",
+                            rows=rows,
                         )
-
+                    return rows
+
+                if target_type == "db":
+                    if header is not None:
+                        writer = _DbTableWriter(target_config, header)
+                        try:
+                            total_rows = mask_into(writer)
+                            writer.flush()
+                        finally:
+                            writer.close()
+                else:
+                    with output_path.open(
+                        "w", newline="", encoding=TEXT_ENCODING
+                    ) as handle:
+                        writer = csv.writer(handle)
+                        if header is not None:
+                            writer.writerow(header)
+                            total_rows = mask_into(writer)
+                        else:
+                            # Write empty CSV with headers if available
+                            columns = connector.get_columns(table_name)
+                            if columns:
+                                writer.writerow([col["name"] for col in columns])
+
+            merge_cache_stats(cache_stats, engine.cache_stats())
         finally:
             connector.disconnect()
 
@@ -824,28 +2034,24 @@ def process_db_desensitize(self: Task, task_db_id: str) -> dict:
             task_db_id,
             status=TaskStatus.COMPLETED,
             progress=1.0,
-            message="completed",
+            message="completed" if total_rows else "completed (no rows)",
             input_rows=total_rows,
             output_rows=total_rows,
             masked_fields=masked_field_count,
             completed_at=datetime.utcnow(),
         )
 
-        redis_client.publish(
-            f"task_progress:{self.request.id}",
-            json.dumps(
-                {"current": total_rows, "total": total_rows, "message": "completed"}
-            ),
-        )
+        reporter.publish(total_rows, total_rows, "completed")
 
         return {
             "current": total_rows,
             "total": total_rows,
             "message": "completed",
-            "output_file": output_path.name,
+            "output_file": output_path.name if output_path else None,
             "input_rows": total_rows,
             "output_rows": total_rows,
             "masked_fields": masked_field_count,
+            "cache_stats": cache_hit_ratios(cache_stats),
         }
 
     except Exception as exc:
@@ -854,12 +2060,65 @@ def process_db_desensitize(self: Task, task_db_id: str) -> dict:
             status=TaskStatus.FAILED,
             error_detail=str(exc),
         )
-        redis_client.publish(
-            f"task_progress:{self.request.id}",
-            json.dumps({"current": 0, "total": 0, "message": f"failed: {exc}"}),
+        reporter.publish(0, 0, f"failed: {exc}")
+        raise
+
+
+@celery_app.task(bind=True)
+def process_discovery_scan(
+    self: Task, connector_type: str, connection_config: dict, options: dict
+) -> dict:
+    """
+    Background ``/discovery/scan``.
+
+    Publishes progress per table on ``task_progress:{task_id}`` and stores
+    the per-table results in Redis for paginated reads.
+    """
+    from crypto import decrypt_sensitive_config
+    from discovery.catalog import record_scan
+    from discovery.jobs import save_scan_results
+    from discovery.runner import scan_source
+
+    reporter = ProgressReporter(self)
+
+    def report_table(done: int, total: int, table_name: str) -> None:
+        reporter.update(
+            done, total, f"Scanned {done}/{total} tables", extra={"table": table_name}
         )
+
+    try:
+        result = scan_source(
+            connector_type,
+            decrypt_sensitive_config(connection_config),
+            tables=options.get("tables"),
+            sample_size=int(options.get("sample_size", 10)),
+            cache_scope=options["cache_scope"],
+            force_rescan=bool(options.get("force_rescan")),
+            on_progress=report_table,
+        )
+        summary = result.summary()
+        save_scan_results(self.request.id, result.tables, summary)
+        if options.get("source_id") and result.tables:
+            init_db()
+            session = SessionLocal()
+            try:
+                record_scan(
+                    session,
+                    uuid.UUID(options["tenant_id"]),
+                    uuid.UUID(options["source_id"]),
+                    result.tables,
+                )
+                session.commit()
+            finally:
+                session.close()
+    except Exception as exc:
+        reporter.publish(0, 0, f"failed: {exc}")
         raise
 
+    total = summary["total_tables"]
+    reporter.publish(total, total, "completed")
+    return {"current": total, "total": total, "message": "completed", **summary}
+
 
 @celery_app.task(bind=True)
 def process_task_desensitize(self: Task, task_db_id: str) -> dict:
@@ -872,6 +2131,8 @@ def process_task_desensitize(self: Task, task_db_id: str) -> dict:
     """
     from datetime import datetime
 
+    from masking.engine import cache_hit_ratios, merge_cache_stats
+
     init_db()
 
     # Load task record from DB
@@ -891,6 +2152,8 @@ def process_task_desensitize(self: Task, task_db_id: str) -> dict:
     finally:
         session.close()
 
+    reporter = ProgressReporter(self, task_db_id)
+
     # Mark task as running
     _update_task_record(
         task_db_id,
@@ -925,8 +2188,8 @@ def process_task_desensitize(self: Task, task_db_id: str) -> dict:
         output_dir.mkdir(parents=True, exist_ok=True)
         output_path = output_dir / f"{task_db_id}_desensitized{suffix}"
 
-        total_rows = _count_rows(path, file_type)
-        rows = _iter_rows(path, file_type)
+        progress = _ReadProgress()
+        rows = _iter_rows(path, file_type, progress)
         try:
             header = next(rows)
         except StopIteration:
@@ -940,125 +2203,104 @@ def process_task_desensitize(self: Task, task_db_id: str) -> dict:
                 masked_fields=0,
                 completed_at=datetime.utcnow(),
             )
-            redis_client.publish(
-                f"task_progress:{self.request.id}",
-                json.dumps({"current": 0, "total": 0, "message": "completed"}),
-            )
+            reporter.publish(0, 0, "completed")
             return {"current": 0, "total": 0, "message": "completed"}
 
         header_cells = ["" if cell is None else str(cell) for cell in header]
 
         # Build maskers: prefer explicit rules from task config, fall back to auto-detect
         rules_list = rules_config.get("rules", [])
+        engine = None
+        plan = None
+        column_maskers = None
+        cache_stats: dict[str, dict[str, int]] = {}
+        body = rows
         if rules_list:
             from masking.engine import MaskingEngine
 
+            # Resolve rules against the header once; rows are then masked
+            # positionally without per-row dicts.
             engine = MaskingEngine.from_rules_config(rules_list)
-            # Create a mapping from column index to masking rule
-            maskers = []
-            for cell in header_cells:
-                rule = engine.get_rule(cell)
-                maskers.append(rule)
-            use_engine = True
+            plan = engine.compile(header_cells)
+            masked_field_count = len(plan.masked_columns)
         else:
-            # Fall back to existing keyword-based auto-detection
-            maskers = [_select_masker(cell) for cell in header_cells]
-            use_engine = False
-
-        masked_field_count = sum(1 for m in maskers if m is not None)
-        data_total = max(total_rows - 1, 0)
+            # Fall back to auto-detection, planned once from the leading rows
+            sample = list(islice(rows, CONTENT_SAMPLE_ROWS))
+            maskers = _plan_maskers(header_cells, sample)
+            column_maskers = dict(zip(header_cells, maskers))
+            body = chain(sample, rows)
+            masked_field_count = sum(1 for m in maskers if m is not None)
+
+        def report(index: int) -> None:
+            # Progress is measured against the input size rather than a row
+            # count, so the file is only read once.
+            reporter.update(
+                progress.current,
+                progress.total,
+                f"Desensitizing row {index}",
+                rows=index,
+            )
 
-        if file_type == "csv":
-            with output_path.open("w", newline="") as handle:
+        data_total = 0
+        processes = int(
+            target_config.get("parallel_processes", settings.desensitize_processes)
+        )
+        chunk_size_bytes = settings.desensitize_chunk_mb * 1024 * 1024
+        if _use_parallel(path, file_type, processes, chunk_size_bytes):
+            rows.close()
+            data_total, masked_field_count = _desensitize_in_parallel(
+                path,
+                file_type,
+                output_path,
+                processes=processes,
+                chunk_size_bytes=chunk_size_bytes,
+                rules_list=rules_list,
+                column_maskers=column_maskers,
+                progress=progress,
+                on_chunk=report,
+                cache_stats=cache_stats,
+            )
+        elif file_type == "csv":
+            with output_path.open("w", newline="", encoding=TEXT_ENCODING) as handle:
                 writer = csv.writer(handle)
                 writer.writerow(header_cells)
-                for index, row in enumerate(rows, start=1):
-                    if use_engine:
-                        # Build a dict row, apply engine, extract values
-                        row_dict = {}
-                        for i, cell in enumerate(row):
-                            col = (
-                                header_cells[i] if i < len(header_cells) else f"col_{i}"
-                            )
-                            row_dict[col] = "" if cell is None else str(cell)
-                        masked_dict = engine.apply_to_row(row_dict)
-                        masked_row = [masked_dict.get(col, "") for col in header_cells]
+                for batch in _iter_batches(body, MASK_BATCH_ROWS):
+                    if plan is not None:
+                        writer.writerows(_mask_batch_with_plan(plan, batch))
                     else:
-                        masked_row = []
-                        for i, cell in enumerate(row):
-                            masker = maskers[i] if i < len(maskers) else None
-                            masked_row.append(_apply_mask(cell, masker))
-                    writer.writerow(masked_row)
-
-                    if data_total and (index == data_total or index % 10 == 0):
-                        progress = index / data_total if data_total else 1.0
-                        message = f"Desensitizing row {index}/{data_total}"
-                        self.update_state(
-                            state="PROGRESS",
-                            meta={
-                                "current": index,
-                                "total": data_total,
-                                "message": message,
-                            },
-                        )
-                        redis_client.publish(
-                            f"task_progress:{self.request.id}",
-                            json.dumps(
-                                {
-                                    "current": index,
-                                    "total": data_total,
-                                    "message": message,
-                                }
-                            ),
-                        )
-                        _update_task_record(
-                            task_db_id,
-                            progress=progress,
-                            message=message,
-                        )
+                        writer.writerows(_mask_row(row, maskers) for row in batch)
+                    data_total += len(batch)
+                    report(data_total)
+        elif file_type in ("json", "jsonl"):
+            # Records keep their own keys, as on the parallel path.
+            rows.close()
+            masker = _JsonRecordMasker(engine, column_maskers)
+            records = _iter_json_records(path, file_type, progress)
+            with output_path.open("w", encoding=TEXT_ENCODING) as handle:
+                writer = _JsonRecordWriter(handle, file_type)
+                for batch in _iter_batches(records, MASK_BATCH_ROWS):
+                    writer.writerows(masker.mask_batch(batch))
+                    data_total += len(batch)
+                    report(data_total)
+                writer.close()
+            masked_field_count = len(masker.masked_columns)
         else:
             workbook = Workbook(write_only=True)
             sheet = workbook.create_sheet()
             sheet.append(header_cells)
-            for index, row in enumerate(rows, start=1):
-                if use_engine:
-                    row_dict = {}
-                    for i, cell in enumerate(row):
-                        col = header_cells[i] if i < len(header_cells) else f"col_{i}"
-                        row_dict[col] = "" if cell is None else str(cell)
-                    masked_dict = engine.apply_to_row(row_dict)
-                    masked_row = [masked_dict.get(col, "") for col in header_cells]
+            for batch in _iter_batches(body, MASK_BATCH_ROWS):
+                if plan is not None:
+                    masked_rows = _mask_batch_with_plan(plan, batch)
                 else:
-                    masked_row = []
-                    for i, cell in enumerate(row):
-                        masker = maskers[i] if i < len(maskers) else None
-                        masked_row.append(_apply_mask(cell, masker))
-                sheet.append(masked_row)
-
-                if data_total and (index == data_total or index % 10 == 0):
-                    progress = index / data_total if data_total else 1.0
-                    message = f"Desensitizing row {index}/{data_total}"
-                    self.update_state(
-                        state="PROGRESS",
-                        meta={
-                            "current": index,
-                            "total": data_total,
-                            "message": message,
-                        },
-                    )
-                    redis_client.publish(
-                        f"task_progress:{self.request.id}",
-                        json.dumps(
-                            {"current": index, "total": data_total, "message": message}
-                        ),
-                    )
-                    _update_task_record(
-                        task_db_id,
-                        progress=progress,
-                        message=message,
-                    )
+                    masked_rows = [_mask_row(row, maskers) for row in batch]
+                for masked_row in masked_rows:
+                    sheet.append(masked_row)
+                data_total += len(batch)
+                report(data_total)
             workbook.save(output_path)
             workbook.close()
+        if engine is not None:
+            merge_cache_stats(cache_stats, engine.cache_stats())
 
         # Mark completed
         _update_task_record(
@@ -1072,12 +2314,7 @@ def process_task_desensitize(self: Task, task_db_id: str) -> dict:
             completed_at=datetime.utcnow(),
         )
 
-        redis_client.publish(
-            f"task_progress:{self.request.id}",
-            json.dumps(
-                {"current": data_total, "total": data_total, "message": "completed"}
-            ),
-        )
+        reporter.publish(data_total, data_total, "completed")
 
         return {
             "current": data_total,
@@ -1087,6 +2324,7 @@ def process_task_desensitize(self: Task, task_db_id: str) -> dict:
             "input_rows": data_total,
             "output_rows": data_total,
             "masked_fields": masked_field_count,
+            "cache_stats": cache_hit_ratios(cache_stats),
         }
 
     except Exception as exc:
@@ -1095,8 +2333,5 @@ def process_task_desensitize(self: Task, task_db_id: str) -> dict:
             status=TaskStatus.FAILED,
             error_detail=str(exc),
         )
-        redis_client.publish(
-            f"task_progress:{self.request.id}",
-            json.dumps({"current": 0, "total": 0, "message": f"failed: {exc}"}),
-        )
+        reporter.publish(0, 0, f"failed: {exc}")
         raise